@@ -0,0 +1 @@
+"""Benchmarks for Windows MCP internals. Run with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,88 @@
+"""Benchmark converting raw BGRA captures into PIL images.
+
+Compares the previous path, ``Image.frombytes("RGB", size, shot.rgb)``,
+with ``capture.image_from_bgra`` on synthetic 4K and 8K frames. When mss
+is not installed, its ``.rgb`` conversion is reproduced with the same
+slice copies it performs.
+
+Bytes copied are the Python-side buffers allocated per frame (measured
+with tracemalloc) plus the pixels PIL stores, which both paths share.
+
+Usage:
+    python -m benchmarks.bench_capture --repeat 5
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from PIL import Image
+
+from windows_mcp.screen.capture import image_from_bgra
+
+try:
+    from mss.screenshot import ScreenShot
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160),
+    '8K': (7680, 4320),
+}
+
+
+def mss_rgb(raw: bytearray, width: int, height: int) -> bytes:
+    """The BGRA to RGB conversion done by mss's ScreenShot.rgb."""
+    if MSS_AVAILABLE:
+        return ScreenShot(raw, {'left': 0, 'top': 0, 'width': width, 'height': height}).rgb
+    rgb = bytearray(width * height * 3)
+    rgb[::3] = raw[2::4]
+    rgb[1::3] = raw[1::4]
+    rgb[2::3] = raw[::4]
+    return bytes(rgb)
+
+
+def legacy(raw: bytearray, width: int, height: int) -> Image.Image:
+    return Image.frombytes("RGB", (width, height), mss_rgb(raw, width, height))
+
+
+def direct(raw: bytearray, width: int, height: int) -> Image.Image:
+    return image_from_bgra(raw, width, height)
+
+
+def measure(convert, raw: bytearray, width: int, height: int, repeat: int) -> tuple[float, int]:
+    """Return (best seconds per frame, Python bytes allocated per frame)."""
+    tracemalloc.start()
+    convert(raw, width, height)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        convert(raw, width, height)
+        best = min(best, time.perf_counter() - start)
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"mss available: {MSS_AVAILABLE}")
+    for label, (width, height) in RESOLUTIONS.items():
+        raw = bytearray(os.urandom(width * height * 4))
+        assert legacy(raw, width, height).tobytes() == direct(raw, width, height).tobytes()
+        pil_bytes = width * height * 4  # PIL stores RGB pixels 4 bytes wide
+        results = {name: measure(fn, raw, width, height, args.repeat) for name, fn in (('frombytes(.rgb)', legacy), ('frombuffer(BGRX)', direct))}
+        for name, (seconds, python_bytes) in results.items():
+            print(f"{label:5} {name:17}: {seconds * 1000:7.1f} ms/frame, "
+                  f"{(python_bytes + pil_bytes) / 2**20:7.1f} MiB copied "
+                  f"({python_bytes / 2**20:.1f} MiB intermediate)")
+
+
+if __name__ == '__main__':
+    main()
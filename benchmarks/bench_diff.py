@@ -0,0 +1,95 @@
+"""Benchmark screenshot diffs against full frames.
+
+Applies typical UI changes to a synthetic desktop frame (a button
+highlight, a typed line of text, a dialog opening, the whole view
+scrolling) and compares, per change and tile size, the time to diff the
+raw BGRA buffers plus encode the changed regions with encoding the full
+frame, and the payload sizes.
+
+Usage:
+    python -m benchmarks.bench_diff --resolution 4K --tile-sizes 32 64 128
+"""
+
+import argparse
+import time
+
+from PIL import Image, ImageDraw
+
+from windows_mcp.screen.capture import crop_bgra
+from windows_mcp.screen.config import DIFF_FULL_FRAME_FRACTION
+from windows_mcp.screen.diff import FrameDiffer
+from windows_mcp.screen.encoding import ImageEncoder
+
+from benchmarks.bench_encode import RESOLUTIONS, synthetic_desktop
+
+
+def to_bgra(image: Image.Image) -> bytearray:
+    return bytearray(image.convert('RGBA').tobytes('raw', 'BGRA'))
+
+
+def changes(base: Image.Image) -> dict[str, Image.Image]:
+    """Edited copies of the base frame, one per kind of UI change."""
+    width, height = base.size
+    edits = {}
+
+    image = base.copy()
+    ImageDraw.Draw(image).rectangle((width // 2, height // 2, width // 2 + 120, height // 2 + 32), fill=(0, 120, 215))
+    edits['button'] = image
+
+    image = base.copy()
+    draw = ImageDraw.Draw(image)
+    for col in range(200, 1400, 9):
+        draw.rectangle((col, 600, col + 6, 612), fill=(10, 10, 10))
+    edits['typed line'] = image
+
+    image = base.copy()
+    ImageDraw.Draw(image).rectangle(
+        (width // 2 - 400, height // 2 - 250, width // 2 + 400, height // 2 + 250), fill=(250, 250, 250), outline=(0, 0, 0)
+    )
+    edits['dialog'] = image
+
+    scrolled = Image.new('RGB', base.size, (32, 96, 160))
+    scrolled.paste(base.crop((0, 40, width, height)), (0, 0))
+    edits['scroll'] = scrolled
+    return edits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolution', default='4K', choices=list(RESOLUTIONS))
+    parser.add_argument('--tile-sizes', nargs='+', type=int, default=[32, 64, 128])
+    args = parser.parse_args()
+
+    width, height = RESOLUTIONS[args.resolution]
+    base = synthetic_desktop(width, height)
+    base_raw = to_bgra(base)
+    encoder = ImageEncoder()
+
+    print(f"{'change':<11} {'tile':>4} {'diff ms':>8} {'regions':>7} {'changed':>8} "
+          f"{'encode ms':>9} {'KiB':>8} {'full ms':>8} {'full KiB':>8}")
+    for name, edited in changes(base).items():
+        raw = to_bgra(edited)
+        start = time.perf_counter()
+        full = encoder.encode(edited, 'JPEG')
+        full_time = time.perf_counter() - start
+        for tile_size in args.tile_sizes:
+            differ = FrameDiffer(tile_size)
+            differ.diff(0, base_raw, width, height)
+            start = time.perf_counter()
+            diff = differ.diff(0, raw, width, height)
+            diff_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            boxes = [r.box for r in diff.regions]
+            if diff.changed_fraction > DIFF_FULL_FRAME_FRACTION:
+                boxes = [(0, 0, width, height)]
+            tiles = encoder.encode_many([crop_bgra(raw, width, height, box) for box in boxes], 'JPEG')
+            encode_time = time.perf_counter() - start
+            print(f"{name:<11} {tile_size:4d} {diff_time * 1000:8.1f} {len(diff.regions):7d} "
+                  f"{diff.changed_fraction:8.1%} {encode_time * 1000:9.1f} "
+                  f"{sum(len(data) for data in tiles) / 1024:8.0f} {full_time * 1000:8.1f} {len(full) / 1024:8.0f}")
+    encoder.shutdown()
+
+
+if __name__ == '__main__':
+    main()
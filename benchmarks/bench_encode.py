@@ -0,0 +1,117 @@
+"""Benchmark screenshot encoding settings on synthetic desktop images.
+
+Runs a matrix over resolution, format, JPEG quality and ``optimize`` and
+reports encode time and output size, then compares encoding large frames
+whole on the calling thread with ImageEncoder's parallel tiles.
+
+The synthetic frames mimic a desktop: flat window panels, title bars, rows
+of small high-contrast "text" glyphs and a photo-like noisy region, so
+compression ratios land near those of real screenshots.
+
+Usage:
+    python -m benchmarks.bench_encode --repeat 3
+    python -m benchmarks.bench_encode --resolutions 1080p 4K --formats JPEG
+"""
+
+import argparse
+import random
+import time
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from windows_mcp.screen.config import ENCODE_TILE_SIZE
+from windows_mcp.screen.encoding import ImageEncoder
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160),
+    '8K': (7680, 4320),
+    # Two 4K monitors side by side, as captured with monitor=0
+    '2x4K': (7680, 2160),
+}
+
+
+def synthetic_desktop(width: int, height: int, seed: int = 0) -> Image.Image:
+    """Draw a desktop-like frame of windows, text rows and a noisy photo region."""
+    rng = random.Random(seed)
+    image = Image.new('RGB', (width, height), (32, 96, 160))
+    draw = ImageDraw.Draw(image)
+    for _ in range(max(4, width * height // 400_000)):
+        w, h = rng.randint(width // 6, width // 2), rng.randint(height // 6, height // 2)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        draw.rectangle((x, y, x + w, y + h), fill=(243, 243, 243), outline=(120, 120, 120))
+        draw.rectangle((x, y, x + w, y + 30), fill=(rng.randint(0, 255), rng.randint(0, 255), 200))
+        for row in range(y + 44, y + h - 12, 20):
+            col = x + 12
+            while col < x + w - 20:
+                glyph = rng.randint(4, 9)
+                draw.rectangle((col, row, col + glyph, row + 11), fill=(20, 20, 20))
+                col += glyph + (rng.randint(8, 14) if rng.random() < 0.2 else 2)
+    pw, ph = width // 4, height // 4
+    noise = Image.effect_noise((pw, ph), 48).convert('RGB')
+    image.paste(Image.blend(noise, Image.new('RGB', (pw, ph), (180, 120, 60)), 0.5), (width - pw - 20, 40))
+    return image
+
+
+def best_time(func, repeat: int) -> tuple[float, object]:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def encode(image: Image.Image, **options) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per cell; the best is reported')
+    parser.add_argument('--resolutions', nargs='+', default=['1080p', '4K', '8K'], choices=list(RESOLUTIONS))
+    parser.add_argument('--formats', nargs='+', default=['JPEG', 'PNG'], choices=['JPEG', 'PNG'])
+    parser.add_argument('--qualities', nargs='+', type=int, default=[60, 85])
+    parser.add_argument('--workers', type=int, default=4, help='encoder threads for the tiled comparison')
+    args = parser.parse_args()
+
+    frames = {name: synthetic_desktop(*RESOLUTIONS[name]) for name in args.resolutions}
+
+    print(f"{'resolution':<10} {'format':<6} {'quality':>7} {'optimize':>8} {'ms':>9} {'KiB':>9}")
+    for name, image in frames.items():
+        for image_format in args.formats:
+            if image_format == 'JPEG':
+                cells = [({'quality': q, 'optimize': o}, q, o) for q in args.qualities for o in (False, True)]
+            else:
+                cells = [({'compress_level': 1}, 1, False), ({'compress_level': 6}, 6, False),
+                         ({'optimize': True}, 9, True)]
+            for options, quality, optimize in cells:
+                elapsed, data = best_time(lambda: encode(image, format=image_format, **options), args.repeat)
+                label = quality if image_format == 'JPEG' else f"z{quality}"
+                print(f"{name:<10} {image_format:<6} {label:>7} {str(optimize):>8} "
+                      f"{elapsed * 1000:9.1f} {len(data) / 1024:9.0f}")
+
+    encoder = ImageEncoder(workers=args.workers)
+    print()
+    for profile in encoder.profiles.values():
+        print(f"profile {profile.name}: {profile.save_options('JPEG')} / {profile.save_options('PNG')}")
+    print(f"{'resolution':<10} {'format':<6} {'profile':<7} {'whole ms':>9} "
+          f"{'tiled ms':>9} {'tiles':>5} {'whole KiB':>10} {'tiled KiB':>10}")
+    big = {name: frames.get(name) or synthetic_desktop(*RESOLUTIONS[name]) for name in ('4K', '2x4K', '8K')}
+    for name, image in big.items():
+        for image_format in args.formats:
+            for profile in encoder.profiles:
+                whole, data = best_time(lambda: encoder.encode(image, image_format, profile), args.repeat)
+                tiled, tiles = best_time(
+                    lambda: encoder.encode_tiles(image, image_format, profile, tile_size=ENCODE_TILE_SIZE), args.repeat
+                )
+                print(f"{name:<10} {image_format:<6} {profile:<7} {whole * 1000:9.1f} {tiled * 1000:9.1f} "
+                      f"{len(tiles):5d} {len(data) / 1024:10.0f} {sum(len(t.data) for t in tiles) / 1024:10.0f}")
+    encoder.shutdown()
+
+
+if __name__ == '__main__':
+    main()
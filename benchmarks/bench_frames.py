@@ -0,0 +1,99 @@
+"""Benchmark the screenshot frame cache on repeated and changing frames.
+
+Simulates tool_screenshot saving to a temp file: each call hashes the raw
+BGRA capture and, on a miss, converts, encodes and writes it. Repeated
+calls on an unchanged screen are compared with the same work done without
+the cache, and a run of distinct frames checks that memory and disk stay
+within the configured bounds. Also times the candidate digest algorithms.
+
+Usage:
+    python -m benchmarks.bench_frames --calls 20 --resolution 4K
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from windows_mcp.screen.capture import image_from_bgra
+from windows_mcp.screen.encoding import ImageEncoder
+from windows_mcp.screen.frames import FrameCache
+
+from benchmarks.bench_encode import RESOLUTIONS, synthetic_desktop
+
+
+def bgra_frame(width: int, height: int, seed: int) -> bytearray:
+    """Raw BGRA buffer of a synthetic desktop, like mss returns."""
+    return bytearray(synthetic_desktop(width, height, seed).convert('RGBA').tobytes('raw', 'BGRA'))
+
+
+def save_frame(encoder: ImageEncoder, raw: bytearray, width: int, height: int, directory: str, n: int) -> tuple[bytes, str]:
+    data = encoder.encode(image_from_bgra(raw, width, height), 'JPEG')
+    path = os.path.join(directory, f"frame_{n}.jpg")
+    with open(path, 'wb') as f:
+        f.write(data)
+    return data, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20, help='screenshots taken of the unchanged screen')
+    parser.add_argument('--resolution', default='4K', choices=list(RESOLUTIONS))
+    parser.add_argument('--distinct', type=int, default=40, help='frames for the eviction run, every other one a repeat')
+    args = parser.parse_args()
+
+    width, height = RESOLUTIONS[args.resolution]
+    raw = bgra_frame(width, height, seed=0)
+    encoder = ImageEncoder()
+
+    print(f"digest of one {args.resolution} BGRA frame ({len(raw) / 2 ** 20:.0f} MiB):")
+    for algorithm in ('sha256', 'sha1', 'blake2b', 'md5'):
+        start = time.perf_counter()
+        for _ in range(5):
+            hashlib.new(algorithm, memoryview(raw)).digest()
+        print(f"  {algorithm:<8} {(time.perf_counter() - start) / 5 * 1000:6.1f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for n in range(args.calls):
+            save_frame(encoder, raw, width, height, directory, n)
+        uncached = (time.perf_counter() - start) / args.calls
+
+        cache = FrameCache()
+        written = len(os.listdir(directory))
+        start = time.perf_counter()
+        for n in range(args.calls):
+            key = (cache.digest(raw), 'JPEG', 'fast', 85)
+            cached = cache.get(key)
+            if cached is None or cached.path is None:
+                data, path = save_frame(encoder, raw, width, height, directory, n)
+                cache.put(key, data, path=path)
+        cached_time = (time.perf_counter() - start) / args.calls
+        files = len(os.listdir(directory)) - written
+        print(f"\n{args.calls} screenshots of an unchanged {args.resolution} screen:")
+        print(f"  without cache: {uncached * 1000:7.1f} ms/call, {args.calls} files written")
+        print(f"  with cache:    {cached_time * 1000:7.1f} ms/call, {files} files written, stats {cache.stats()}")
+
+        spool = os.path.join(directory, 'bounded')
+        os.mkdir(spool)
+
+        small = FrameCache(max_entries=8, max_bytes=4 * 2 ** 20, max_disk_bytes=12 * 2 ** 20)
+        frames = [bgra_frame(1920, 1080, seed) for seed in range(1, 4)]
+        for n in range(args.distinct):
+            frame = frames[n % len(frames)] if n % 2 else bgra_frame(1920, 1080, 100 + n)
+            key = (small.digest(frame), 'JPEG', 'fast', 85)
+            if small.get(key) is None:
+                data, path = save_frame(encoder, frame, 1920, 1080, spool, n)
+                small.put(key, data, path=path)
+        stats = small.stats()
+        on_disk = sum(os.path.getsize(os.path.join(spool, name)) for name in os.listdir(spool))
+        print(f"\n{args.distinct} 1080p frames, half of them repeats, into a cache bounded at "
+              f"8 entries / 4 MiB memory / 12 MiB disk:")
+        print(f"  {stats}")
+        print(f"  files left on disk: {on_disk / 2 ** 20:.1f} MiB")
+    encoder.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark process-name lookups with and without the shared process cache.
+
+Simulates repeated desktop scans (one browser check per app window) and
+window listings (one name per window) against the PIDs of processes
+running locally, counting the psutil name lookups made.
+
+Usage:
+    python -m benchmarks.bench_processes --rounds 50 --windows 40
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import psutil
+
+from windows_mcp.desktop.config import BROWSER_NAMES
+from windows_mcp.desktop.processes import ProcessCache
+
+lookups = Counter()
+_process_name = psutil.Process.name
+
+
+def counted_name(self):
+    """psutil.Process.name, counting each call."""
+    lookups['name'] += 1
+    return _process_name(self)
+
+
+def uncached_name(pid: int):
+    """The lookup the scan and window tools made before the cache."""
+    try:
+        return psutil.Process(pid).name()
+    except psutil.Error:
+        return None
+
+
+def run(rounds: int, pids: list[int], name_of) -> float:
+    """Run scan-plus-listing rounds and return the elapsed seconds."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        # Tree scan: is_app_browser for each app window (with one retry's worth of repeats)
+        for pid in pids[:5] * 2:
+            name_of(pid) in BROWSER_NAMES
+        # list_windows: one name per window
+        for pid in pids:
+            name_of(pid)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--windows', type=int, default=40, help='Distinct processes owning windows')
+    args = parser.parse_args()
+
+    pids = psutil.pids()[:args.windows]
+    psutil.Process.name = counted_name
+    try:
+        lookups.clear()
+        before = run(args.rounds, pids, uncached_name)
+        before_lookups = lookups['name']
+
+        cache = ProcessCache()
+        lookups.clear()
+        after = run(args.rounds, pids, cache.name)
+        after_lookups = lookups['name']
+    finally:
+        psutil.Process.name = _process_name
+
+    print(f"{args.rounds} rounds over {len(pids)} local processes")
+    print(f"without cache: {before_lookups:6} name lookups, {before * 1000:8.1f} ms")
+    print(f"with cache:    {after_lookups:6} name lookups, {after * 1000:8.1f} ms; cache stats {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
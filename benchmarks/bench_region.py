@@ -0,0 +1,67 @@
+"""Benchmark focused captures against full-screen captures.
+
+A full-screen check converts and encodes every pixel of the screen, and
+Desktop.get_screenshot also downscales them. A region, window or element
+capture grabs, converts and encodes only the target's pixels. mss is not
+needed: the captures are synthetic BGRA buffers of the sizes mss would
+return. The grab itself scales with the pixel count as well, but it is
+not included here.
+
+Usage:
+    python -m benchmarks.bench_region --resolution 4K
+"""
+
+import argparse
+import time
+
+from PIL import Image
+
+from windows_mcp.screen.capture import image_from_bgra
+from windows_mcp.screen.encoding import ImageEncoder
+
+from benchmarks.bench_encode import RESOLUTIONS, synthetic_desktop
+
+# (label, width, height) of typical focused capture targets
+TARGETS = [
+    ('window', 1280, 800),
+    ('dialog', 640, 420),
+    ('element', 240, 40),
+]
+
+
+def measure(encoder: ImageEncoder, image: Image.Image, scale: float = 1.0, repeat: int = 5) -> tuple[float, int]:
+    """Return (best seconds, encoded bytes) to convert, scale and encode a capture of the image."""
+    raw = image.convert('RGBA').tobytes('raw', 'BGRA')
+    best, size = float('inf'), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        img = image_from_bgra(raw, image.width, image.height)
+        if scale != 1.0:
+            img = img.resize((int(img.width * scale), int(img.height * scale)), Image.Resampling.LANCZOS)
+        size = len(encoder.encode(img, 'JPEG'))
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolution', default='4K', choices=list(RESOLUTIONS))
+    args = parser.parse_args()
+
+    width, height = RESOLUTIONS[args.resolution]
+    screen = synthetic_desktop(width, height)
+    encoder = ImageEncoder()
+
+    print(f"{'capture':<22} {'pixels':>10} {'ms':>8} {'KiB':>8}")
+    for label, scale in ((f'full {args.resolution}', 1.0), (f'full {args.resolution} scaled 0.7', 0.7)):
+        elapsed, size = measure(encoder, screen, scale)
+        print(f"{label:<22} {width * height:10d} {elapsed * 1000:8.2f} {size / 1024:8.0f}")
+    for label, w, h in TARGETS:
+        region = screen.crop((width // 4, height // 4, width // 4 + w, height // 4 + h))
+        elapsed, size = measure(encoder, region)
+        print(f"{label + f' {w}x{h}':<22} {w * h:10d} {elapsed * 1000:8.2f} {size / 1024:8.0f}")
+    encoder.shutdown()
+
+
+if __name__ == '__main__':
+    main()
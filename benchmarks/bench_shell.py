@@ -0,0 +1,64 @@
+"""Benchmark the persistent shell host against one process per command.
+
+PowerShell is not available everywhere, so the host is measured with
+``sh`` and Python workers. The saving per command is the interpreter
+start-up. ``sh`` starts in about a millisecond, and its host loop forks
+base64 helpers for every command, so it mainly exercises the protocol.
+Python's start-up is closer to (though still well below) PowerShell's
+and shows the saving.
+
+Usage:
+    python -m benchmarks.bench_shell --commands 500
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from windows_mcp.desktop.shell import ShellHost, python_transport, sh_transport
+
+# (name, one-off command line prefix, host transport factory, command)
+DIALECTS = [
+    ('sh', ['sh', '-c'], sh_transport, 'echo "request $((6 * 7))"'),
+    ('python', [sys.executable, '-c'], python_transport, 'print("request", 6 * 7)'),
+]
+
+
+def bench_one_off(prefix: list[str], command: str, count: int) -> float:
+    """Return seconds per command when starting a process for each one."""
+    start = time.perf_counter()
+    for _ in range(count):
+        subprocess.run(prefix + [command], capture_output=True, text=True, timeout=25)
+    return (time.perf_counter() - start) / count
+
+
+def bench_host(transport_factory, command: str, count: int) -> tuple[float, dict]:
+    """Return seconds per command on a persistent host, and its stats."""
+    host = ShellHost(transport_factory)
+    host.execute(command)  # Start the worker outside the measurement
+    start = time.perf_counter()
+    for _ in range(count):
+        output, status = host.execute(command)
+        assert status == 0 and output.strip() == "request 42", (output, status)
+    elapsed = (time.perf_counter() - start) / count
+    stats = host.stats()
+    host.close()
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--commands', type=int, default=500, help='Sequential commands per measurement')
+    args = parser.parse_args()
+
+    for name, prefix, transport_factory, command in DIALECTS:
+        one_off = bench_one_off(prefix, command, args.commands)
+        hosted, stats = bench_host(transport_factory, command, args.commands)
+        print(f"{name:6}: one process per command {one_off * 1000:7.2f} ms ({1 / one_off:7.0f}/s), "
+              f"persistent host {hosted * 1000:6.2f} ms ({1 / hosted:7.0f}/s), "
+              f"{one_off / hosted:5.1f}x; host stats {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the screenshot spool over a long session.
+
+Writes a stream of screenshot-sized files into an unmanaged directory,
+as tool_screenshot did, and into a ScreenshotSpool with the same stream,
+then compares write latency, what is left on disk and the cost of listing
+the directory. A second spool opened on the same directory, seeded with
+an interrupted write, checks the startup cleanup.
+
+Usage:
+    python -m benchmarks.bench_spool --writes 2000 --size 300000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from windows_mcp.screen.spool import PARTIAL_SUFFIX, ScreenshotSpool
+
+
+def listing_time(directory: str) -> float:
+    start = time.perf_counter()
+    for _ in range(20):
+        sum(entry.stat().st_size for entry in os.scandir(directory))
+    return (time.perf_counter() - start) / 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writes', type=int, default=2000, help='screenshots written during the session')
+    parser.add_argument('--size', type=int, default=300_000, help='bytes per screenshot')
+    parser.add_argument('--max-files', type=int, default=200)
+    parser.add_argument('--max-mb', type=int, default=32)
+    args = parser.parse_args()
+
+    data = os.urandom(args.size)
+    with tempfile.TemporaryDirectory() as root:
+        unmanaged = os.path.join(root, 'unmanaged')
+        os.mkdir(unmanaged)
+        start = time.perf_counter()
+        for n in range(args.writes):
+            with open(os.path.join(unmanaged, f"windows_mcp_screen_{n}.jpg"), 'wb') as f:
+                f.write(data)
+        plain = (time.perf_counter() - start) / args.writes
+
+        spool = ScreenshotSpool(os.path.join(root, 'spool'), max_bytes=args.max_mb * 2 ** 20, max_files=args.max_files)
+        start = time.perf_counter()
+        for _ in range(args.writes):
+            spool.write(data, 'windows_mcp_screen', 'jpg')
+        spooled = (time.perf_counter() - start) / args.writes
+        stats = spool.stats()
+
+        print(f"{args.writes} screenshots of {args.size / 1024:.0f} KiB:")
+        print(f"  unmanaged: {plain * 1000:6.3f} ms/write, {len(os.listdir(unmanaged))} files, "
+              f"{args.writes * args.size / 2 ** 20:.0f} MiB left, listing {listing_time(unmanaged) * 1000:.2f} ms")
+        print(f"  spool:     {spooled * 1000:6.3f} ms/write, {stats['files']} files, "
+              f"{stats['bytes'] / 2 ** 20:.0f} MiB left, listing {listing_time(spool.directory) * 1000:.2f} ms")
+        print(f"  spool stats: {stats}")
+
+        partial = os.path.join(spool.directory, 'interrupted.jpg' + PARTIAL_SUFFIX)
+        with open(partial, 'wb') as f:
+            f.write(data[:1000])
+        os.utime(partial, (time.time() - 3600, time.time() - 3600))
+        restarted = ScreenshotSpool(spool.directory, max_bytes=args.max_mb * 2 ** 20, max_files=args.max_files // 2)
+        start = time.perf_counter()
+        restarted.open()
+        print(f"\nrestart with half the file limit: open() took {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"stats {restarted.stats()}, partial file left: {os.path.exists(partial)}")
+
+
+if __name__ == '__main__':
+    main()
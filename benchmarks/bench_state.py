@@ -0,0 +1,61 @@
+"""Benchmark the memory and rendering cost of TreeState representations.
+
+Usage:
+    python -m benchmarks.bench_state
+    python -m benchmarks.bench_state --elements 500000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from windows_mcp.tree.columnar import compact_state
+from windows_mcp.tree.synthetic import generate_synthetic_state
+from windows_mcp.tree.views import TreeState
+
+
+def measure(build) -> tuple[object, int]:
+    """Return build()'s result and the bytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def render_time(state: TreeState, page_size: int) -> tuple[float, float]:
+    """Time rendering one page and the full interactive table."""
+    start = time.perf_counter()
+    state.interactive_elements_to_string(range(page_size))
+    page = time.perf_counter() - start
+    start = time.perf_counter()
+    state.interactive_elements_to_string()
+    full = time.perf_counter() - start
+    return page, full
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--elements', type=int, default=100_000, help='Interactive elements in the state')
+    parser.add_argument('--page-size', type=int, default=200)
+    args = parser.parse_args()
+
+    rows, row_bytes = measure(lambda: generate_synthetic_state(args.elements))
+    # The row-based state built here is transient; only the columns are retained
+    columns, column_bytes = measure(lambda: compact_state(generate_synthetic_state(args.elements)))
+    total = len(rows.interactive_nodes) + len(rows.informative_nodes) + len(rows.scrollable_nodes)
+
+    print(f"elements: {args.elements} interactive, {total} total")
+    for label, state, size in (("dataclass rows", rows, row_bytes), ("columnar", columns, column_bytes)):
+        page, full = render_time(state, args.page_size)
+        print(f"{label:15}: {size / 2**20:7.1f} MiB ({size / total:6.1f} B/element), "
+              f"{args.page_size}-row page {page * 1000:.2f} ms, full table {full * 1000:.0f} ms")
+    print(f"columnar uses {(1 - column_bytes / row_bytes) * 100:.0f}% less memory")
+
+
+if __name__ == '__main__':
+    main()
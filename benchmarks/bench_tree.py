@@ -0,0 +1,487 @@
+"""Benchmark UI tree scans against synthetic control trees.
+
+Usage:
+    python -m benchmarks.bench_tree --size 100k
+    python -m benchmarks.bench_tree --depth 6 --fan-out 8 --profile
+    python -m benchmarks.bench_tree --skewed --latency-us 200
+    python -m benchmarks.bench_tree --repeated 50
+    python -m benchmarks.bench_tree --incremental --size 100k
+    python -m benchmarks.bench_tree --identity --mutations 50
+    python -m benchmarks.bench_tree --resolve --size 100k
+    python -m benchmarks.bench_tree --scoped --size 100k
+    python -m benchmarks.bench_tree --long-list 20000
+    python -m benchmarks.bench_tree --budget 5000 --size 100k
+    python -m benchmarks.bench_tree --cancel --size 100k
+"""
+
+import argparse
+import asyncio
+import cProfile
+import gc
+import pstats
+import random
+import time
+
+from windows_mcp.tree.backend import Rect, ScrollPatternState
+from windows_mcp.tree.cancel import CancelToken, ScanCancelled
+from windows_mcp.tree.events import PROPERTY_CHANGED, STRUCTURE_CHANGED, ScriptedEventSource, TreeEvent
+from windows_mcp.tree.pool import TraversalPool
+from windows_mcp.tree.service import Tree
+from windows_mcp.tree.synthetic import (
+    SyntheticBackend,
+    SyntheticControl,
+    count_nodes,
+    generate_synthetic_tree
+)
+from windows_mcp.tree.views import ScanBudget, ScanScope
+from windows_mcp.tree.walker import TreeWalker
+
+# (depth, fan_out) presets giving roughly the named node counts per app window
+SIZE_PRESETS = {
+    '10k': (5, 6),
+    '100k': (6, 7),
+    '500k': (6, 9),
+}
+
+
+def build_backend(depth: int, fan_out: int, seed: int = 0) -> tuple[SyntheticBackend, int]:
+    """Generate a synthetic tree and wrap it in a backend."""
+    root = generate_synthetic_tree(depth=depth, fan_out=fan_out, include_taskbar=True, seed=seed)
+    return SyntheticBackend(root), count_nodes(root)
+
+
+def bench_scan(backend: SyntheticBackend, repeat: int = 3, prefetch: bool = True) -> list[float]:
+    """Time full scans of the backend's tree."""
+    tree = Tree(backend=backend, prefetch=prefetch)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tree.get_state(force_refresh=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def count_scan_calls(backend: SyntheticBackend, prefetch: bool) -> int:
+    """Return the backend requests made by one full scan."""
+    backend.reset_calls()
+    Tree(backend=backend, prefetch=prefetch).get_state(force_refresh=True)
+    return backend.call_count()
+
+
+def build_skewed_backend(depth: int, fan_out: int, latency: float) -> tuple[SyntheticBackend, int]:
+    """A single huge foreground app, like a browser DOM, and nothing else."""
+    root = generate_synthetic_tree(depth=depth, fan_out=fan_out)
+    return SyntheticBackend(root, latency=latency), count_nodes(root)
+
+
+def bench_workers(backend: SyntheticBackend, worker_counts: list[int]):
+    """Compare live-read scans with different walker worker counts."""
+    for workers in worker_counts:
+        tree = Tree(backend=backend, prefetch=False)
+        tree.walker = TreeWalker(backend, workers=workers)
+        start = time.perf_counter()
+        tree.get_state(force_refresh=True)
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers}: {elapsed * 1000:.1f} ms, nodes per worker {sorted(tree.walker.last_worker_counts)}")
+
+
+def bench_repeated(backend: SyntheticBackend, scans: int) -> tuple[float, float]:
+    """Mean scan latency with a fresh Tree per scan, without and with a shared pool.
+
+    Mirrors get_desktop_state, which used to build a Tree (and its thread
+    pools) on every call.
+    """
+    results = []
+    for pool in (None, TraversalPool(initializer=backend.initialize_thread)):
+        start = time.perf_counter()
+        for _ in range(scans):
+            Tree(backend=backend, prefetch=False, pool=pool).get_state(force_refresh=True)
+        results.append((time.perf_counter() - start) / scans)
+        if pool is not None:
+            pool.shutdown()
+    return results[0], results[1]
+
+
+def bench_incremental(backend: SyntheticBackend, prefetch: bool):
+    """Compare a full rescan with an event-driven refresh after one small change.
+
+    The change adds a button to one dialog-sized pane and renames one field,
+    which is what a typical agent step does.
+    """
+    app = backend.root.GetChildren()[0]
+    pane = app.GetChildren()[0].GetChildren()[0]
+    field = app.GetChildren()[-1].GetChildren()[-1]
+    events = ScriptedEventSource([[
+        TreeEvent(STRUCTURE_CHANGED, pane.GetRuntimeId()),
+        TreeEvent(PROPERTY_CHANGED, field.GetRuntimeId(), 'Name'),
+    ]])
+    tree = Tree(backend=backend, prefetch=prefetch, event_source=events)
+    tree.get_state(force_refresh=True)
+
+    pane.add_child(SyntheticControl('ButtonControl', Rect(10, 10, 200, 40), name="Added"))
+    field.set_name("Renamed")
+    events.advance()
+
+    backend.reset_calls()
+    start = time.perf_counter()
+    tree.get_state()
+    incremental = time.perf_counter() - start
+    incremental_calls = backend.call_count()
+
+    backend.reset_calls()
+    start = time.perf_counter()
+    Tree(backend=backend, prefetch=prefetch).get_state(force_refresh=True)
+    full = time.perf_counter() - start
+
+    print(f"prefetch={prefetch!s:5}: full rescan {full * 1000:.1f} ms / {backend.call_count()} calls, "
+          f"incremental {incremental * 1000:.2f} ms / {incremental_calls} calls")
+
+
+def mutate_tree(root: SyntheticControl, mutations: int, seed: int = 0) -> int:
+    """Insert, remove and rename random controls, as apps do between scans.
+
+    Inserts go before existing siblings, so they shift the paths of every
+    later sibling. Returns the number of controls removed.
+    """
+    rng = random.Random(seed)
+    containers = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node._children:
+            containers.append(node)
+            stack.extend(node._children)
+    removed = 0
+    for _ in range(mutations):
+        parent = rng.choice(containers[1:])
+        action = rng.choice(('insert', 'remove', 'rename'))
+        if action == 'insert':
+            rect = parent._children[0]._rect
+            parent.add_child(SyntheticControl('ButtonControl', rect, name=f"Inserted {rng.random():.6f}"), index=0)
+        elif action == 'remove' and len(parent._children) > 1:
+            parent.remove_child(rng.choice(parent._children))
+            removed += 1
+        else:
+            child = rng.choice(parent._children)
+            child.set_name(f"{child._name} (renamed)")
+    return removed
+
+
+def bench_identity(depth: int, fan_out: int, mutations: int):
+    """Check that labels from a stale snapshot still resolve after the tree mutates."""
+    backend, nodes = build_backend(depth, fan_out)
+    tree = Tree(backend=backend)
+    before = tree.get_state(force_refresh=True)
+    removed = mutate_tree(backend.root, mutations)
+    after = tree.get_state(force_refresh=True)
+
+    def same(a, b) -> bool:
+        return (a.app_name, a.control_type, a.name, a.bounding_box) == (b.app_name, b.control_type, b.name, b.bounding_box)
+
+    start = time.perf_counter()
+    index = after.element_index()
+    built = time.perf_counter() - start
+
+    resolved = by_fingerprint = wrong = 0
+    start = time.perf_counter()
+    for element in before.interactive_nodes:
+        label = index.resolve(element)
+        if label is None:
+            continue
+        resolved += 1
+        by_fingerprint += index.find(element.fingerprint) is not None
+        wrong += (after.interactive_nodes[label].name, after.interactive_nodes[label].control_type) != (element.name, element.control_type)
+    lookups = time.perf_counter() - start
+
+    total = len(before.interactive_nodes)
+    shifted = sum(
+        1 for label, element in enumerate(before.interactive_nodes)
+        if label >= len(after.interactive_nodes) or not same(element, after.interactive_nodes[label])
+    )
+    print(f"tree: {nodes} nodes, {mutations} mutations ({removed} removals), "
+          f"{total} -> {len(after.interactive_nodes)} interactive elements")
+    print(f"positional labels: {shifted} ({shifted / total * 100:.1f}%) now point at a different element")
+    print(f"fingerprints: {resolved} resolved ({by_fingerprint} by fingerprint, {resolved - by_fingerprint} by bounds), "
+          f"{total - resolved} gone, {wrong} mismatched")
+    print(f"index build {built * 1000:.2f} ms, {lookups / total * 1e6:.2f} us/lookup")
+
+
+def bench_resolve(depth: int, fan_out: int, samples: int = 200, seed: int = 0):
+    """Compare re-resolving single elements with rescanning the desktop.
+
+    Each sampled element's control is moved, and every other one also gets
+    a sibling inserted before it, so the refreshed bounds and the sibling
+    search are both exercised.
+    """
+    backend, nodes = build_backend(depth, fan_out)
+    tree = Tree(backend=backend)
+    state = tree.get_state(force_refresh=True)
+    rng = random.Random(seed)
+    labels = rng.sample(range(len(state.interactive_nodes)), min(samples, len(state.interactive_nodes)))
+
+    def control_at(path: tuple) -> SyntheticControl:
+        node = backend.root._children[[w._handle for w in backend.root._children].index(state.app_windows[path[0]])]
+        for index in path[1:]:
+            node = node._children[index]
+        return node
+
+    targets = [control_at(state.interactive_nodes[label].path) for label in labels]
+    for n, control in enumerate(targets):
+        rect = control._rect
+        control._rect = Rect(rect.left + 5, rect.top, rect.right + 5, rect.bottom)
+        if n % 2:
+            control._parent.add_child(SyntheticControl('TextControl', rect, name="Inserted"), index=0)
+
+    backend.reset_calls()
+    start = time.perf_counter()
+    found = 0
+    for label, control in zip(labels, targets):
+        fresh = tree.refresh_element(state, label)
+        found += fresh is not None and fresh.bounding_box.left == control._rect.left
+    elapsed = (time.perf_counter() - start) / len(labels)
+    calls = backend.call_count() / len(labels)
+
+    print(f"tree: {nodes} nodes, {len(state.interactive_nodes)} interactive elements")
+    print(f"re-resolve: {found}/{len(labels)} found at their new bounds "
+          f"(the rest were not found within the shift search), "
+          f"{calls:.1f} calls and {elapsed * 1e6:.0f} us per element")
+    for prefetch in (False, True):
+        backend.reset_calls()
+        start = time.perf_counter()
+        Tree(backend=backend, prefetch=prefetch).get_state(force_refresh=True)
+        full = time.perf_counter() - start
+        print(f"full rescan (prefetch={prefetch}): {backend.call_count()} calls, {full * 1000:.1f} ms")
+
+
+def bench_scoped(depth: int, fan_out: int, prefetch: bool = False):
+    """Compare a desktop scan with scans scoped to one window or a region."""
+    backend, nodes = build_backend(depth, fan_out)
+    app = backend.root.GetChildren()[0]
+    scopes = {
+        'desktop': None,
+        'one window': ScanScope(window_handle=app.NativeWindowHandle),
+        'top-left quarter': ScanScope(region=(0, 0, 960, 540)),
+    }
+    print(f"tree: depth={depth} fan_out={fan_out} nodes={nodes} prefetch={prefetch}")
+    for label, scope in scopes.items():
+        tree = Tree(backend=backend, prefetch=prefetch)
+        backend.reset_calls()
+        start = time.perf_counter()
+        state = tree.get_state(force_refresh=True, scope=scope)
+        elapsed = time.perf_counter() - start
+        print(f"{label:17}: {elapsed * 1000:8.1f} ms, {backend.call_count():8} calls, "
+              f"{len(state.interactive_nodes)} interactive elements")
+
+
+def build_long_list_backend(rows: int, row_height: int = 30) -> SyntheticBackend:
+    """Build a window holding one long list whose rows mostly lie below the screen.
+
+    Every row has a label and a button. A multi-line edit control with
+    offscreen lines is added too, to exercise the culling exemption.
+    """
+    root = SyntheticControl('PaneControl', Rect(0, 0, 1920, 1080), name="Desktop", class_name="#32769")
+    window = root.add_child(SyntheticControl(
+        'WindowControl', Rect(0, 0, 1920, 1040), name="Long List", class_name="LongList",
+        process_id=1000, handle=0x10000
+    ))
+    editor = window.add_child(SyntheticControl('EditControl', Rect(0, 0, 960, 200), name="Notes", process_id=1000))
+    for line in range(20):
+        top = line * row_height
+        editor.add_child(SyntheticControl(
+            'ButtonControl', Rect(8, top, 200, top + row_height), name=f"Line action {line}",
+            is_offscreen=top >= 1080, process_id=1000
+        ))
+    items = window.add_child(SyntheticControl(
+        'ListControl', Rect(0, 200, 1920, 1040), name="Items", process_id=1000,
+        scroll=ScrollPatternState(horizontal=False, vertical=True)
+    ))
+    for index in range(rows):
+        top = 200 + index * row_height
+        offscreen = top >= 1080
+        row = items.add_child(SyntheticControl(
+            'ListItemControl', Rect(0, top, 1920, top + row_height), name=f"Item {index}",
+            is_offscreen=offscreen, process_id=1000
+        ))
+        row.add_child(SyntheticControl(
+            'TextControl', Rect(8, top, 600, top + row_height), name=f"Item {index} title",
+            is_offscreen=offscreen, process_id=1000
+        ))
+        row.add_child(SyntheticControl(
+            'ButtonControl', Rect(1800, top, 1900, top + row_height), name="Open",
+            is_offscreen=offscreen, process_id=1000
+        ))
+    return SyntheticBackend(root)
+
+
+def bench_long_list(rows: int, repeat: int = 3):
+    """Compare scans of a mostly offscreen list with and without viewport culling."""
+    backend = build_long_list_backend(rows)
+    print(f"long list: {rows} rows, {count_nodes(backend.root)} nodes")
+    results = {}
+    for cull in (False, True):
+        for prefetch in (False, True):
+            tree = Tree(backend=backend, prefetch=prefetch, cull=cull)
+            backend.reset_calls()
+            state = tree.get_state(force_refresh=True)
+            calls = backend.call_count()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                tree.get_state(force_refresh=True)
+                timings.append(time.perf_counter() - start)
+            results[cull, prefetch] = [node.to_row(0) for node in state.interactive_nodes]
+            print(f"cull={cull!s:5} prefetch={prefetch!s:5}: {calls:7} calls, best {min(timings) * 1000:8.1f} ms, "
+                  f"{len(state.interactive_nodes)} interactive elements")
+    same = all(results[True, prefetch] == results[False, prefetch] for prefetch in (False, True))
+    print(f"culled scans report the same interactive elements: {same}")
+
+
+def bench_budget(depth: int, fan_out: int, max_nodes: int, latency: float):
+    """Compare unbounded scans with node- and time-budgeted ones."""
+    root = generate_synthetic_tree(depth=depth, fan_out=fan_out, include_taskbar=True)
+    backend = SyntheticBackend(root, latency=latency)
+    print(f"tree: depth={depth} fan_out={fan_out} nodes={count_nodes(root)} latency={latency * 1e6:.0f}us")
+    unbounded = Tree(backend=backend, prefetch=False, cull=False, budget=ScanBudget())
+    start = time.perf_counter()
+    state = unbounded.get_state(force_refresh=True)
+    full_time = time.perf_counter() - start
+    print(f"{'unbounded':22}: {full_time * 1000:8.1f} ms, {len(state.interactive_nodes)} interactive elements")
+    budgets = {
+        f'max_nodes={max_nodes}': ScanBudget(max_nodes=max_nodes),
+        f'time_limit={full_time / 4:.3f}s': ScanBudget(time_limit=full_time / 4),
+        'max_depth=3': ScanBudget(max_depth=3),
+    }
+    for label, budget in budgets.items():
+        tree = Tree(backend=backend, prefetch=False, cull=False, budget=budget)
+        start = time.perf_counter()
+        state = tree.get_state(force_refresh=True)
+        elapsed = time.perf_counter() - start
+        depths = [len(node.path) - 1 for node in state.interactive_nodes]
+        print(f"{label:22}: {elapsed * 1000:8.1f} ms, {len(state.interactive_nodes)} interactive elements, "
+              f"deepest {max(depths, default=0)}")
+        if state.truncation is not None:
+            print("    " + state.truncation.to_string().replace("\n", "\n    "))
+
+
+def bench_cancel(depth: int, fan_out: int, latency: float, cancel_after: float = 0.2):
+    """Run a scan off the event loop, measure loop responsiveness, then cancel it."""
+    root = generate_synthetic_tree(depth=depth, fan_out=fan_out, include_taskbar=True)
+    # Keep full collections of the synthetic tree from pausing every thread mid-measurement
+    gc.freeze()
+    backend = SyntheticBackend(root, latency=latency)
+    tree = Tree(backend=backend, prefetch=False, budget=ScanBudget())
+    print(f"tree: depth={depth} fan_out={fan_out} nodes={count_nodes(root)} latency={latency * 1e6:.0f}us")
+
+    async def scan_and_cancel():
+        cancel = CancelToken()
+        loop = asyncio.get_running_loop()
+        scan = loop.run_in_executor(None, lambda: tree.get_state(force_refresh=True, cancel=cancel))
+        # Stand-in for lightweight requests served while the scan runs
+        lags, start = [], time.perf_counter()
+        while time.perf_counter() - start < cancel_after:
+            tick = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - tick - 0.005)
+        cancelled_at = time.perf_counter()
+        cancel.cancel("benchmark")
+        try:
+            await scan
+            outcome = "finished before cancel"
+        except ScanCancelled:
+            outcome = "cancelled"
+        stop_latency = time.perf_counter() - cancelled_at
+        lags.sort()
+        print(f"event loop served {len(lags)} ticks during the scan, median lag {lags[len(lags) // 2] * 1000:.1f} ms, "
+              f"worst {lags[-1] * 1000:.1f} ms")
+        print(f"scan {outcome}; stopped {stop_latency * 1000:.1f} ms after cancel, "
+              f"{backend.call_count()} backend calls made, cache version {tree.cache.version}")
+
+    backend.reset_calls()
+    asyncio.run(scan_and_cancel())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=sorted(SIZE_PRESETS), help='Preset tree size')
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--fan-out', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--profile', action='store_true', help='Print a cProfile report of one scan')
+    parser.add_argument('--skewed', action='store_true', help='Compare walker worker counts on a skewed tree')
+    parser.add_argument('--latency-us', type=float, default=100.0, help='Simulated latency per children request')
+    parser.add_argument('--repeated', type=int, metavar='SCANS', help='Compare repeated scans with and without a shared pool')
+    parser.add_argument('--incremental', action='store_true', help='Compare full rescans with event-driven refreshes')
+    parser.add_argument('--identity', action='store_true', help='Resolve stale labels by fingerprint after mutating the tree')
+    parser.add_argument('--mutations', type=int, default=50, help='Tree mutations between scans for --identity')
+    parser.add_argument('--resolve', action='store_true', help='Compare re-resolving single elements with a rescan')
+    parser.add_argument('--scoped', action='store_true', help='Compare desktop scans with window and region scopes')
+    parser.add_argument('--budget', type=int, metavar='NODES', help='Compare unbounded scans with budgeted ones')
+    parser.add_argument('--cancel', action='store_true', help='Cancel a scan running off the event loop')
+    parser.add_argument('--long-list', type=int, metavar='ROWS', help='Compare scans of a long list with and without culling')
+    args = parser.parse_args()
+
+    if args.long_list:
+        bench_long_list(args.long_list, args.repeat)
+        return
+    if args.repeated:
+        backend, nodes = build_backend(depth=3, fan_out=6)
+        fresh, pooled = bench_repeated(backend, args.repeated)
+        print(f"{args.repeated} scans of {nodes} nodes: fresh threads {fresh * 1000:.2f} ms/scan, "
+              f"shared pool {pooled * 1000:.2f} ms/scan ({(1 - pooled / fresh) * 100:.0f}% less)")
+        return
+
+    depth, fan_out = SIZE_PRESETS[args.size] if args.size else (args.depth, args.fan_out)
+    if args.identity:
+        bench_identity(depth, fan_out, args.mutations)
+        return
+    if args.resolve:
+        bench_resolve(depth, fan_out)
+        return
+    if args.scoped:
+        bench_scoped(depth, fan_out)
+        return
+    if args.cancel:
+        bench_cancel(depth, fan_out, args.latency_us / 1e6)
+        return
+    if args.budget:
+        bench_budget(depth, fan_out, args.budget, args.latency_us / 1e6)
+        return
+    if args.skewed:
+        backend, nodes = build_skewed_backend(depth, fan_out, args.latency_us / 1e6)
+        print(f"skewed tree: depth={depth} fan_out={fan_out} nodes={nodes} latency={args.latency_us:.0f}us")
+        bench_workers(backend, [1, 2, 4, 8])
+        return
+
+    backend, nodes = build_backend(depth, fan_out)
+    if args.incremental:
+        print(f"tree: depth={depth} fan_out={fan_out} nodes={nodes}")
+        for prefetch in (False, True):
+            bench_incremental(build_backend(depth, fan_out)[0], prefetch)
+        return
+    state = Tree(backend=backend).get_state(force_refresh=True)
+    print(f"tree: depth={depth} fan_out={fan_out} nodes={nodes}")
+    print(f"found: {len(state.interactive_nodes)} interactive, "
+          f"{len(state.informative_nodes)} informative, {len(state.scrollable_nodes)} scrollable")
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        Tree(backend=backend).get_state(force_refresh=True)
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+        return
+
+    count_scan_calls(backend, prefetch=False)
+    print("property reads per node without prefetch:")
+    for name, count in backend.calls.most_common():
+        print(f"  {name:28} {count / nodes:.3f}")
+
+    for prefetch in (False, True):
+        calls = count_scan_calls(backend, prefetch)
+        best = min(bench_scan(backend, args.repeat, prefetch))
+        print(f"prefetch={prefetch!s:5}: {calls} backend calls ({calls / nodes:.2f}/node), "
+              f"best {best * 1000:.1f} ms, {best / nodes * 1e6:.2f} us/node over {args.repeat} runs")
+
+
+if __name__ == '__main__':
+    main()
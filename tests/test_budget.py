@@ -0,0 +1,46 @@
+"""Tests for node, depth and time budgets and the truncation they report."""
+
+from windows_mcp.tree.service import Tree
+from windows_mcp.tree.synthetic import SyntheticBackend, generate_synthetic_tree
+from windows_mcp.tree.views import ScanBudget
+
+
+def scan(budget: ScanBudget, latency: float = 0.0):
+    root = generate_synthetic_tree(depth=4, fan_out=5, include_taskbar=True, seed=3)
+    return Tree(backend=SyntheticBackend(root, latency=latency), budget=budget, cull=False).get_state(force_refresh=True)
+
+
+def test_unbounded_scan_is_not_truncated():
+    assert scan(ScanBudget()).truncation is None
+
+
+def test_node_budget_stops_breadth_first():
+    full = scan(ScanBudget())
+    state = scan(ScanBudget(max_nodes=50))
+    truncation = state.truncation
+    assert truncation.reason == 'max_nodes'
+    assert truncation.visited == 50
+    assert set(truncation.pending) == {'Synthetic App 0', 'Taskbar'}
+    assert all(count > 0 for count in truncation.pending.values())
+    # The shallowest elements of every app are found first
+    shallow = {node.fingerprint for node in full.interactive_nodes if len(node.path) == 2}
+    assert shallow and shallow <= {node.fingerprint for node in state.interactive_nodes}
+    assert "node budget exhausted after 50 nodes" in truncation.to_string()
+
+
+def test_depth_limits_per_app():
+    state = scan(ScanBudget(max_depth=2, app_max_depths={'Taskbar': 1}))
+    truncation = state.truncation
+    assert truncation.reason == 'max_depth' and truncation.pending == {}
+    assert truncation.depth_limited == {'Synthetic App 0': 25, 'Taskbar': 5}
+    for node in state.interactive_nodes:
+        assert len(node.path) - 1 <= (1 if node.app_name == 'Taskbar' else 2)
+
+
+def test_time_limit_reports_deadline():
+    state = scan(ScanBudget(time_limit=0.01), latency=0.002)
+    truncation = state.truncation
+    assert truncation.reason == 'deadline'
+    assert truncation.elapsed < 0.5
+    assert sum(truncation.pending.values()) > 0
+    assert "time limit reached" in truncation.to_string()
@@ -0,0 +1,75 @@
+"""Tests for element fingerprints and state deltas across scans."""
+
+from windows_mcp.tree.backend import Rect
+from windows_mcp.tree.delta import diff_states
+from windows_mcp.tree.identity import element_fingerprint
+from windows_mcp.tree.service import Tree
+from windows_mcp.tree.synthetic import SyntheticBackend, SyntheticControl, generate_synthetic_tree
+
+
+def build_list(names: list[str]) -> tuple[SyntheticControl, SyntheticControl]:
+    """A desktop with one app window holding a list of buttons, one per row."""
+    root = SyntheticControl('PaneControl', Rect(0, 0, 1920, 1080), name="Desktop", class_name="#32769")
+    window = root.add_child(SyntheticControl(
+        'WindowControl', Rect(0, 0, 1920, 1040), name="Mail", class_name="MailApp", process_id=1000, handle=0x10000
+    ))
+    items = window.add_child(SyntheticControl('ListControl', Rect(0, 0, 1920, 1040), process_id=1000))
+    for row, name in enumerate(names):
+        items.add_child(button(name, row))
+    return root, items
+
+
+def button(name: str, row: int) -> SyntheticControl:
+    return SyntheticControl('ButtonControl', Rect(10, 15 + row * 40, 210, 45 + row * 40), name=name, process_id=1000)
+
+
+def relayout(items: SyntheticControl):
+    """Move every row to the position of its index, as a list view would."""
+    for row, child in enumerate(items._children):
+        child._rect = Rect(10, 15 + row * 40, 210, 45 + row * 40)
+
+
+def test_fingerprint_is_deterministic():
+    # Fixed value: fingerprints must not depend on the process's hash seed
+    assert element_fingerprint('Mail', 0, 'ButtonControl', 'Delete', (0, 3)) == 1456019101068051120
+    assert element_fingerprint('Mail', 0, 'ButtonControl', 'Delete', (0, 3)) != \
+        element_fingerprint('Mail', 0, 'ButtonControl', 'Delete', (0, 4))
+
+
+def test_fingerprints_repeat_across_scans():
+    root = generate_synthetic_tree(depth=3, fan_out=4, seed=3)
+    first = Tree(backend=SyntheticBackend(root)).get_state(force_refresh=True)
+    second = Tree(backend=SyntheticBackend(root)).get_state(force_refresh=True)
+    fingerprints = [node.fingerprint for node in first.interactive_nodes]
+    assert fingerprints == [node.fingerprint for node in second.interactive_nodes]
+    assert len(set(fingerprints)) == len(fingerprints)
+
+
+def test_delta_tracks_inserted_renamed_and_removed_rows():
+    root, items = build_list(["Reply", "Delete", "Archive", "Delete", "Forward"])
+    tree = Tree(backend=SyntheticBackend(root), prefetch=False)
+    old = tree.get_state(force_refresh=True)
+
+    items.add_child(button("Flag", 0), index=0)
+    items._children[3].set_name("Archive all")
+    items.remove_child(items._children[5])
+    relayout(items)
+    new = tree.get_state(force_refresh=True)
+
+    def names(state, indexes):
+        return [state.interactive_nodes[i].name for i in indexes]
+
+    delta = diff_states(old, new)
+    assert names(new, delta.interactive.added) == ["Flag", "Archive all"]
+    assert names(old, delta.interactive.removed) == ["Archive", "Forward"]
+    # Both Delete buttons and Reply shifted down one row and keep their identity
+    assert names(new, delta.interactive.moved) == ["Reply", "Delete", "Delete"]
+    assert delta.interactive.survivors == {0: 1, 1: 2, 3: 4}
+    assert delta.label_remap == {0: 1, 1: 2, 3: 4}
+
+
+def test_delta_of_unchanged_rescan_is_empty():
+    root, _ = build_list(["Reply", "Delete", "Delete"])
+    tree = Tree(backend=SyntheticBackend(root))
+    old = tree.get_state(force_refresh=True)
+    assert diff_states(old, tree.get_state(force_refresh=True)).is_empty()
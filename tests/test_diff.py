@@ -0,0 +1,35 @@
+"""Tests for screenshot frame diffs and the bounded frame store."""
+
+import numpy as np
+
+from windows_mcp.screen.diff import FrameDiffer
+
+
+def frame(width, height, value=0):
+    return bytearray(np.full(width * height, value, dtype=np.uint32).tobytes())
+
+
+def test_unchanged_frame_has_no_regions():
+    differ = FrameDiffer(tile_size=8)
+    assert differ.diff(1, frame(32, 16), 32, 16).baseline
+    diff = differ.diff(1, frame(32, 16), 32, 16)
+    assert not diff.baseline and not diff.changed
+
+
+def test_geometry_change_resets_baseline():
+    differ = FrameDiffer(tile_size=8)
+    differ.diff(1, frame(32, 16), 32, 16, geometry=(0, 0, 32, 16))
+    diff = differ.diff(1, frame(32, 16), 32, 16, geometry=(32, 0, 32, 16))
+    assert diff.baseline
+
+
+def test_frames_are_bounded():
+    differ = FrameDiffer(tile_size=8, max_frames=3, max_bytes=4 * 32 * 16 * 2)
+    for key in range(5):
+        differ.diff(key, frame(32, 16), 32, 16)
+    assert len(differ._frames) == 2
+    assert differ.frame_bytes == 2 * 4 * 32 * 16
+    assert differ.evictions == 3
+    # The most recently diffed keys are kept
+    assert not differ.diff(4, frame(32, 16), 32, 16).baseline
+    assert differ.diff(0, frame(32, 16), 32, 16).baseline
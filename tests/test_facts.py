@@ -0,0 +1,45 @@
+"""Tests for the system facts cache."""
+
+from windows_mcp.desktop.facts import SystemFacts
+
+QUERIES = {'windows_version': ("version", "Windows")}
+
+
+class Runner:
+    """Command runner returning queued (output, status) results."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self, command: str) -> tuple[str, int]:
+        self.calls += 1
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+
+def test_value_is_fetched_once():
+    runner = Runner(("Windows 11 Pro\n", 0))
+    facts = SystemFacts(runner, QUERIES, timeout=5)
+    assert facts.get('windows_version') == "Windows 11 Pro"
+    assert facts.get('windows_version') == "Windows 11 Pro"
+    assert runner.calls == 1
+    assert facts.stats()["hits"]["windows_version"] == 2
+
+
+def test_failed_fetch_is_not_cached():
+    runner = Runner(("", 1), ("Windows 11 Pro", 0))
+    facts = SystemFacts(runner, QUERIES, timeout=5)
+    assert facts.get('windows_version') == "Windows"
+    # The failure started a retry; the next call waits for it
+    assert facts.get('windows_version') == "Windows 11 Pro"
+    assert facts.stats()["failures"] == 1
+
+
+def test_refresh_fetches_again_and_keeps_value_on_failure():
+    runner = Runner(("Windows 10", 0), ("Windows 11", 0), ("error", 1))
+    facts = SystemFacts(runner, QUERIES, timeout=5)
+    assert facts.get('windows_version') == "Windows 10"
+    facts.refresh()
+    assert facts.get('windows_version') == "Windows 11"
+    facts.refresh()
+    assert facts.get('windows_version') == "Windows 11"
@@ -0,0 +1,115 @@
+"""Tests for incremental refreshes driven by UI change events."""
+
+from windows_mcp.tree.backend import Rect, ScrollPatternState
+from windows_mcp.tree.cache import StateCache
+from windows_mcp.tree.events import FOCUS_CHANGED, PROPERTY_CHANGED, STRUCTURE_CHANGED, ScriptedEventSource, TreeEvent
+from windows_mcp.tree.service import Tree
+from windows_mcp.tree.synthetic import SyntheticBackend, SyntheticControl, generate_synthetic_tree
+from windows_mcp.tree.views import ScanBudget
+
+
+def rows(state) -> list[list]:
+    return [node.to_row(0) for node in state.interactive_nodes] + [node.to_row() for node in state.informative_nodes]
+
+
+def find(root: SyntheticControl, control_type: str) -> SyntheticControl:
+    stack = list(reversed(root._children))
+    while stack:
+        node = stack.pop()
+        if node._control_type == control_type and node._children and not node._is_offscreen:
+            return node
+        stack.extend(reversed(node._children))
+    raise LookupError(control_type)
+
+
+def test_build_matches_full_scan():
+    # Deep enough that long lists run off screen and get culled
+    root = generate_synthetic_tree(depth=4, fan_out=6, include_taskbar=True, seed=4)
+    full = Tree(backend=SyntheticBackend(root)).get_state(force_refresh=True)
+    tree = Tree(backend=SyntheticBackend(root), event_source=ScriptedEventSource())
+    state = tree.get_state(force_refresh=True)
+    assert rows(state) == rows(full)
+
+
+def test_structure_event_rescans_only_the_changed_subtree():
+    root = generate_synthetic_tree(depth=3, fan_out=5, seed=5)
+    backend = SyntheticBackend(root)
+    container = find(root, 'PaneControl')
+    events = ScriptedEventSource([[TreeEvent(STRUCTURE_CHANGED, container._runtime_id)]])
+    tree = Tree(backend=backend, event_source=events, cache=StateCache(ttl=60))
+    tree.get_state(force_refresh=True)
+
+    box = container._rect
+    container.add_child(SyntheticControl('ButtonControl', Rect(box.left, box.top, box.left + 80, box.top + 24),
+                                         name="Added"), index=0)
+    events.advance()
+    backend.reset_calls()
+    state = tree.get_state()
+
+    assert "Added" in [node.name for node in state.interactive_nodes]
+    assert tree._index.full_rebuilds == 1 and tree._index.subtree_rescans == 1
+    assert rows(state) == rows(Tree(backend=SyntheticBackend(root)).get_state(force_refresh=True))
+    assert backend.calls['fetch_subtree'] == 0
+
+
+def test_no_events_serves_index_without_rescan():
+    root = generate_synthetic_tree(depth=2, fan_out=4, seed=6)
+    backend = SyntheticBackend(root)
+    tree = Tree(backend=backend, event_source=ScriptedEventSource(), cache=StateCache(ttl=0))
+    first = tree.get_state(force_refresh=True)
+    backend.reset_calls()
+    # The index is kept current by events, so an expired TTL does not rescan
+    assert tree.get_state() is first
+
+    # Nor does an input action that produced no change events
+    tree.cache.invalidate("click")
+    second = tree.get_state()
+    assert second is not first and rows(second) == rows(first)
+    assert tree.cache.is_valid()
+    assert (first.version, second.version) == (1, 2)
+    assert second.version == tree.cache.version
+    assert tree._index.full_rebuilds == 1
+    assert sum(backend.calls.values()) == 0
+
+
+def test_focus_events_move_focus_between_scrollables():
+    root = SyntheticControl('PaneControl', Rect(0, 0, 1920, 1080), name="Desktop", class_name="#32769")
+    window = root.add_child(SyntheticControl(
+        'WindowControl', Rect(0, 0, 1920, 1040), name="Editor", class_name="EditorApp", handle=0x10000
+    ))
+    panes = [
+        window.add_child(SyntheticControl('ListControl', Rect(0, 0, 960, 1040), name=name,
+                                          scroll=ScrollPatternState(horizontal=False, vertical=True)))
+        for name in ("Files", "Outline")
+    ]
+    panes[0]._has_keyboard_focus = True
+    events = ScriptedEventSource([[TreeEvent(FOCUS_CHANGED, panes[1]._runtime_id)]])
+    tree = Tree(backend=SyntheticBackend(root), event_source=events, budget=ScanBudget())
+    state = tree.get_state(force_refresh=True)
+    assert [node.is_focused for node in state.scrollable_nodes] == [True, False]
+
+    panes[0]._has_keyboard_focus, panes[1]._has_keyboard_focus = False, True
+    events.advance()
+    state = tree.get_state()
+    assert [node.is_focused for node in state.scrollable_nodes] == [False, True]
+    assert tree._index.node_refreshes == 2
+
+
+def test_property_change_on_culled_container_rescans_it():
+    root = SyntheticControl('PaneControl', Rect(0, 0, 1920, 1080), name="Desktop", class_name="#32769")
+    window = root.add_child(SyntheticControl(
+        'WindowControl', Rect(0, 0, 1920, 1040), name="Editor", class_name="EditorApp", handle=0x10000
+    ))
+    drawer = window.add_child(SyntheticControl('PaneControl', Rect(0, 1100, 400, 1400), name="Drawer"))
+    drawer.add_child(SyntheticControl('ButtonControl', Rect(10, 1110, 200, 1140), name="Settings"))
+    events = ScriptedEventSource([[TreeEvent(PROPERTY_CHANGED, drawer._runtime_id, 'BoundingRectangle')]])
+    tree = Tree(backend=SyntheticBackend(root), event_source=events, cache=StateCache(ttl=60))
+    assert len(tree.get_state(force_refresh=True).interactive_nodes) == 0
+
+    # The drawer slides into view
+    drawer._rect = Rect(0, 600, 400, 900)
+    drawer._children[0]._rect = Rect(10, 610, 200, 640)
+    events.advance()
+    state = tree.get_state()
+    assert [node.name for node in state.interactive_nodes] == ["Settings"]
+    assert tree._index.subtree_rescans == 1 and tree._index.full_rebuilds == 1
@@ -0,0 +1,82 @@
+"""Tests for the batched subtree and per-level prefetch."""
+
+from windows_mcp.tree.config import PREFETCH_PROPERTY_IDS
+from windows_mcp.tree.service import Tree
+from windows_mcp.tree.synthetic import SyntheticBackend, generate_synthetic_tree
+from windows_mcp.tree.views import ScanBudget
+
+
+def test_property_ids_match_uia():
+    assert PREFETCH_PROPERTY_IDS['IsControlElement'] == 30016
+    assert len(set(PREFETCH_PROPERTY_IDS.values())) == len(PREFETCH_PROPERTY_IDS)
+
+
+def scan(backend: SyntheticBackend, prefetch: bool, budget: ScanBudget) -> list[list]:
+    backend.reset_calls()
+    state = Tree(backend=backend, prefetch=prefetch, budget=budget).get_state(force_refresh=True)
+    return [node.to_row(0) for node in state.interactive_nodes]
+
+
+def test_prefetch_batches_backend_calls():
+    root = generate_synthetic_tree(depth=3, fan_out=4, include_taskbar=True, seed=1)
+    backend = SyntheticBackend(root)
+    unbounded = ScanBudget()
+
+    live = scan(backend, False, unbounded)
+    assert backend.calls['fetch_subtree'] == 0
+    assert backend.calls['IsControlElement'] > 0
+
+    # One request per app window, no per-property reads
+    assert scan(backend, True, unbounded) == live
+    assert backend.calls['fetch_subtree'] == 2
+    assert backend.calls['IsControlElement'] == 0
+    assert backend.call_count() <= 8
+
+
+def test_budgeted_prefetch_fetches_one_level_per_request():
+    root = generate_synthetic_tree(depth=3, fan_out=4, include_taskbar=True, seed=1)
+    backend = SyntheticBackend(root)
+    budget = ScanBudget(max_nodes=10000, time_limit=60.0)
+
+    live = scan(backend, False, budget)
+    live_calls = backend.call_count()
+    assert scan(backend, True, budget) == live
+    assert backend.calls['fetch_subtree'] == 0
+    assert backend.calls['fetch_children'] > 0
+    # Only the app windows themselves are read live
+    assert backend.calls['IsControlElement'] <= 2
+    assert backend.call_count() < live_calls / 4
+
+
+def test_node_budget_bounds_per_level_requests():
+    root = generate_synthetic_tree(depth=4, fan_out=6, seed=2)
+    backend = SyntheticBackend(root)
+    scan(backend, True, ScanBudget(max_nodes=20))
+    # Only nodes admitted by the budget have their children fetched
+    assert backend.calls['fetch_children'] <= 20
+
+
+def test_budgeted_scan_prefetches_apps_known_to_be_small():
+    root = generate_synthetic_tree(depth=3, fan_out=4, include_taskbar=True, seed=1)
+    backend = SyntheticBackend(root)
+    tree = Tree(backend=backend, prefetch=True, budget=ScanBudget(max_nodes=10000, time_limit=60.0), cull=False)
+    first = [node.to_row(0) for node in tree.get_state(force_refresh=True).interactive_nodes]
+    assert backend.calls['fetch_subtree'] == 0
+
+    # The first walk measured both apps, so the next scan fetches each in one request
+    backend.reset_calls()
+    second = [node.to_row(0) for node in tree.get_state(force_refresh=True).interactive_nodes]
+    assert second == first
+    assert backend.calls['fetch_subtree'] == 2
+    assert backend.calls['fetch_children'] == 0
+
+
+def test_budgeted_scan_keeps_large_apps_per_level():
+    root = generate_synthetic_tree(depth=4, fan_out=6, seed=2)
+    backend = SyntheticBackend(root)
+    tree = Tree(backend=backend, prefetch=True, budget=ScanBudget(max_nodes=20), cull=False)
+    tree.get_state(force_refresh=True)
+    backend.reset_calls()
+    tree.get_state(force_refresh=True)
+    assert backend.calls['fetch_subtree'] == 0
+    assert backend.calls['fetch_children'] <= 20
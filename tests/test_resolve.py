@@ -0,0 +1,71 @@
+"""Tests for re-resolving single elements from the live tree."""
+
+from windows_mcp.tree.backend import Rect
+from windows_mcp.tree.service import Tree
+from windows_mcp.tree.synthetic import SyntheticBackend, SyntheticControl
+
+
+def build_mail(rows: list[str]) -> tuple[SyntheticControl, SyntheticControl, SyntheticControl]:
+    """A desktop with a mail window: a toolbar pane above a list of buttons."""
+    root = SyntheticControl('PaneControl', Rect(0, 0, 1920, 1080), name="Desktop", class_name="#32769")
+    window = root.add_child(SyntheticControl(
+        'WindowControl', Rect(0, 0, 1920, 1040), name="Mail", class_name="MailApp", process_id=1000, handle=0x10000
+    ))
+    window.add_child(SyntheticControl('PaneControl', Rect(0, 0, 1920, 40), name="Toolbar", process_id=1000))
+    items = window.add_child(SyntheticControl('ListControl', Rect(0, 40, 1920, 1040), process_id=1000))
+    for row, name in enumerate(rows):
+        items.add_child(row_button(name, row))
+    return root, window, items
+
+
+def row_button(name: str, row: int) -> SyntheticControl:
+    return SyntheticControl('ButtonControl', Rect(10, 55 + row * 40, 210, 85 + row * 40), name=name, process_id=1000)
+
+
+def relayout(items: SyntheticControl):
+    for row, child in enumerate(items._children):
+        child._rect = Rect(10, 55 + row * 40, 210, 85 + row * 40)
+
+
+def label_of(state, name: str, occurrence: int = 0) -> int:
+    labels = [i for i, node in enumerate(state.interactive_nodes) if node.name == name]
+    return labels[occurrence]
+
+
+def test_resolves_same_named_sibling_after_insert():
+    root, _, items = build_mail(["Reply", "Delete", "Delete"])
+    tree = Tree(backend=SyntheticBackend(root), prefetch=False)
+    state = tree.get_state(force_refresh=True)
+    label = label_of(state, "Delete", 1)
+    assert state.interactive_nodes[label].center.y == 150
+
+    items.add_child(row_button("Flag", 0), index=0)
+    relayout(items)
+    fresh = tree.refresh_element(state, label)
+    assert fresh is not None
+    assert fresh.center.y == 190
+    assert fresh.fingerprint == state.interactive_nodes[label].fingerprint
+
+
+def test_resolves_after_ancestor_shift():
+    root, window, _ = build_mail(["Reply", "Delete", "Archive"])
+    backend = SyntheticBackend(root)
+    tree = Tree(backend=backend)
+    state = tree.get_state(force_refresh=True)
+    label = label_of(state, "Archive")
+
+    window.add_child(SyntheticControl('PaneControl', Rect(0, 0, 1920, 20), name="Banner", process_id=1000), index=0)
+    fresh = tree.refresh_element(state, label)
+    assert fresh is not None
+    assert fresh.name == "Archive"
+    assert fresh.path == state.interactive_nodes[label].path[:1] + (2, 2)
+
+
+def test_gone_element_is_not_replaced():
+    root, _, items = build_mail(["Reply", "Delete", "Delete"])
+    tree = Tree(backend=SyntheticBackend(root))
+    state = tree.get_state(force_refresh=True)
+    label = label_of(state, "Delete", 1)
+
+    items.remove_child(items._children[2])
+    assert tree.refresh_element(state, label) is None
@@ -0,0 +1,63 @@
+"""Tests for scans restricted to a window, process, app or screen region."""
+
+from windows_mcp.tree.backend import Rect
+from windows_mcp.tree.cache import StateCache
+from windows_mcp.tree.service import Tree
+from windows_mcp.tree.synthetic import SyntheticBackend, SyntheticControl
+from windows_mcp.tree.views import ScanScope
+
+
+def build_desktop() -> SyntheticControl:
+    """Two side-by-side app windows, each with a column of buttons."""
+    root = SyntheticControl('PaneControl', Rect(0, 0, 1920, 1080), name="Desktop", class_name="#32769")
+    for left, name, pid, handle in ((0, "Mail", 100, 0x10000), (960, "Editor", 200, 0x20000)):
+        window = root.add_child(SyntheticControl(
+            'WindowControl', Rect(left, 0, left + 960, 1040), name=name, class_name=f"{name}App",
+            process_id=pid, handle=handle
+        ))
+        for row in range(4):
+            top = 100 + row * 200
+            window.add_child(SyntheticControl(
+                'ButtonControl', Rect(left + 10, top, left + 200, top + 30), name=f"{name} {row}", process_id=pid
+            ))
+    return root
+
+
+def names(state) -> list[str]:
+    return [node.name for node in state.interactive_nodes]
+
+
+def test_window_scope_scans_only_that_window():
+    backend = SyntheticBackend(build_desktop())
+    state = Tree(backend=backend).get_state(scope=ScanScope(window_handle=0x20000))
+    assert names(state) == [f"Editor {row}" for row in range(4)]
+    assert state.app_windows == [0x20000]
+    assert backend.calls['control_from_handle'] == 1
+
+
+def test_process_and_app_name_scopes_select_windows():
+    tree = Tree(backend=SyntheticBackend(build_desktop()))
+    assert names(tree.get_state(scope=ScanScope(process_id=200))) == [f"Editor {row}" for row in range(4)]
+    assert names(tree.get_state(scope=ScanScope(app_name="mAiL"))) == [f"Mail {row}" for row in range(4)]
+    assert names(tree.get_state(scope=ScanScope(process_id=100, app_name="Editor"))) == []
+
+
+def test_region_scope_keeps_elements_inside_the_region():
+    tree = Tree(backend=SyntheticBackend(build_desktop()))
+    state = tree.get_state(scope=ScanScope(region=(0, 0, 1920, 350)))
+    assert sorted(names(state)) == ["Editor 0", "Editor 1", "Mail 0", "Mail 1"]
+    # Combined with a window, only that window's part of the region
+    state = tree.get_state(scope=ScanScope(window_handle=0x10000, region=(0, 250, 960, 700)))
+    assert names(state) == ["Mail 1", "Mail 2"]
+
+
+def test_scoped_states_are_cached_per_scope():
+    backend = SyntheticBackend(build_desktop())
+    tree = Tree(backend=backend, cache=StateCache(ttl=60))
+    scope = ScanScope(window_handle=0x10000)
+    scoped = tree.get_state(scope=scope)
+    assert tree.get_state(scope=ScanScope(window_handle=0x10000)) is scoped
+    # An unscoped request does not reuse the scoped state
+    full = tree.get_state()
+    assert full is not scoped
+    assert tree.get_state(scope=scope) is not scoped
@@ -0,0 +1,81 @@
+"""Tests for the persistent shell host, run on sh and Python workers."""
+
+import sys
+
+import pytest
+
+from windows_mcp.desktop.shell import (
+    ShellHost,
+    decode_response,
+    encode_request,
+    python_transport,
+    sh_transport
+)
+
+posix_only = pytest.mark.skipif(sys.platform == 'win32', reason="needs sh and POSIX signals")
+
+
+@pytest.fixture
+def sh_host():
+    host = ShellHost(sh_transport, timeout=10)
+    yield host
+    host.close()
+
+
+@pytest.fixture
+def python_host():
+    host = ShellHost(python_transport, timeout=10)
+    yield host
+    host.close()
+
+
+def test_framing_round_trip():
+    line = encode_request(7, "echo 'a b'\nexit 2")
+    assert "\n" not in line.rstrip("\n") and line.startswith("7 ")
+    assert decode_response("7 2 aGk= ZXJy\n") == (7, 2, "hi", "err")
+    assert decode_response("8 0  \n") == (8, 0, "", "")
+
+
+@posix_only
+def test_multi_line_output_and_status(sh_host):
+    assert sh_host.execute("printf 'one\\ntwo words\\n  three'") == ("one\ntwo words\n  three", 0)
+    assert sh_host.execute("echo done; exit 3") == ("done", 3)
+    # The loop survives `exit` and `cd` in a command
+    assert sh_host.execute("cd /; pwd") == ("/", 0)
+    assert sh_host.execute("echo ünïcode") == ("ünïcode", 0)
+    assert sh_host.stats()["starts"] == 1
+
+
+@posix_only
+def test_stderr_is_kept_separate(sh_host):
+    assert sh_host.execute("echo out; echo err >&2") == ("out", 0)
+    assert sh_host.execute("echo err >&2; exit 1") == ("err\n", 1)
+
+
+def test_python_worker_keeps_stderr_separate(python_host):
+    assert python_host.execute("import sys; print('out'); print('err', file=sys.stderr)") == ("out\n", 0)
+    output, status = python_host.execute("raise ValueError('boom')")
+    assert status == 1 and "ValueError: boom" in output
+    assert python_host.execute("raise SystemExit(4)") == ("", 4)
+
+
+@posix_only
+def test_timeout_restarts_worker(sh_host):
+    assert sh_host.execute("sleep 5", timeout=0.3) == ("Command execution timed out", 1)
+    assert sh_host.execute("echo again") == ("again", 0)
+    assert sh_host.stats()["timeouts"] == 1 and sh_host.stats()["starts"] == 2
+
+
+def test_worker_exit_reports_status_and_restarts(python_host):
+    assert python_host.execute("import os; os._exit(3)") == ("", 3)
+    assert python_host.execute("print('again')") == ("again\n", 0)
+    assert python_host.stats()["crashes"] == 1 and python_host.stats()["starts"] == 2
+
+
+@posix_only
+def test_worker_crash_restarts(python_host):
+    assert python_host.execute("import os, signal; os.kill(os.getpid(), signal.SIGKILL)") == (
+        "Command execution failed", 1
+    )
+    assert python_host.execute("print('again')") == ("again\n", 0)
+    assert python_host.stats()["crashes"] == 1
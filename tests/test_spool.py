@@ -0,0 +1,111 @@
+"""Tests for screenshot spool eviction and startup cleanup."""
+
+import os
+import tempfile
+import time
+
+from windows_mcp.screen.spool import PARTIAL_SUFFIX, ScreenshotSpool
+
+
+def age(path, seconds: float):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def write_file(path, data: bytes = b'x'):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+def test_count_limit_evicts_least_recently_used(tmp_path):
+    spool = ScreenshotSpool(str(tmp_path), max_files=2, max_age=None)
+    first = spool.write(b'a', 'shot', 'png')
+    second = spool.write(b'b', 'shot', 'png')
+    spool.touch(first)
+    third = spool.write(b'c', 'shot', 'png')
+    assert spool.owns(first) and spool.owns(third)
+    assert not spool.owns(second) and not os.path.exists(second)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in (first, third))
+    assert spool.stats()['evictions']['count'] == 1
+
+
+def test_size_limit_never_evicts_the_new_file(tmp_path):
+    spool = ScreenshotSpool(str(tmp_path), max_bytes=100, max_age=None)
+    small = spool.write(b'a' * 40, 'shot', 'png')
+    spool.write(b'b' * 40, 'shot', 'png')
+    large = spool.write(b'c' * 150, 'shot', 'png')
+    assert not spool.owns(small)
+    assert os.listdir(tmp_path) == [os.path.basename(large)]
+    stats = spool.stats()
+    assert stats['files'] == 1 and stats['bytes'] == 150
+    assert stats['evictions']['size'] == 2
+
+
+def test_open_adopts_files_and_evicts_expired_ones(tmp_path):
+    old = write_file(tmp_path / 'old.png')
+    recent = write_file(tmp_path / 'recent.png', b'yy')
+    age(old, 120)
+    age(recent, 10)
+    spool = ScreenshotSpool(str(tmp_path), max_age=60)
+    spool.open()
+    assert not os.path.exists(old)
+    assert spool.owns(recent)
+    stats = spool.stats()
+    assert stats['files'] == 1 and stats['bytes'] == 2
+    assert stats['evictions']['age'] == 1
+
+
+def test_open_adopts_files_in_modification_order(tmp_path):
+    older = write_file(tmp_path / 'a.png')
+    newer = write_file(tmp_path / 'b.png')
+    age(older, 20)
+    age(newer, 30)
+    spool = ScreenshotSpool(str(tmp_path), max_files=2, max_age=None)
+    spool.write(b'c', 'shot', 'png')
+    # The earlier run's least recently written file goes first
+    assert not spool.owns(newer) and spool.owns(older)
+
+
+def test_open_removes_interrupted_writes(tmp_path):
+    stale = write_file(tmp_path / ('shot.png' + PARTIAL_SUFFIX))
+    fresh = write_file(tmp_path / ('next.png' + PARTIAL_SUFFIX))
+    age(stale, 120)
+    spool = ScreenshotSpool(str(tmp_path), max_age=None)
+    spool.open()
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh) and not spool.owns(fresh)
+    assert spool.stats()['orphans_removed'] == 1
+
+
+def test_open_removes_old_legacy_screenshots(tmp_path, monkeypatch):
+    temp_dir = tmp_path / 'tmp'
+    temp_dir.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(temp_dir))
+    old = write_file(temp_dir / 'windows_mcp_screenshot_1.png')
+    recent = write_file(temp_dir / 'windows_mcp_screen_2.png')
+    unrelated = write_file(temp_dir / 'other_3.png')
+    age(old, 120)
+    age(unrelated, 120)
+    spool = ScreenshotSpool(max_age=60)
+    spool.open()
+    assert spool.directory.startswith(str(temp_dir))
+    assert not os.path.exists(old)
+    assert os.path.exists(recent) and os.path.exists(unrelated)
+    assert spool.stats()['orphans_removed'] == 1
+
+
+def test_legacy_screenshots_are_kept_without_max_age(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    old = write_file(tmp_path / 'windows_mcp_screenshot_1.png')
+    age(old, 10 ** 6)
+    ScreenshotSpool(max_age=None).open()
+    assert os.path.exists(old)
+
+
+def test_remove_deletes_the_file(tmp_path):
+    spool = ScreenshotSpool(str(tmp_path), max_age=None)
+    path = spool.write(b'abc', 'shot', 'png')
+    spool.remove(path)
+    assert not spool.owns(path) and not os.path.exists(path)
+    assert spool.stats()['bytes'] == 0
@@ -21,3 +21,18 @@ EXCLUDED_APPS: Set[str] = {
 
 # DPI awareness settings
 PROCESS_PER_MONITOR_DPI_AWARE = 2
+
+# Static system facts, fetched once and on refresh: name -> (PowerShell command, fallback value)
+SYSTEM_FACT_QUERIES: dict[str, tuple[str, str]] = {
+    'windows_version': ("(Get-CimInstance Win32_OperatingSystem).Caption", "Windows"),
+    'default_language': ("Get-Culture | Select-Object -ExpandProperty DisplayName", "English (United States)"),
+}
+
+# Seconds a shell command may run before the shell host is restarted
+SHELL_COMMAND_TIMEOUT = 25.0
+
+# Run commands on a long-lived PowerShell process instead of one process per command
+PERSISTENT_SHELL = True
+
+# Processes whose metadata is kept by the process cache
+PROCESS_CACHE_SIZE = 512
@@ -0,0 +1,138 @@
+"""Cache of static system facts queried through shell commands."""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from windows_mcp.desktop.config import SYSTEM_FACT_QUERIES
+
+logger = logging.getLogger('windows-mcp.desktop')
+
+# Runs a shell command and returns (output, return_code)
+CommandRunner = Callable[[str], tuple[str, int]]
+
+
+class SystemFacts:
+    """Values such as the Windows version that do not change while the server runs.
+
+    Every fact is fetched once through the command runner, in a background
+    thread started by start() or on first use, and then served from memory
+    until refresh() is called. Failed fetches are retried on the next use
+    instead of caching the fallback. Fetch times are recorded so stats() can
+    report how much command latency the cache has saved.
+    """
+
+    def __init__(
+        self,
+        runner: CommandRunner,
+        queries: Optional[dict[str, tuple[str, str]]] = None,
+        timeout: Optional[float] = 30.0
+    ):
+        """Initialize the cache.
+
+        Args:
+            runner: Executes a command, e.g. Desktop._execute_command
+            queries: Fact name -> (command, fallback value); defaults to
+                SYSTEM_FACT_QUERIES
+            timeout: Seconds get() waits for a fetch in progress
+        """
+        self.runner = runner
+        self.queries = dict(SYSTEM_FACT_QUERIES if queries is None else queries)
+        self.timeout = timeout
+        self.hits: dict[str, int] = {name: 0 for name in self.queries}
+        self.fetches = 0
+        self.failures = 0
+        self.fetch_times: dict[str, float] = {}
+        self._values: dict[str, str] = {}
+        self._ready: dict[str, threading.Event] = {name: threading.Event() for name in self.queries}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Fetch every fact in a background thread, unless already started."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._fetch_all, args=(list(self.queries),), name='system-facts', daemon=True
+            )
+        self._thread.start()
+
+    def get(self, name: str) -> str:
+        """Return a fact, waiting for its first fetch if it is still running.
+
+        A failed fetch is not cached: the fallback is returned and the fact
+        is fetched again in the background, so a later call can return the
+        real value.
+
+        Args:
+            name: Key of the fact in the queries
+
+        Returns:
+            The command's output, or the fallback value if the command
+            failed or did not finish within the timeout
+        """
+        self.start()
+        command, fallback = self.queries[name]
+        if not self._ready[name].wait(self.timeout):
+            logger.warning(f"System fact '{name}' not available after {self.timeout}s")
+            return fallback
+        with self._lock:
+            if name in self._values:
+                self.hits[name] += 1
+                return self._values[name]
+            # Retry unless another caller already started a retry
+            retry = self._ready[name].is_set()
+            if retry:
+                self._ready[name].clear()
+        if retry:
+            threading.Thread(target=self._fetch_all, args=([name],), name='system-facts', daemon=True).start()
+        return fallback
+
+    def refresh(self, names: Optional[list[str]] = None):
+        """Fetch the given facts (all by default) again, in the calling thread.
+
+        A fact whose command fails keeps its previous value, if it had one.
+        """
+        names = list(self.queries) if names is None else names
+        for name in names:
+            self._ready[name].clear()
+        self._fetch_all(names)
+
+    def _fetch_all(self, names: list[str]):
+        for name in names:
+            command, fallback = self.queries[name]
+            start = time.perf_counter()
+            try:
+                output, status = self.runner(command)
+                value = output.strip() if status == 0 else ""
+            except Exception as e:
+                logger.debug(f"Could not fetch system fact '{name}': {e}")
+                value = ""
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                if value:
+                    self._values[name] = value
+                    self.fetch_times[name] = elapsed
+                else:
+                    self.failures += 1
+                self.fetches += 1
+            self._ready[name].set()
+            logger.debug(f"Fetched system fact '{name}' in {elapsed * 1000:.0f} ms" if value
+                         else f"System fact '{name}' failed after {elapsed * 1000:.0f} ms")
+
+    def stats(self) -> dict:
+        """Return fetch times and the command latency saved by cache hits.
+
+        Each hit is counted as saving one run of its command, at the
+        command's last measured fetch time.
+        """
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "fetches": self.fetches,
+                "failures": self.failures,
+                "fetch_times": dict(self.fetch_times),
+                "saved_seconds": sum(self.hits[name] * self.fetch_times.get(name, 0.0) for name in self.hits)
+            }
@@ -0,0 +1,93 @@
+"""Shared cache of process metadata, safe against PID reuse."""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import psutil
+
+from windows_mcp.desktop.config import PROCESS_CACHE_SIZE
+from windows_mcp.desktop.views import ProcessInfo
+
+
+class ProcessCache:
+    """LRU cache of ProcessInfo keyed by (pid, create_time).
+
+    Resolving a PID still costs one creation-time query, but the process
+    name, which can require a full process enumeration for protected
+    processes, is only looked up once per process instance. A PID reused
+    by a new process has a different creation time and therefore misses.
+    """
+
+    def __init__(self, max_size: int = PROCESS_CACHE_SIZE):
+        """Initialize the cache.
+
+        Args:
+            max_size: Process instances kept before the least recently used is evicted
+        """
+        self.max_size = max(1, max_size)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[int, float], ProcessInfo] = OrderedDict()
+        self._keys: dict[int, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, pid: int) -> Optional[ProcessInfo]:
+        """Return metadata of the process currently running as pid.
+
+        Returns:
+            ProcessInfo, or None if the process does not exist or cannot be read
+        """
+        try:
+            process = psutil.Process(pid)
+            key = (pid, process.create_time())
+        except (psutil.Error, ValueError, OSError):
+            return None
+
+        with self._lock:
+            info = self._entries.get(key)
+            if info is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return info
+            self.misses += 1
+
+        try:
+            info = ProcessInfo(pid=pid, create_time=key[1], name=process.name())
+        except (psutil.Error, OSError):
+            return None
+
+        with self._lock:
+            stale = self._keys.get(pid)
+            if stale is not None and stale != key:
+                # The PID was reused; drop the previous process's entry
+                self._entries.pop(stale, None)
+            self._entries[key] = info
+            self._keys[pid] = key
+            while len(self._entries) > self.max_size:
+                (old_pid, _), _ = self._entries.popitem(last=False)
+                if self._keys.get(old_pid) is not None and self._keys[old_pid] not in self._entries:
+                    del self._keys[old_pid]
+                self.evictions += 1
+        return info
+
+    def name(self, pid: int) -> Optional[str]:
+        """Return the executable name of the process running as pid, if any."""
+        info = self.get(pid)
+        return info.name if info is not None else None
+
+    def clear(self):
+        """Forget every cached process."""
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+
+    def stats(self) -> dict:
+        """Return hit, miss and eviction counters."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
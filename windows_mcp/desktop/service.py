@@ -15,18 +15,29 @@ try:
     UIAUTOMATION_AVAILABLE = True
 except ImportError:
     UIAUTOMATION_AVAILABLE = False
+    Control = object
+
+try:
+    import pyautogui
+    PYAUTOGUI_AVAILABLE = True
+except ImportError:
+    PYAUTOGUI_AVAILABLE = False
 
-import pyautogui
 from PIL import Image
-import psutil
 
 from windows_mcp.desktop.config import (
     PROCESS_PER_MONITOR_DPI_AWARE,
     EXCLUDED_APPS,
     AVOIDED_APPS,
-    BROWSER_NAMES
+    BROWSER_NAMES,
+    PERSISTENT_SHELL,
+    SHELL_COMMAND_TIMEOUT
 )
+from windows_mcp.desktop.facts import SystemFacts
+from windows_mcp.desktop.processes import ProcessCache
+from windows_mcp.desktop.shell import ShellHost, powershell_transport
 from windows_mcp.desktop.views import App, Size, Status
+from windows_mcp.screen import capture
 
 
 class Desktop:
@@ -40,6 +51,14 @@ class Desktop:
             pass
 
         self.encoding = getpreferredencoding()
+        self.shell = ShellHost(powershell_transport) if PERSISTENT_SHELL else None
+        self.facts = SystemFacts(self._execute_command)
+        self.processes = ProcessCache()
+
+    def close(self):
+        """Stop the persistent PowerShell host, if one is running."""
+        if self.shell is not None:
+            self.shell.close()
 
     def get_screen_size(self) -> Size:
         """Get the screen dimensions.
@@ -49,21 +68,64 @@ class Desktop:
         """
         if UIAUTOMATION_AVAILABLE:
             width, height = GetScreenSize()
-        else:
+        elif PYAUTOGUI_AVAILABLE:
             width, height = pyautogui.size()
+        elif capture.MSS_AVAILABLE:
+            primary = capture.monitor_region(1)
+            width, height = primary['width'], primary['height']
+        else:
+            width, height = 0, 0
 
         return Size(width=width, height=height)
 
-    def get_screenshot(self, scale: float = 0.7) -> Image.Image:
+    def grab_screen_raw(self, region: Optional[tuple[int, int, int, int]] = None) -> Optional[tuple[bytearray, int, int]]:
+        """Capture the primary screen, or a region of the screen, as an unconverted BGRA buffer.
+
+        Args:
+            region: (left, top, width, height) to capture in screen
+                coordinates; only its pixels are grabbed
+
+        Returns:
+            Tuple of (buffer, width, height), or None if mss is not available
+        """
+        if not capture.MSS_AVAILABLE:
+            return None
+        if region is not None:
+            return capture.grab_raw(capture.clip_region(*region))
+        size = self.get_screen_size()
+        return capture.grab_raw({'left': 0, 'top': 0, 'width': size.width, 'height': size.height})
+
+    def get_screenshot(
+        self,
+        scale: float = 0.7,
+        frame: Optional[tuple[bytearray, int, int]] = None,
+        region: Optional[tuple[int, int, int, int]] = None
+    ) -> Image.Image:
         """Capture a screenshot of the desktop.
 
         Args:
             scale: Scale factor for the screenshot
+            frame: Buffer already captured by grab_screen_raw(), to convert
+                instead of capturing again
+            region: (left, top, width, height) to capture instead of the
+                whole screen
 
         Returns:
-            PIL Image object
+            PIL Image object of the primary screen or the region
+
+        Raises:
+            RuntimeError: If neither mss nor pyautogui is available
         """
-        screenshot = pyautogui.screenshot()
+        if frame is None and capture.MSS_AVAILABLE:
+            frame = self.grab_screen_raw(region)
+        if frame is not None:
+            screenshot = capture.image_from_bgra(*frame)
+        elif not PYAUTOGUI_AVAILABLE:
+            raise RuntimeError("Screen capture needs mss or pyautogui")
+        elif region is not None:
+            screenshot = pyautogui.screenshot(region=region)
+        else:
+            screenshot = pyautogui.screenshot()
 
         if scale != 1.0:
             new_size = (int(screenshot.width * scale), int(screenshot.height * scale))
@@ -76,7 +138,12 @@ class Desktop:
 
         Returns:
             Tuple of (x, y) coordinates
+
+        Raises:
+            RuntimeError: If pyautogui is not available
         """
+        if not PYAUTOGUI_AVAILABLE:
+            raise RuntimeError("pyautogui not available")
         position = pyautogui.position()
         return (position.x, position.y)
 
@@ -115,36 +182,29 @@ class Desktop:
             True if the app is a browser
         """
         try:
-            process = psutil.Process(node.ProcessId)
-            return process.name() in BROWSER_NAMES
+            return self.processes.name(node.ProcessId) in BROWSER_NAMES
         except:
             return False
 
     def get_windows_version(self) -> str:
-        """Get the Windows version string.
+        """Get the Windows version string, queried once and then cached.
 
         Returns:
             Windows version description
         """
-        response, status = self._execute_command(
-            "(Get-CimInstance Win32_OperatingSystem).Caption"
-        )
-        if status == 0:
-            return response.strip()
-        return "Windows"
+        return self.facts.get('windows_version')
 
     def get_default_language(self) -> str:
-        """Get the default system language.
+        """Get the default system language, queried once and then cached.
 
         Returns:
             Language description string
         """
-        response, status = self._execute_command(
-            "Get-Culture | Select-Object -ExpandProperty DisplayName"
-        )
-        if status == 0:
-            return response.strip()
-        return "English (United States)"
+        return self.facts.get('default_language')
+
+    def refresh_system_facts(self):
+        """Query the cached system facts (version, language) again."""
+        self.facts.refresh()
 
     def _get_app_status(self, control: Control) -> Status:
         """Get the status of an application window.
@@ -191,18 +251,23 @@ class Desktop:
     def _execute_command(self, command: str) -> tuple[str, int]:
         """Execute a PowerShell command.
 
+        Commands run on the persistent shell host, or in a new PowerShell
+        process each when PERSISTENT_SHELL is off.
+
         Args:
             command: PowerShell command to execute
 
         Returns:
             Tuple of (output, return_code)
         """
+        if self.shell is not None:
+            return self.shell.execute(command)
         try:
             result = subprocess.run(
                 ['powershell', '-NoProfile', '-Command', command],
                 capture_output=True,
                 text=True,
-                timeout=25,
+                timeout=SHELL_COMMAND_TIMEOUT,
                 errors='ignore'
             )
             stdout = result.stdout or ""
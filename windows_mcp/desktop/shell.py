@@ -0,0 +1,349 @@
+"""Long-lived shell worker that runs commands without per-command start-up.
+
+Starting ``powershell`` costs hundreds of milliseconds, far more than the
+short queries the server runs. ShellHost keeps one interpreter running and
+talks to it over a line-based framed protocol:
+
+    request:  "<id> <base64 UTF-8 command>\\n"
+    response: "<id> <exit status> <base64 UTF-8 stdout> <base64 UTF-8 stderr>\\n"
+
+Base64 keeps commands and output containing newlines or arbitrary text
+within a single line. Like a one-off process, the host reports stdout, or
+stderr if the command wrote nothing to stdout. The interpreter side is a
+small loop script, one per dialect (PowerShell, sh, Python), and the
+channel to it is a pluggable ShellTransport, so the host can be exercised
+on any platform.
+"""
+
+import base64
+import itertools
+import logging
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+from windows_mcp.desktop.config import SHELL_COMMAND_TIMEOUT
+
+logger = logging.getLogger('windows-mcp.desktop')
+
+# Runs each request in a child scope and reports $LASTEXITCODE or failure as the status;
+# error records are sent as stderr. `exit` in a command ends this loop, see ShellHost.
+POWERSHELL_HOST_SCRIPT = r'''
+[Console]::OutputEncoding = [Text.Encoding]::UTF8
+$utf8 = [Text.Encoding]::UTF8
+$startLocation = Get-Location
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line) { break }
+    $id, $payload = $line.Split(' ', 2)
+    $command = $utf8.GetString([Convert]::FromBase64String($payload))
+    $global:LASTEXITCODE = 0
+    $status = 0
+    try {
+        $records = & ([scriptblock]::Create($command)) 2>&1
+        $succeeded = $?
+        $output = $records | Where-Object { $_ -isnot [Management.Automation.ErrorRecord] } | Out-String -Width 4096
+        $errors = $records | Where-Object { $_ -is [Management.Automation.ErrorRecord] } | Out-String -Width 4096
+        if ($LASTEXITCODE) { $status = $LASTEXITCODE } elseif (-not $succeeded) { $status = 1 }
+    } catch {
+        $output = ''
+        $errors = $_ | Out-String
+        $status = 1
+    }
+    Set-Location $startLocation
+    [Console]::Out.WriteLine(
+        "$id $status " + [Convert]::ToBase64String($utf8.GetBytes($output)) + ' ' +
+        [Convert]::ToBase64String($utf8.GetBytes($errors))
+    )
+    [Console]::Out.Flush()
+}
+'''
+
+# Evaluates each request in the command substitution's subshell, so `exit` and `cd` do not
+# affect the loop; stdin is closed so commands cannot read the request stream
+SH_HOST_SCRIPT = r'''
+errors=$(mktemp) || exit 1
+trap 'rm -f "$errors"' EXIT
+while IFS=' ' read -r id payload; do
+    command=$(printf '%s' "$payload" | base64 -d)
+    output=$(eval "$command" 2>"$errors" </dev/null)
+    status=$?
+    printf '%s %s %s %s\n' "$id" "$status" "$(printf '%s' "$output" | base64 | tr -d '\n')" \
+        "$(base64 < "$errors" | tr -d '\n')"
+done
+'''
+
+# Executes each request as Python source with stdout and stderr captured
+PYTHON_HOST_SCRIPT = r'''
+import base64, contextlib, io, sys, traceback
+for line in sys.stdin:
+    request_id, _, payload = line.rstrip('\n').partition(' ')
+    output, errors, status = io.StringIO(), io.StringIO(), 0
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+            exec(base64.b64decode(payload).decode('utf-8'), {'__name__': '__shell__'})
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        traceback.print_exc(file=errors)
+        status = 1
+    frames = (base64.b64encode(stream.getvalue().encode()).decode() for stream in (output, errors))
+    sys.stdout.write(f"{request_id} {status} {' '.join(frames)}\n")
+    sys.stdout.flush()
+'''
+
+
+def encode_request(request_id: int, command: str) -> str:
+    """Frame a command as one request line."""
+    return f"{request_id} {base64.b64encode(command.encode('utf-8')).decode('ascii')}\n"
+
+
+def decode_response(line: str) -> tuple[int, int, str, str]:
+    """Parse a response line into (request id, exit status, stdout, stderr).
+
+    Raises:
+        ValueError: If the line is not a response frame
+    """
+    request_id, status, output, errors = (line.rstrip('\r\n').split(' ', 3) + ['', ''])[:4]
+    output, errors = (base64.b64decode(payload).decode('utf-8', errors='ignore') for payload in (output, errors))
+    return int(request_id), int(status), output, errors
+
+
+class ShellTransport:
+    """Line-oriented channel to a shell worker process."""
+
+    def start(self):
+        """Start the worker; raises OSError if it cannot be started."""
+
+    def send(self, line: str):
+        """Write one line; raises OSError if the worker is gone."""
+        raise NotImplementedError
+
+    def receive(self, timeout: Optional[float]) -> Optional[str]:
+        """Return the next line, or None if none arrived within timeout.
+
+        Raises:
+            EOFError: If the worker exited
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Stop the worker."""
+
+    def is_alive(self) -> bool:
+        return False
+
+    def exit_status(self) -> Optional[int]:
+        """Return the exit code of a worker that exited by itself, None if unknown or killed."""
+        return None
+
+
+class SubprocessTransport(ShellTransport):
+    """Transport to a child process over its stdin and stdout pipes."""
+
+    def __init__(self, argv: list[str]):
+        """Initialize the transport.
+
+        Args:
+            argv: Command line that starts the host loop
+        """
+        self.argv = argv
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: queue.SimpleQueue = queue.SimpleQueue()
+
+    def start(self):
+        self._lines = queue.SimpleQueue()
+        self._process = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='ascii',
+            errors='ignore',
+            bufsize=1,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        )
+        threading.Thread(
+            target=self._read, args=(self._process.stdout, self._lines), name='shell-host-reader', daemon=True
+        ).start()
+
+    @staticmethod
+    def _read(stream, lines: queue.SimpleQueue):
+        """Forward lines from the process to the queue; None marks EOF."""
+        try:
+            for line in stream:
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put(None)
+
+    def send(self, line: str):
+        if self._process is None or self._process.stdin is None:
+            raise BrokenPipeError("shell host not started")
+        self._process.stdin.write(line)
+        self._process.stdin.flush()
+
+    def receive(self, timeout: Optional[float]) -> Optional[str]:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if line is None:
+            raise EOFError("shell host exited")
+        return line
+
+    def close(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.kill()
+            process.wait(timeout=5)
+        except Exception:
+            pass
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def exit_status(self) -> Optional[int]:
+        if self._process is None:
+            return None
+        try:
+            status = self._process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            return None
+        # Negative codes mean the process was killed by a signal
+        return status if status >= 0 else None
+
+
+def powershell_transport() -> SubprocessTransport:
+    """Transport to a persistent ``powershell`` running POWERSHELL_HOST_SCRIPT."""
+    encoded = base64.b64encode(POWERSHELL_HOST_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return SubprocessTransport(['powershell', '-NoProfile', '-NoLogo', '-NonInteractive', '-EncodedCommand', encoded])
+
+
+def sh_transport() -> SubprocessTransport:
+    """Transport to a persistent ``sh``, a stand-in for PowerShell on other platforms."""
+    return SubprocessTransport(['sh', '-c', SH_HOST_SCRIPT])
+
+
+def python_transport() -> SubprocessTransport:
+    """Transport to a persistent Python interpreter executing Python source commands."""
+    return SubprocessTransport([sys.executable, '-u', '-c', PYTHON_HOST_SCRIPT])
+
+
+class ShellHost:
+    """Runs commands one at a time on a long-lived shell worker.
+
+    The worker is started on first use. A command that exceeds its timeout
+    kills the worker, and a worker that crashed is started again on the next
+    command. A command whose request could not be written to a dead worker
+    is retried once on a fresh one; a command that was already sent is never
+    retried, since it may have had side effects.
+
+    A command that ends the worker itself, such as ``exit 3`` in PowerShell,
+    returns the worker's exit code with empty output, as a one-off process
+    would; its output is lost, and the next command runs on a fresh worker.
+    """
+
+    def __init__(self, transport_factory: Callable[[], ShellTransport], timeout: float = SHELL_COMMAND_TIMEOUT):
+        """Initialize the host.
+
+        Args:
+            transport_factory: Creates the transport for each worker start
+            timeout: Default per-command timeout in seconds
+        """
+        self.transport_factory = transport_factory
+        self.timeout = timeout
+        self.commands = 0
+        self.starts = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self._transport: Optional[ShellTransport] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def execute(self, command: str, timeout: Optional[float] = None) -> tuple[str, int]:
+        """Run a command and wait for its output.
+
+        Args:
+            command: Command in the worker's language
+            timeout: Seconds to wait; defaults to the host's timeout
+
+        Returns:
+            Tuple of (output, exit status), with the same failure messages
+            as a one-off process: 'Command execution timed out' or
+            'Command execution failed' with status 1
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self.commands += 1
+            for attempt in range(2):
+                try:
+                    transport = self._ensure_started()
+                    request_id = next(self._ids)
+                    transport.send(encode_request(request_id, command))
+                except OSError as e:
+                    logger.debug(f"Shell host unavailable: {e}")
+                    self._discard()
+                    continue
+                return self._await_response(transport, request_id, timeout)
+            return ('Command execution failed', 1)
+
+    def _await_response(self, transport: ShellTransport, request_id: int, timeout: float) -> tuple[str, int]:
+        """Read lines until the response to request_id arrives."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = transport.receive(max(0.0, remaining)) if remaining > 0 else None
+            except EOFError:
+                self.crashes += 1
+                status = transport.exit_status()
+                logger.warning(f"Shell host exited with status {status} while running a command; it will be restarted")
+                self._discard()
+                return ('', status) if status is not None else ('Command execution failed', 1)
+            if line is None:
+                self.timeouts += 1
+                logger.warning(f"Shell command timed out after {timeout}s; restarting shell host")
+                self._discard()
+                return ('Command execution timed out', 1)
+            try:
+                response_id, status, output, errors = decode_response(line)
+            except ValueError:
+                # Stray output written outside the protocol
+                continue
+            if response_id == request_id:
+                return (output or errors, status)
+
+    def _ensure_started(self) -> ShellTransport:
+        if self._transport is None or not self._transport.is_alive():
+            self._discard()
+            transport = self.transport_factory()
+            transport.start()
+            self._transport = transport
+            self.starts += 1
+        return self._transport
+
+    def _discard(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def close(self):
+        """Stop the worker."""
+        with self._lock:
+            self._discard()
+
+    def stats(self) -> dict:
+        """Return command, start, timeout and crash counters."""
+        return {
+            "commands": self.commands,
+            "starts": self.starts,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes
+        }
@@ -49,3 +49,11 @@ class App:
             self.size.height,
             self.handle
         ]
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    """Metadata of one process instance, identified by PID and creation time."""
+    pid: int
+    create_time: float
+    name: str
@@ -0,0 +1 @@
+"""Screen capture and image encoding module."""
@@ -0,0 +1,141 @@
+"""Screen capture straight from the raw mss buffer into PIL images.
+
+mss returns pixels as a BGRA buffer. Its ``.rgb`` property converts that
+into a new RGB bytes object through several slice copies, and
+``Image.frombytes`` then copies it once more. Here the BGRA buffer is
+handed to PIL through a memoryview and PIL's raw decoder swaps the
+channel order while filling the image, so the pixels are copied exactly
+once.
+"""
+
+import threading
+
+import numpy as np
+from PIL import Image
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+# mss instances hold per-thread device contexts, so each thread gets its own
+_local = threading.local()
+
+
+def image_from_bgra(buffer, width: int, height: int) -> Image.Image:
+    """Build an RGB image from a BGRA/BGRX pixel buffer with a single copy.
+
+    Args:
+        buffer: Object supporting the buffer protocol, 4 bytes per pixel,
+            rows top to bottom without padding
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        RGB image owning its pixels; the buffer may be reused afterwards
+    """
+    return Image.frombuffer('RGB', (width, height), memoryview(buffer), 'raw', 'BGRX', 0, 1)
+
+
+def crop_bgra(buffer, width: int, height: int, box: tuple[int, int, int, int]) -> Image.Image:
+    """Build an RGB image of one rectangle of a BGRA/BGRX pixel buffer.
+
+    Only the rectangle's pixels are converted, which for small regions is
+    much cheaper than converting the whole frame and cropping.
+
+    Args:
+        buffer: Frame buffer, 4 bytes per pixel, as for image_from_bgra()
+        width: Frame width in pixels
+        height: Frame height in pixels
+        box: (left, top, right, bottom) of the rectangle within the frame
+
+    Returns:
+        RGB image of the rectangle
+    """
+    left, top, right, bottom = box
+    if (left, top, right, bottom) == (0, 0, width, height):
+        return image_from_bgra(buffer, width, height)
+    pixels = np.frombuffer(buffer, dtype=np.uint8, count=width * height * 4).reshape(height, width, 4)
+    region = np.ascontiguousarray(pixels[top:bottom, left:right])
+    return image_from_bgra(region, right - left, bottom - top)
+
+
+def _screen_capture():
+    sct = getattr(_local, 'sct', None)
+    if sct is None:
+        sct = _local.sct = mss.mss()
+    return sct
+
+
+def monitors() -> list[dict]:
+    """Return the mss monitor list; entry 0 is the whole virtual screen."""
+    return _screen_capture().monitors
+
+
+def monitor_region(index: int) -> dict:
+    """Return the region of one monitor (1-based), or of the whole virtual screen for 0.
+
+    Raises:
+        IndexError: If there is no such monitor
+    """
+    sct = _screen_capture()
+    if not 0 <= index < len(sct.monitors):
+        raise IndexError(f"Monitor {index} not found. Available: {len(sct.monitors) - 1}")
+    return sct.monitors[index]
+
+
+def clip_region(left: int, top: int, width: int, height: int) -> dict:
+    """Clip a rectangle to the virtual screen.
+
+    Returns:
+        Region dict for grab_raw()
+
+    Raises:
+        ValueError: If the rectangle lies entirely off screen or is empty
+    """
+    screen = monitor_region(0)
+    right = min(left + width, screen['left'] + screen['width'])
+    bottom = min(top + height, screen['top'] + screen['height'])
+    left, top = max(left, screen['left']), max(top, screen['top'])
+    if right <= left or bottom <= top:
+        raise ValueError(f"Region ({left}, {top}, {width}x{height}) is outside the screen")
+    return {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+
+
+def grab_raw(region: dict) -> tuple[bytearray, int, int]:
+    """Capture a region without converting it.
+
+    Args:
+        region: Dict with left, top, width and height in virtual screen
+            coordinates, e.g. from monitor_region()
+
+    Returns:
+        Tuple of (BGRA buffer, width, height), ready for image_from_bgra()
+    """
+    shot = _screen_capture().grab(region)
+    return shot.raw, shot.width, shot.height
+
+
+def grab(left: int, top: int, width: int, height: int) -> Image.Image:
+    """Capture a rectangle of the virtual screen.
+
+    Args:
+        left: Left edge in virtual screen coordinates
+        top: Top edge in virtual screen coordinates
+        width: Width in pixels
+        height: Height in pixels
+
+    Returns:
+        RGB image of the rectangle
+    """
+    return image_from_bgra(*grab_raw({'left': left, 'top': top, 'width': width, 'height': height}))
+
+
+def grab_monitor(index: int) -> Image.Image:
+    """Capture one monitor (1-based), or the whole virtual screen for 0.
+
+    Raises:
+        IndexError: If there is no such monitor
+    """
+    return image_from_bgra(*grab_raw(monitor_region(index)))
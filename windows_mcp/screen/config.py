@@ -0,0 +1,73 @@
+"""Configuration for screen capture and image encoding."""
+
+# Encoder settings per output profile. JPEG subsampling follows PIL:
+# 0 = 4:4:4, 1 = 4:2:2, 2 = 4:2:0. On desktop-like frames zlib levels 1-3
+# (deflate's fast strategy) beat 6-9 on both time and size, see
+# benchmarks/bench_encode.py
+ENCODE_PROFILES: dict[str, dict] = {
+    'fast': {
+        'jpeg_quality': 85, 'jpeg_optimize': False, 'jpeg_subsampling': 2,
+        'png_compress_level': 1, 'png_optimize': False,
+    },
+    'small': {
+        'jpeg_quality': 70, 'jpeg_optimize': True, 'jpeg_subsampling': 2,
+        'png_compress_level': 3, 'png_optimize': False,
+    },
+}
+
+# Profile used when a caller does not choose one
+DEFAULT_ENCODE_PROFILE = 'fast'
+
+# Threads in the shared encoding pool
+ENCODE_WORKERS = 4
+
+# Edge length of the tiles large captures are split into (a multiple of 16,
+# so JPEG blocks never straddle tile borders)
+ENCODE_TILE_SIZE = 1024
+
+# Captures with more pixels than this are split into tiles when tiling is requested
+ENCODE_TILE_MIN_PIXELS = 3840 * 2160
+
+# Encoded frames kept by the frame cache
+FRAME_CACHE_ENTRIES = 16
+
+# Memory the frame cache may hold in encoded bytes
+FRAME_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Disk the frame cache's screenshot files may use; evicted files are deleted
+FRAME_CACHE_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+# hashlib algorithm for frame digests. sha256 is hardware accelerated
+# (SHA-NI) on current CPUs and hashes a 4K BGRA frame about twice as fast
+# as blake2b, see benchmarks/bench_frames.py
+FRAME_HASH_ALGORITHM = 'sha256'
+
+# Directory in the system temp directory that screenshot files are spooled to
+SPOOL_DIR_NAME = 'windows_mcp_screenshots'
+
+# Maximum total size of the spooled screenshot files
+SPOOL_MAX_BYTES = 512 * 1024 * 1024
+
+# Maximum number of spooled screenshot files
+SPOOL_MAX_FILES = 200
+
+# Seconds after which a spooled screenshot is deleted
+SPOOL_MAX_AGE = 24 * 60 * 60
+
+# Name prefixes of screenshots earlier versions left in the temp directory itself
+LEGACY_SCREENSHOT_PREFIXES = ('windows_mcp_screen_', 'windows_mcp_screenshot_')
+
+# Edge length in pixels of the tiles screenshot diffs compare
+DIFF_TILE_SIZE = 64
+
+# Tile edge lengths accepted from clients; small tiles make huge change masks
+DIFF_MIN_TILE_SIZE = 8
+DIFF_MAX_TILE_SIZE = 512
+
+# Diffs changing more than this share of the frame send the full frame instead
+DIFF_FULL_FRAME_FRACTION = 0.6
+
+# Previous frames kept for diffs (one per monitor or captured rectangle), and
+# their total size in bytes; least recently diffed frames are dropped first
+DIFF_MAX_FRAMES = 8
+DIFF_MAX_BYTES = 256 * 2 ** 20
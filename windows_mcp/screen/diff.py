@@ -0,0 +1,202 @@
+"""Dirty-tile comparison of consecutive screen captures.
+
+Frames are compared as raw BGRA buffers, viewed by NumPy as one uint32 per
+pixel without copying. A single vectorized comparison finds the changed
+pixels, and reducing over a tile grid gives a boolean change mask with one
+cell per tile. Changed tiles are merged into rectangles, so a changed
+text line or dialog becomes one region instead of dozens of tiles.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import numpy as np
+
+from windows_mcp.screen.config import DIFF_MAX_BYTES, DIFF_MAX_FRAMES, DIFF_TILE_SIZE
+
+
+@dataclass(frozen=True)
+class DirtyRegion:
+    """Changed rectangle of a frame, in pixels relative to the frame."""
+    left: int
+    top: int
+    width: int
+    height: int
+
+    @property
+    def box(self) -> tuple[int, int, int, int]:
+        """(left, top, right, bottom), as taken by Image.crop."""
+        return (self.left, self.top, self.left + self.width, self.top + self.height)
+
+
+@dataclass
+class FrameDiff:
+    """Changes between a frame and the previous one.
+
+    ``baseline`` is True when there was no comparable previous frame (the
+    first capture, an evicted frame, or the size or geometry changed); mask
+    and regions then cover the whole frame.
+    """
+    width: int
+    height: int
+    tile_size: int
+    mask: np.ndarray
+    regions: list[DirtyRegion]
+    baseline: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.regions)
+
+    @property
+    def changed_fraction(self) -> float:
+        """Share of the frame's pixels inside changed regions."""
+        return sum(r.width * r.height for r in self.regions) / float(self.width * self.height)
+
+    def mask_to_string(self) -> str:
+        """Render the change mask, one line per tile row: '#' changed, '.' unchanged."""
+        return "\n".join("".join('#' if cell else '.' for cell in row) for row in self.mask)
+
+
+def change_mask(previous, current, width: int, height: int, tile_size: int = DIFF_TILE_SIZE) -> np.ndarray:
+    """Compare two BGRA buffers tile by tile.
+
+    Args:
+        previous: Earlier frame, 4 bytes per pixel
+        current: New frame of the same size
+        width: Frame width in pixels
+        height: Frame height in pixels
+        tile_size: Tile edge length in pixels
+
+    Returns:
+        Boolean array of shape (tile rows, tile columns), True where any
+        pixel of the tile differs
+    """
+    before = np.frombuffer(previous, dtype=np.uint32, count=width * height).reshape(height, width)
+    after = np.frombuffer(current, dtype=np.uint32, count=width * height).reshape(height, width)
+    changed = before != after
+    rows, cols = -(-height // tile_size), -(-width // tile_size)
+    pad_h, pad_w = rows * tile_size - height, cols * tile_size - width
+    if pad_h or pad_w:
+        changed = np.pad(changed, ((0, pad_h), (0, pad_w)))
+    return changed.reshape(rows, tile_size, cols, tile_size).any(axis=(1, 3))
+
+
+def mask_regions(mask: np.ndarray, width: int, height: int, tile_size: int) -> list[DirtyRegion]:
+    """Merge runs of changed tiles into rectangles clipped to the frame.
+
+    Horizontal runs are merged first; runs spanning the same columns in
+    consecutive rows are then stacked into one rectangle.
+    """
+    # (first column, end column) -> [first row, last row] of the rectangle being grown
+    open_runs: dict[tuple[int, int], list[int]] = {}
+    spans = []
+    for row, col_start, col_end in _runs(mask):
+        span = open_runs.get((col_start, col_end))
+        if span is not None and span[1] == row - 1:
+            span[1] = row
+            continue
+        span = [row, row]
+        open_runs[(col_start, col_end)] = span
+        spans.append((col_start, col_end, span))
+    regions = []
+    for col_start, col_end, (row_start, row_end) in spans:
+        left, top = col_start * tile_size, row_start * tile_size
+        regions.append(DirtyRegion(
+            left=left,
+            top=top,
+            width=min(col_end * tile_size, width) - left,
+            height=min((row_end + 1) * tile_size, height) - top
+        ))
+    return regions
+
+
+def _runs(mask: np.ndarray) -> list[tuple[int, int, int]]:
+    """Return (row, first column, end column) of every run of True cells."""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)
+    return [(int(row), int(start), int(end)) for (row, start), (_, end) in zip(starts, ends)]
+
+
+class FrameDiffer:
+    """Keeps the last frame per key (e.g. monitor) and diffs new captures against it.
+
+    Frames are kept least recently used first: once more than max_frames
+    keys or max_bytes of frames are held, the frames diffed longest ago are
+    dropped, and their next capture becomes a new baseline.
+    """
+
+    def __init__(self, tile_size: int = DIFF_TILE_SIZE, max_frames: int = DIFF_MAX_FRAMES,
+                 max_bytes: int = DIFF_MAX_BYTES):
+        """Initialize the differ.
+
+        Args:
+            tile_size: Default tile edge length in pixels
+            max_frames: Maximum number of keys with a kept frame
+            max_bytes: Maximum total size of the kept frames
+        """
+        self.tile_size = tile_size
+        self.max_frames = max(1, max_frames)
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.frame_bytes = 0
+        # key -> (raw, width, height, geometry)
+        self._frames: OrderedDict[Hashable, tuple[object, int, int, Hashable]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def diff(
+        self, key: Hashable, raw, width: int, height: int, tile_size: Optional[int] = None,
+        geometry: Hashable = None
+    ) -> FrameDiff:
+        """Diff a capture against the previous one for key, then make it the new baseline.
+
+        Args:
+            key: Which frame sequence this capture belongs to
+            raw: BGRA buffer of the capture; kept by reference, so it must
+                not be modified afterwards
+            width: Width in pixels
+            height: Height in pixels
+            tile_size: Tile edge length overriding the default
+            geometry: Where the capture was taken from (e.g. a monitor's
+                desktop rectangle); a change resets the baseline even if
+                the size is the same
+
+        Returns:
+            The changes since the previous capture
+        """
+        tile_size = max(1, tile_size or self.tile_size)
+        with self._lock:
+            previous = self._frames.pop(key, None)
+            if previous is not None:
+                self.frame_bytes -= len(previous[0])
+            self._frames[key] = (raw, width, height, geometry)
+            self.frame_bytes += len(raw)
+            self._evict()
+        if previous is None or previous[1:] != (width, height, geometry):
+            mask = np.ones((-(-height // tile_size), -(-width // tile_size)), dtype=bool)
+            return FrameDiff(width, height, tile_size, mask, [DirtyRegion(0, 0, width, height)], baseline=True)
+        mask = change_mask(previous[0], raw, width, height, tile_size)
+        return FrameDiff(width, height, tile_size, mask, mask_regions(mask, width, height, tile_size))
+
+    def _evict(self):
+        """Drop least recently diffed frames, never the newest, until within the limits."""
+        while len(self._frames) > 1 and (len(self._frames) > self.max_frames or self.frame_bytes > self.max_bytes):
+            _, (raw, *_) = self._frames.popitem(last=False)
+            self.frame_bytes -= len(raw)
+            self.evictions += 1
+
+    def reset(self, key: Optional[Hashable] = None):
+        """Forget the baseline for key, or for every key."""
+        with self._lock:
+            if key is None:
+                self._frames.clear()
+                self.frame_bytes = 0
+            else:
+                previous = self._frames.pop(key, None)
+                if previous is not None:
+                    self.frame_bytes -= len(previous[0])
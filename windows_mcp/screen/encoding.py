@@ -0,0 +1,213 @@
+"""Image encoding on a shared worker pool, with per-profile encoder settings."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from threading import Lock
+from typing import Optional
+
+from PIL import Image
+
+from windows_mcp.screen.config import (
+    DEFAULT_ENCODE_PROFILE,
+    ENCODE_PROFILES,
+    ENCODE_TILE_MIN_PIXELS,
+    ENCODE_TILE_SIZE,
+    ENCODE_WORKERS
+)
+
+logger = logging.getLogger('windows-mcp.screen')
+
+
+@dataclass(frozen=True)
+class EncodeProfile:
+    """Encoder settings for one output profile."""
+    name: str
+    jpeg_quality: int
+    jpeg_optimize: bool
+    jpeg_subsampling: int
+    png_compress_level: int
+    png_optimize: bool
+
+    def save_options(self, image_format: str, quality: Optional[int] = None) -> dict:
+        """Return keyword arguments for Image.save.
+
+        Args:
+            image_format: 'JPEG' or 'PNG'
+            quality: JPEG quality overriding the profile's
+        """
+        if image_format == 'JPEG':
+            return {
+                'format': 'JPEG',
+                'quality': self.jpeg_quality if quality is None else quality,
+                'optimize': self.jpeg_optimize,
+                'subsampling': self.jpeg_subsampling
+            }
+        return {'format': 'PNG', 'compress_level': self.png_compress_level, 'optimize': self.png_optimize}
+
+
+@dataclass(frozen=True)
+class EncodedTile:
+    """One independently encoded part of a larger image."""
+    left: int
+    top: int
+    width: int
+    height: int
+    data: bytes
+
+
+class ImageEncoder:
+    """Encodes images to JPEG or PNG using named profiles.
+
+    PIL releases the GIL while encoding, so encodes submitted to the pool,
+    and the tiles of one large image, run in parallel. The pool is created
+    on first use.
+    """
+
+    def __init__(self, workers: int = ENCODE_WORKERS, profiles: Optional[dict[str, dict]] = None):
+        """Initialize the encoder.
+
+        Args:
+            workers: Threads in the encoding pool
+            profiles: Profile name -> EncodeProfile fields; defaults to
+                ENCODE_PROFILES
+        """
+        self.workers = max(1, workers)
+        self.profiles = {
+            name: EncodeProfile(name=name, **settings)
+            for name, settings in (ENCODE_PROFILES if profiles is None else profiles).items()
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image-encode')
+            return self._executor
+
+    def profile(self, name: Optional[str] = None) -> EncodeProfile:
+        """Look up a profile by name (the default profile for None).
+
+        Raises:
+            ValueError: If there is no such profile
+        """
+        name = name or DEFAULT_ENCODE_PROFILE
+        if name not in self.profiles:
+            raise ValueError(f"Unknown encode profile '{name}'. Available: {', '.join(self.profiles)}")
+        return self.profiles[name]
+
+    def encode(
+        self, image: Image.Image, image_format: str = 'JPEG', profile: Optional[str] = None, quality: Optional[int] = None
+    ) -> bytes:
+        """Encode an image in the calling thread.
+
+        Args:
+            image: Image to encode
+            image_format: 'JPEG' or 'PNG'
+            profile: Profile name; the default profile if None
+            quality: JPEG quality overriding the profile's
+
+        Returns:
+            Encoded image bytes
+        """
+        options = self.profile(profile).save_options(image_format.upper(), quality)
+        buffer = BytesIO()
+        image.save(buffer, **options)
+        return buffer.getvalue()
+
+    async def encode_async(
+        self, image: Image.Image, image_format: str = 'JPEG', profile: Optional[str] = None, quality: Optional[int] = None
+    ) -> bytes:
+        """Encode an image on the pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.encode, image, image_format, profile, quality)
+
+    def encode_tiles(
+        self,
+        image: Image.Image,
+        image_format: str = 'JPEG',
+        profile: Optional[str] = None,
+        quality: Optional[int] = None,
+        tile_size: int = ENCODE_TILE_SIZE
+    ) -> list[EncodedTile]:
+        """Split an image into a grid of tiles and encode them in parallel.
+
+        Must not be called from a thread of this encoder's own pool.
+
+        Args:
+            image: Image to encode
+            image_format: 'JPEG' or 'PNG'
+            profile: Profile name; the default profile if None
+            quality: JPEG quality overriding the profile's
+            tile_size: Maximum tile width and height in pixels
+
+        Returns:
+            Tiles in row-major order with their offsets in the image
+        """
+        boxes = [
+            (left, top, min(left + tile_size, image.width), min(top + tile_size, image.height))
+            for top in range(0, image.height, tile_size)
+            for left in range(0, image.width, tile_size)
+        ]
+        return self.encode_regions(image, boxes, image_format, profile, quality)
+
+    def encode_regions(
+        self,
+        image: Image.Image,
+        boxes: list[tuple[int, int, int, int]],
+        image_format: str = 'JPEG',
+        profile: Optional[str] = None,
+        quality: Optional[int] = None
+    ) -> list[EncodedTile]:
+        """Crop the given boxes out of an image and encode them in parallel.
+
+        Must not be called from a thread of this encoder's own pool.
+
+        Args:
+            image: Image to encode
+            boxes: (left, top, right, bottom) boxes in image pixels
+            image_format: 'JPEG' or 'PNG'
+            profile: Profile name; the default profile if None
+            quality: JPEG quality overriding the profile's
+
+        Returns:
+            One tile per box, in the same order
+        """
+        encoded = self.encode_many([image.crop(box) for box in boxes], image_format, profile, quality)
+        return [
+            EncodedTile(left=box[0], top=box[1], width=box[2] - box[0], height=box[3] - box[1], data=data)
+            for box, data in zip(boxes, encoded)
+        ]
+
+    def encode_many(
+        self,
+        images: list[Image.Image],
+        image_format: str = 'JPEG',
+        profile: Optional[str] = None,
+        quality: Optional[int] = None
+    ) -> list[bytes]:
+        """Encode several images in parallel on the pool.
+
+        Must not be called from a thread of this encoder's own pool.
+
+        Returns:
+            Encoded bytes per image, in the same order
+        """
+        futures = [self.executor.submit(self.encode, image, image_format, profile, quality) for image in images]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def should_tile(image: Image.Image) -> bool:
+        """Return True if the image is large enough to be worth tiling."""
+        return image.width * image.height > ENCODE_TILE_MIN_PIXELS
+
+    def shutdown(self):
+        """Stop the encoding pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,170 @@
+"""Cache of encoded screenshots keyed by a digest of the captured pixels."""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from windows_mcp.screen.config import (
+    FRAME_CACHE_ENTRIES,
+    FRAME_CACHE_MAX_BYTES,
+    FRAME_CACHE_MAX_DISK_BYTES,
+    FRAME_HASH_ALGORITHM
+)
+from windows_mcp.screen.spool import ScreenshotSpool
+
+logger = logging.getLogger('windows-mcp.screen')
+
+
+@dataclass
+class CachedFrame:
+    """Encoded output of one frame: its bytes, its file, or both."""
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    disk_bytes: int = 0
+
+
+class FrameCache:
+    """LRU cache that lets identical captures skip encoding and file writes.
+
+    Callers key entries by frame_cache.digest(raw_pixels) plus whatever else
+    determines the output (format, quality, annotations). Entries hold the
+    encoded bytes, the path of a file the cache owns, or both. When the
+    bytes held exceed max_bytes, the least recently used entries give up
+    their bytes but keep their file; when the files exceed max_disk_bytes
+    or there are more than max_entries entries, the least recently used
+    entries are dropped and their files deleted. With a spool, files are
+    deleted through it, and reuse marks them as recently used there too.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = FRAME_CACHE_ENTRIES,
+        max_bytes: int = FRAME_CACHE_MAX_BYTES,
+        max_disk_bytes: int = FRAME_CACHE_MAX_DISK_BYTES,
+        algorithm: str = FRAME_HASH_ALGORITHM,
+        spool: Optional[ScreenshotSpool] = None
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached frames
+            max_bytes: Maximum encoded bytes held in memory
+            max_disk_bytes: Maximum size of the files owned by the cache
+            algorithm: hashlib algorithm used by digest()
+            spool: Spool the cached files were written to
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.algorithm = algorithm
+        self.spool = spool
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self._entries: OrderedDict[Hashable, CachedFrame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, buffer) -> str:
+        """Hash a raw pixel buffer without copying it."""
+        return hashlib.new(self.algorithm, memoryview(buffer)).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[CachedFrame]:
+        """Return the entry for key, marking it most recently used.
+
+        A file deleted behind the cache's back is forgotten; the entry is
+        only returned if it still has bytes.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.path is not None and not os.path.exists(entry.path):
+                self.disk_bytes -= entry.disk_bytes
+                entry.path, entry.disk_bytes = None, 0
+                if entry.data is None:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if self.spool is not None and entry.path is not None:
+                self.spool.touch(entry.path)
+            return CachedFrame(entry.data, entry.path, entry.disk_bytes)
+
+    def put(self, key: Hashable, data: Optional[bytes] = None, path: Optional[str] = None):
+        """Store the encoded output of a frame.
+
+        Args:
+            key: Digest-based key of the frame
+            data: Encoded bytes, if they should be kept in memory
+            path: File holding the encoded bytes; the cache takes ownership
+                and deletes it on eviction
+        """
+        disk_bytes = 0
+        if path is not None:
+            try:
+                disk_bytes = os.path.getsize(path)
+            except OSError:
+                path = None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._forget(previous, keep_path=path)
+            self._entries[key] = CachedFrame(data, path, disk_bytes)
+            self.memory_bytes += len(data) if data is not None else 0
+            self.disk_bytes += disk_bytes
+            self._evict()
+
+    def _forget(self, entry: CachedFrame, keep_path: Optional[str] = None):
+        """Release an entry's accounting and delete its file unless still in use."""
+        self.memory_bytes -= len(entry.data) if entry.data is not None else 0
+        self.disk_bytes -= entry.disk_bytes
+        if entry.path is not None and entry.path != keep_path:
+            if self.spool is not None:
+                self.spool.remove(entry.path)
+                return
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        for key, entry in self._entries.items():
+            if self.memory_bytes <= self.max_bytes:
+                break
+            if entry.data is not None and entry.path is not None:
+                self.memory_bytes -= len(entry.data)
+                entry.data = None
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or self.disk_bytes > self.max_disk_bytes
+            or self.memory_bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._forget(entry)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and delete the files the cache owns."""
+        with self._lock:
+            for entry in self._entries.values():
+                self._forget(entry)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit, miss and eviction counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "memory_bytes": self.memory_bytes,
+                "disk_bytes": self.disk_bytes
+            }
@@ -0,0 +1,215 @@
+"""Size-bounded spool directory for screenshot files handed to clients."""
+
+import itertools
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from windows_mcp.screen.config import (
+    LEGACY_SCREENSHOT_PREFIXES,
+    SPOOL_DIR_NAME,
+    SPOOL_MAX_AGE,
+    SPOOL_MAX_BYTES,
+    SPOOL_MAX_FILES
+)
+
+logger = logging.getLogger('windows-mcp.screen')
+
+# Suffix of files being written; they are renamed into place when complete
+PARTIAL_SUFFIX = '.partial'
+
+
+class ScreenshotSpool:
+    """Directory of screenshot files, kept within a file count, size and age.
+
+    Files are written under a temporary name and renamed into place, so a
+    client never sees a half-written image. Files are evicted least recently
+    used first (touch() marks reuse) once the spool holds more than
+    max_files files or max_bytes bytes, and files older than max_age are
+    evicted regardless. open(), called at startup or on first write, adopts
+    files left by earlier runs, deletes interrupted writes, and deletes
+    loose screenshots older than max_age that earlier versions left in the
+    temp directory.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = SPOOL_MAX_BYTES,
+        max_files: int = SPOOL_MAX_FILES,
+        max_age: Optional[float] = SPOOL_MAX_AGE
+    ):
+        """Initialize the spool.
+
+        Args:
+            directory: Spool directory; defaults to SPOOL_DIR_NAME in the
+                system temp directory
+            max_bytes: Maximum total size of the spooled files
+            max_files: Maximum number of spooled files
+            max_age: Seconds after which a file is evicted; None keeps files
+                until the size or count limit evicts them
+        """
+        self.directory = directory or os.path.join(tempfile.gettempdir(), SPOOL_DIR_NAME)
+        self.max_bytes = max_bytes
+        self.max_files = max(1, max_files)
+        self.max_age = max_age
+        self.writes = 0
+        self.bytes_written = 0
+        self.evictions: Counter = Counter()
+        self.orphans_removed = 0
+        self.total_bytes = 0
+        # path -> (size, last use as time.time())
+        self._files: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._names = itertools.count()
+        self._opened = False
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Create the directory and clean up after earlier runs; idempotent."""
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        if self._opened:
+            return
+        self._opened = True
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        existing = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if entry.name.endswith(PARTIAL_SUFFIX):
+                # Interrupted writes; leave very recent ones to a concurrent writer
+                if now - stat.st_mtime > 60:
+                    self._unlink(entry.path)
+                    self.orphans_removed += 1
+                continue
+            existing.append((stat.st_mtime, entry.path, stat.st_size))
+        for mtime, path, size in sorted(existing):
+            self._files[path] = (size, mtime)
+            self.total_bytes += size
+        self._remove_legacy(now)
+        self._evict(now)
+        logger.debug(f"Screenshot spool {self.directory}: adopted {len(self._files)} files, "
+                     f"removed {self.orphans_removed} orphans")
+
+    def _remove_legacy(self, now: float):
+        """Delete old loose screenshots written straight into the temp directory."""
+        if self.max_age is None:
+            return
+        try:
+            entries = list(os.scandir(tempfile.gettempdir()))
+        except OSError:
+            return
+        for entry in entries:
+            if not entry.name.startswith(LEGACY_SCREENSHOT_PREFIXES):
+                continue
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > self.max_age:
+                    self._unlink(entry.path)
+                    self.orphans_removed += 1
+            except OSError:
+                pass
+
+    def write(self, data: bytes, prefix: str, ext: str) -> str:
+        """Atomically write a new file into the spool.
+
+        Args:
+            data: File contents
+            prefix: File name prefix, e.g. 'windows_mcp_screen'
+            ext: Extension without the dot
+
+        Returns:
+            Path of the complete file
+        """
+        with self._lock:
+            self._open()
+            name = f"{prefix}_{int(time.time() * 1000)}_{next(self._names)}.{ext}"
+        path = os.path.join(self.directory, name)
+        partial = path + PARTIAL_SUFFIX
+        try:
+            with open(partial, 'wb') as f:
+                f.write(data)
+            os.replace(partial, path)
+        except OSError:
+            self._unlink(partial)
+            raise
+        now = time.time()
+        with self._lock:
+            self._files[path] = (len(data), now)
+            self.total_bytes += len(data)
+            self.writes += 1
+            self.bytes_written += len(data)
+            self._evict(now, keep=path)
+        return path
+
+    def touch(self, path: str):
+        """Mark a spooled file as just reused, protecting it from LRU eviction."""
+        with self._lock:
+            if path in self._files:
+                size, _ = self._files[path]
+                self._files[path] = (size, time.time())
+                self._files.move_to_end(path)
+
+    def remove(self, path: str):
+        """Delete a spooled file early."""
+        with self._lock:
+            entry = self._files.pop(path, None)
+            if entry is None:
+                return
+            self.total_bytes -= entry[0]
+        self._unlink(path)
+
+    def owns(self, path: str) -> bool:
+        """Return True if the file is tracked by the spool."""
+        with self._lock:
+            return path in self._files
+
+    def _evict(self, now: float, keep: Optional[str] = None):
+        """Evict expired files, then least recently used ones until within the limits."""
+        if self.max_age is not None:
+            for path, (size, used) in list(self._files.items()):
+                if now - used <= self.max_age:
+                    break
+                self._drop(path, 'age')
+        for path in list(self._files):
+            if len(self._files) <= self.max_files and self.total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._drop(path, 'count' if len(self._files) > self.max_files else 'size')
+
+    def _drop(self, path: str, reason: str):
+        size, _ = self._files.pop(path)
+        self.total_bytes -= size
+        self.evictions[reason] += 1
+        self._unlink(path)
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        """Return spool size, write and eviction counters."""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "files": len(self._files),
+                "bytes": self.total_bytes,
+                "writes": self.writes,
+                "bytes_written": self.bytes_written,
+                "evictions": dict(self.evictions),
+                "orphans_removed": self.orphans_removed
+            }
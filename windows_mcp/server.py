@@ -11,7 +11,7 @@ This MCP server provides AI with tools to:
 
 import asyncio
 import base64
-import io
+import functools
 import os
 import subprocess
 import sys
@@ -20,10 +20,14 @@ import logging
 import contextlib
 from typing import Any, Optional
 
-import mss
 import psutil
-import pyautogui
-from PIL import Image
+
+try:
+    import pyautogui
+    PYAUTOGUI_AVAILABLE = True
+except ImportError:
+    PYAUTOGUI_AVAILABLE = False
+    print("Warning: pyautogui not available. Mouse and keyboard tools will be limited.")
 
 try:
     import win32api
@@ -38,6 +42,14 @@ except ImportError:
 try:
     from windows_mcp.desktop.service import Desktop
     from windows_mcp.tree.service import Tree
+    from windows_mcp.tree.pool import TraversalPool
+    from windows_mcp.tree.backend import initialize_uiautomation_thread
+    from windows_mcp.tree.cancel import CancelToken
+    from windows_mcp.tree.config import INCREMENTAL_REFRESH, STATE_PAGE_SIZE, STATE_MAX_PAGE_SIZE
+    from windows_mcp.tree.events import UIAutomationEventSource
+    from windows_mcp.tree.paging import paginate, encode_cursor, decode_cursor
+    from windows_mcp.tree.delta import diff_states, delta_to_string
+    from windows_mcp.tree.views import ElementFilter, ScanScope
     DESKTOP_SERVICE_AVAILABLE = True
 except ImportError:
     DESKTOP_SERVICE_AVAILABLE = False
@@ -63,6 +75,27 @@ except ImportError:
     def create_error_response(msg, tool=""): return [TextContent(type="text", text=f"Error: {msg}")]
     def create_success_response(msg, extra=None): return [TextContent(type="text", text=msg)]
 
+try:
+    from windows_mcp.desktop.processes import ProcessCache
+    PROCESS_CACHE_AVAILABLE = True
+except ImportError:
+    PROCESS_CACHE_AVAILABLE = False
+    print("Warning: Process cache not available. Window tools will not report processes.")
+
+# Plain constants, importable without the capture dependencies
+from windows_mcp.screen.config import DIFF_FULL_FRAME_FRACTION, DIFF_MAX_TILE_SIZE, DIFF_MIN_TILE_SIZE, DIFF_TILE_SIZE
+
+try:
+    from windows_mcp.screen import capture
+    from windows_mcp.screen.encoding import EncodedTile, ImageEncoder
+    from windows_mcp.screen.diff import FrameDiffer
+    from windows_mcp.screen.frames import FrameCache
+    from windows_mcp.screen.spool import ScreenshotSpool
+    SCREEN_AVAILABLE = True
+except ImportError:
+    SCREEN_AVAILABLE = False
+    print("Warning: Screen capture not available. Screenshot tools will be limited.")
+
 from mcp.server import Server
 from mcp.types import (
     Tool,
@@ -82,22 +115,130 @@ logging.basicConfig(
 logger = logging.getLogger('windows-mcp.server')
 
 # Configure PyAutoGUI safety
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.1
+if PYAUTOGUI_AVAILABLE:
+    pyautogui.FAILSAFE = True
+    pyautogui.PAUSE = 0.1
 
 # Initialize MCP server
 app = Server("windows-mcp-server")
 
 # Initialize desktop service and cached state
 desktop_service = Desktop() if DESKTOP_SERVICE_AVAILABLE else None
-cached_tree_state = None
-cached_tree_timestamp = 0
+traversal_pool = TraversalPool(initializer=initialize_uiautomation_thread) if DESKTOP_SERVICE_AVAILABLE else None
+# Screenshot encoding runs on its own pool, shared by the screenshot tools
+image_encoder = ImageEncoder() if SCREEN_AVAILABLE else None
+# Screenshot files handed to clients live in a size-bounded spool directory
+screenshot_spool = ScreenshotSpool() if SCREEN_AVAILABLE else None
+# Encoded screenshots of unchanged screens are reused instead of re-encoded
+frame_cache = FrameCache(spool=screenshot_spool) if SCREEN_AVAILABLE else None
+# Last frame per monitor for screenshot diffs
+frame_differ = FrameDiffer() if SCREEN_AVAILABLE else None
+tree_service = Tree(
+    desktop_service, pool=traversal_pool, encoder=image_encoder, frames=frame_cache, spool=screenshot_spool,
+    event_source=UIAutomationEventSource() if INCREMENTAL_REFRESH else None
+) if DESKTOP_SERVICE_AVAILABLE else None
+# Process metadata shared by the tree scan and the window tools
+if desktop_service is not None:
+    process_cache = desktop_service.processes
+else:
+    process_cache = ProcessCache() if PROCESS_CACHE_AVAILABLE else None
+# Scans run one at a time on a dedicated COM-initialized thread, off the event loop
+scan_pool = TraversalPool(size=1, initializer=initialize_uiautomation_thread, name='tree-scan') if DESKTOP_SERVICE_AVAILABLE else None
+# Element re-resolution before clicks gets its own thread, so it never waits behind a scan
+resolve_pool = TraversalPool(size=1, initializer=initialize_uiautomation_thread, name='tree-resolve') \
+    if DESKTOP_SERVICE_AVAILABLE else None
+
+
+async def run_cancellable(pool: 'TraversalPool', func, *args, **kwargs):
+    """Run blocking tree work on a pool's threads without blocking the event loop.
+
+    func is called with a ``cancel`` keyword argument. If the awaiting
+    request is cancelled (by the client or a timeout), the token is
+    triggered so the traversal stops promptly, and the cancellation
+    propagates to the caller.
+    """
+    cancel = CancelToken()
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(pool.executor, functools.partial(func, *args, cancel=cancel, **kwargs))
+    try:
+        return await future
+    except asyncio.CancelledError:
+        cancel.cancel("request cancelled")
+        raise
+
+
+async def run_scan(func, *args, **kwargs):
+    """Run a tree scan on the scan thread; see run_cancellable."""
+    return await run_cancellable(scan_pool, func, *args, **kwargs)
+
+
+async def run_resolve(func, *args, **kwargs):
+    """Run element re-resolution on the resolve thread; see run_cancellable."""
+    return await run_cancellable(resolve_pool, func, *args, **kwargs)
+
+
+async def read_system_fact(getter, description: str) -> str:
+    """Run a blocking system query in a worker thread, returning "Unknown" on failure."""
+    try:
+        return await asyncio.to_thread(getter)
+    except Exception as e:
+        logger.warning(f"Could not get {description}: {e}")
+        return "Unknown"
+
+
+def invalidate_tree_state(reason: str):
+    """Mark the cached tree state stale after an input action changed the UI."""
+    if tree_service is not None:
+        tree_service.cache.invalidate(reason)
+
+
+def labeled_state(state_token: Optional[int]):
+    """Return the snapshot labels refer to: the given state token, or the latest state."""
+    if tree_service is None:
+        return None
+    if state_token is None:
+        return tree_service.cache.peek()
+    return tree_service.cache.snapshot(state_token)
+
+
+def revalidate_element(tree_state, label: int, cancel: Optional['CancelToken'] = None):
+    """Find a labeled element in the latest snapshot and refresh its position.
+
+    The label is first mapped onto the latest snapshot by fingerprint. If
+    that snapshot is no longer fresh, the element alone is re-read from the
+    live tree along its recorded path instead of rescanning the desktop.
+    The live read blocks, so callers run this on the resolve thread via run_resolve.
+
+    Returns:
+        (element, label, refreshed) in the latest state, or
+        (None, None, False) if the element is no longer present
+    """
+    element = tree_state.interactive_nodes[label]
+    latest = tree_service.cache.peek()
+    if latest is not None and latest is not tree_state:
+        current = latest.element_index().resolve(element)
+        if current is None:
+            return None, None, False
+        tree_state, label, element = latest, current, latest.interactive_nodes[current]
+
+    if tree_service.cache.is_fresh():
+        return element, label, False
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    fresh = tree_service.refresh_element(tree_state, label)
+    if fresh is None:
+        # Paths may not be walkable from a live window; fall back to the snapshot position
+        logger.warning(f"Could not re-resolve element {label}; using its last known position")
+        return element, label, False
+    return fresh, label, True
 
 logger.info("=" * 60)
 logger.info("Windows MCP Server v0.4.0 - ULTRA-FAST Edition Starting...")
 logger.info(f"Windows API available: {WINDOWS_AVAILABLE}")
 logger.info(f"Desktop Service available: {DESKTOP_SERVICE_AVAILABLE}")
 logger.info(f"Utils available: {UTILS_AVAILABLE}")
+logger.info(f"Screen capture available: {SCREEN_AVAILABLE}")
+logger.info(f"PyAutoGUI available: {PYAUTOGUI_AVAILABLE}")
 logger.info("=" * 60)
 
 
@@ -130,6 +271,56 @@ async def list_tools() -> list[Tool]:
                         "type": "boolean",
                         "description": "Include scrollable elements with scroll state",
                         "default": True
+                    },
+                    "force_refresh": {
+                        "type": "boolean",
+                        "description": "Rescan the UI tree and re-query the Windows version and language even if a recent cached state is available",
+                        "default": False
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of matching interactive elements to skip",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of interactive elements to return (max 2000)",
+                        "default": 200
+                    },
+                    "app_name": {
+                        "type": "string",
+                        "description": "Only include elements whose app name contains this text (case-insensitive)"
+                    },
+                    "control_type": {
+                        "type": "string",
+                        "description": "Only include elements of this control type, e.g. 'Button' or 'Edit'"
+                    },
+                    "region": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "Only include elements whose center lies in [left, top, right, bottom]"
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor from a previous page; returns the next page of the same snapshot without rescanning. Rejected once the snapshot was rescanned or input was sent since"
+                    },
+                    "since": {
+                        "type": "integer",
+                        "description": "State token from a previous response; returns only elements added, removed, moved or changed since then, plus a label remap"
+                    },
+                    "scope": {
+                        "type": "object",
+                        "description": "Scan only part of the desktop (faster). All given criteria must match; the taskbar and desktop are skipped unless they match.",
+                        "properties": {
+                            "window_handle": {"type": "integer", "description": "Native handle of one window to scan"},
+                            "process_id": {"type": "integer", "description": "Scan the visible windows of this process"},
+                            "app_name": {"type": "string", "description": "Scan visible windows whose title contains this text"},
+                            "region": {
+                                "type": "array",
+                                "items": {"type": "integer"},
+                                "description": "Only traverse UI within [left, top, right, bottom]"
+                            }
+                        }
                     }
                 }
             }
@@ -146,6 +337,10 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Element label number from get_desktop_state output"
                     },
+                    "state": {
+                        "type": "integer",
+                        "description": "State token of the get_desktop_state response the label came from (defaults to the latest state)"
+                    },
                     "button": {
                         "type": "string",
                         "description": "Mouse button to click",
@@ -173,6 +368,10 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Element label number from get_desktop_state output"
                     },
+                    "state": {
+                        "type": "integer",
+                        "description": "State token of the get_desktop_state response the label came from (defaults to the latest state)"
+                    },
                     "text": {
                         "type": "string",
                         "description": "Text to type into the element"
@@ -195,7 +394,7 @@ async def list_tools() -> list[Tool]:
         # Screen Capture Tools
         Tool(
             name="screenshot",
-            description="[OPTIMIZED] Capture screenshot - MUCH FASTER now! Saves to temp file by default (JPEG compressed). Optionally returns base64 or saves to custom path. Use save_to_file=true for 10x speed improvement.",
+            description="[OPTIMIZED] Capture screenshot - MUCH FASTER now! Saves to temp file by default (JPEG compressed). Optionally returns base64 or saves to custom path. Use save_to_file=true for 10x speed improvement. Pass region, handle (window) or label (element) to grab and encode only those pixels.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -204,6 +403,25 @@ async def list_tools() -> list[Tool]:
                         "description": "Monitor number (0=all, 1=primary)",
                         "default": 1
                     },
+                    "region": {
+                        "type": "array",
+                        "description": "Capture only this rectangle: [left, top, right, bottom] in screen pixels",
+                        "items": {"type": "integer"},
+                        "minItems": 4,
+                        "maxItems": 4
+                    },
+                    "handle": {
+                        "type": "integer",
+                        "description": "Capture only this window (HWND, see list_windows)"
+                    },
+                    "label": {
+                        "type": "integer",
+                        "description": "Capture only this element, by its label from get_desktop_state"
+                    },
+                    "state": {
+                        "type": "integer",
+                        "description": "State token of the get_desktop_state response the label came from (defaults to the latest state)"
+                    },
                     "save_path": {
                         "type": "string",
                         "description": "Custom file path to save (optional). If not provided, saves to temp folder."
@@ -221,8 +439,31 @@ async def list_tools() -> list[Tool]:
                     },
                     "quality": {
                         "type": "integer",
-                        "description": "JPEG quality 1-100 (85 recommended for speed/quality balance)",
-                        "default": 85
+                        "description": "JPEG quality 1-100 (defaults to the profile's: 85 for fast, 70 for small)"
+                    },
+                    "profile": {
+                        "type": "string",
+                        "description": "Encoder settings: fast (quickest to encode) or small (smallest file, slower)",
+                        "enum": ["fast", "small"],
+                        "default": "fast"
+                    },
+                    "tile": {
+                        "type": "boolean",
+                        "description": "Split captures larger than 4K into independently encoded tiles, encoded in parallel",
+                        "default": False
+                    },
+                    "diff": {
+                        "type": "string",
+                        "description": "Compare with the previous diff screenshot of this monitor: tiles returns only the changed regions with their coordinates, mask returns a text change mask. The first diff call returns the full frame as the baseline",
+                        "enum": ["off", "tiles", "mask"],
+                        "default": "off"
+                    },
+                    "diff_tile_size": {
+                        "type": "integer",
+                        "description": "Edge length in pixels of the tiles compared in diff mode",
+                        "default": DIFF_TILE_SIZE,
+                        "minimum": DIFF_MIN_TILE_SIZE,
+                        "maximum": DIFF_MAX_TILE_SIZE
                     }
                 }
             }
@@ -651,11 +892,9 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
 @retry_on_failure(max_retries=2, delay=0.5) if UTILS_AVAILABLE else (lambda f: f)
 async def tool_get_desktop_state(args: dict) -> list[TextContent | ImageContent]:
     """Get comprehensive desktop state with UI element detection."""
-    global cached_tree_state, cached_tree_timestamp
-
     logger.info("Getting desktop state...")
 
-    if not DESKTOP_SERVICE_AVAILABLE or desktop_service is None:
+    if not DESKTOP_SERVICE_AVAILABLE or tree_service is None:
         return create_error_response(
             "Desktop service not available. Install uiautomation library.",
             "get_desktop_state"
@@ -667,6 +906,11 @@ async def tool_get_desktop_state(args: dict) -> list[TextContent | ImageContent]
             use_vision = args.get("use_vision", False)
             include_informative = args.get("include_informative", True)
             include_scrollable = args.get("include_scrollable", True)
+            force_refresh = args.get("force_refresh", False)
+            offset = args.get("offset", 0)
+            limit = args.get("limit", STATE_PAGE_SIZE)
+            cursor = args.get("cursor")
+            since = args.get("since")
 
             if not isinstance(use_vision, bool):
                 return create_error_response("use_vision must be a boolean", "get_desktop_state")
@@ -674,70 +918,154 @@ async def tool_get_desktop_state(args: dict) -> list[TextContent | ImageContent]
                 return create_error_response("include_informative must be a boolean", "get_desktop_state")
             if not isinstance(include_scrollable, bool):
                 return create_error_response("include_scrollable must be a boolean", "get_desktop_state")
+            if not isinstance(force_refresh, bool):
+                return create_error_response("force_refresh must be a boolean", "get_desktop_state")
+            if not isinstance(offset, int) or offset < 0:
+                return create_error_response("offset must be a non-negative integer", "get_desktop_state")
+            if not isinstance(limit, int) or not 1 <= limit <= STATE_MAX_PAGE_SIZE:
+                return create_error_response(f"limit must be an integer between 1 and {STATE_MAX_PAGE_SIZE}", "get_desktop_state")
+            if since is not None and (not isinstance(since, int) or isinstance(since, bool)):
+                return create_error_response("since must be a state token (integer)", "get_desktop_state")
+
+            region = args.get("region")
+            if region is not None and (
+                not isinstance(region, list) or len(region) != 4 or not all(isinstance(v, int) for v in region)
+            ):
+                return create_error_response("region must be [left, top, right, bottom] integers", "get_desktop_state")
+            element_filter = ElementFilter(
+                app_name=args.get("app_name") or None,
+                control_type=args.get("control_type") or None,
+                region=tuple(region) if region is not None else None
+            )
 
-            # Get the tree service
-            tree = Tree(desktop_service)
-
-            # Get the UI tree state with caching
-            tree_state = tree.get_state(force_refresh=False)
+            scope_args = args.get("scope") or {}
+            if not isinstance(scope_args, dict):
+                return create_error_response("scope must be an object", "get_desktop_state")
+            for key in ("window_handle", "process_id"):
+                if scope_args.get(key) is not None and not isinstance(scope_args[key], int):
+                    return create_error_response(f"scope.{key} must be an integer", "get_desktop_state")
+            scope_region = scope_args.get("region")
+            if scope_region is not None and (
+                not isinstance(scope_region, list) or len(scope_region) != 4
+                or not all(isinstance(v, int) for v in scope_region)
+            ):
+                return create_error_response("scope.region must be [left, top, right, bottom] integers", "get_desktop_state")
+            scope = ScanScope(
+                window_handle=scope_args.get("window_handle"),
+                process_id=scope_args.get("process_id"),
+                app_name=scope_args.get("app_name") or None,
+                region=tuple(scope_region) if scope_region is not None else None
+            )
 
-            # Update cache
-            cached_tree_state = tree_state
-            cached_tree_timestamp = time.time()
+            tree = tree_service
+            if cursor is not None:
+                # Continue paging the snapshot the cursor was issued for
+                try:
+                    version, offset, limit, element_filter = decode_cursor(cursor)
+                except ValueError as e:
+                    return create_error_response(str(e), "get_desktop_state")
+                tree_state = tree.cache.peek()
+                if tree_state is None or tree.cache.version != version:
+                    return create_error_response(
+                        "Cursor expired because the desktop state was rescanned. Call get_desktop_state without a cursor.",
+                        "get_desktop_state"
+                    )
+                if not tree.cache.is_valid():
+                    # An input action since the first page may have changed the UI
+                    return create_error_response(
+                        "Desktop state changed since the cursor was issued. Call get_desktop_state without a cursor.",
+                        "get_desktop_state"
+                    )
+            else:
+                # Get the UI tree state through the shared state cache, off the event loop
+                tree_state = await run_scan(tree.get_state, force_refresh=force_refresh, scope=scope)
+                # Another request may have stored a newer state since this one was returned
+                version = tree_state.version
 
             logger.info(f"Found {len(tree_state.interactive_nodes)} interactive elements")
-
-            # Get system information with error handling
-            try:
-                windows_version = desktop_service.get_windows_version()
-            except Exception as e:
-                logger.warning(f"Could not get Windows version: {e}")
-                windows_version = "Unknown"
-
-            try:
-                default_language = desktop_service.get_default_language()
-            except Exception as e:
-                logger.warning(f"Could not get default language: {e}")
-                default_language = "Unknown"
+            logger.debug(f"State cache stats: {tree.cache.stats()}")
+            logger.debug(f"System facts stats: {desktop_service.facts.stats()}")
 
             # Build the response
             result = []
+            sections = []
+
+            previous_state = tree.cache.snapshot(since) if since is not None and cursor is None else None
+            if previous_state is not None:
+                # Delta mode: only report what changed since the given state
+                delta = diff_states(previous_state, tree_state, since, version)
+                sections.append(
+                    f"=== CHANGES SINCE STATE {since} ===\n"
+                    "(Labels below refer to the new state unless marked as previous)\n\n"
+                    + delta_to_string(delta, previous_state, tree_state)
+                )
+                sections.append("\n".join([
+                    "=== SUMMARY ===",
+                    f"Interactive Elements: {len(tree_state.interactive_nodes)}",
+                    f"Informative Elements: {len(tree_state.informative_nodes)}",
+                    f"Scrollable Elements: {len(tree_state.scrollable_nodes)}",
+                    f"State token: {version} (pass since={version} to get only later changes)\n"
+                ]))
+                result.append(TextContent(type="text", text="\n".join(sections)))
+                return result
+
+            if since is not None and cursor is None:
+                sections.append(f"Note: state {since} is no longer cached; returning the full desktop state.\n")
+
+            page = paginate(tree_state, offset, limit, element_filter)
+            first_page = page.offset == 0
+
+            if first_page:
+                if force_refresh:
+                    await asyncio.to_thread(desktop_service.refresh_system_facts)
+                # Get system information in parallel, off the event loop
+                windows_version, default_language = await asyncio.gather(
+                    read_system_fact(desktop_service.get_windows_version, "Windows version"),
+                    read_system_fact(desktop_service.get_default_language, "default language")
+                )
 
-            # Add system info
-            system_info = f"""=== DESKTOP STATE ===
-
-Windows Version: {windows_version}
-Default Language: {default_language}
-Encoding: {getattr(desktop_service, 'encoding', 'utf-8')}
-Scan Time: {time.strftime('%Y-%m-%d %H:%M:%S')}
-
-"""
+                sections.append(
+                    "=== DESKTOP STATE ===\n\n"
+                    f"Windows Version: {windows_version}\n"
+                    f"Default Language: {default_language}\n"
+                    f"Encoding: {getattr(desktop_service, 'encoding', 'utf-8')}\n"
+                    f"Scan Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                )
 
             # Add interactive elements (most important!)
-            interactive_text = tree_state.interactive_elements_to_string()
-            system_info += f"=== INTERACTIVE ELEMENTS ===\n"
-            system_info += "(Use these labels with click_element and type_into_element tools)\n\n"
-            system_info += interactive_text + "\n\n"
-
-            # Add informative elements if requested
-            if include_informative:
-                informative_text = tree_state.informative_elements_to_string()
-                system_info += f"=== INFORMATIVE ELEMENTS ===\n"
-                system_info += informative_text + "\n\n"
-
-            # Add scrollable elements if requested
-            if include_scrollable:
-                scrollable_text = tree_state.scrollable_elements_to_string()
-                system_info += f"=== SCROLLABLE ELEMENTS ===\n"
-                system_info += scrollable_text + "\n\n"
+            sections.append(
+                "=== INTERACTIVE ELEMENTS ===\n"
+                "(Use these labels with click_element and type_into_element tools)\n\n"
+                + (tree_state.interactive_elements_to_string(page.labels) if page.labels else "No matching interactive elements.")
+                + "\n"
+            )
 
-            # Add statistics
-            system_info += f"=== SUMMARY ===\n"
-            system_info += f"Interactive Elements: {len(tree_state.interactive_nodes)}\n"
-            system_info += f"Informative Elements: {len(tree_state.informative_nodes)}\n"
-            system_info += f"Scrollable Elements: {len(tree_state.scrollable_nodes)}\n"
-            system_info += f"\nTip: Use click_element(label=N) or type_into_element(label=N) to interact with elements.\n"
+            # Informative and scrollable elements are only sent with the first page
+            if first_page and include_informative:
+                sections.append("=== INFORMATIVE ELEMENTS ===\n" + tree_state.informative_elements_to_string(element_filter) + "\n")
+            if first_page and include_scrollable:
+                sections.append("=== SCROLLABLE ELEMENTS ===\n" + tree_state.scrollable_elements_to_string(element_filter) + "\n")
 
+            # Add statistics
+            summary = [
+                "=== SUMMARY ===",
+                f"Interactive Elements: {len(tree_state.interactive_nodes)}",
+                f"Informative Elements: {len(tree_state.informative_nodes)}",
+                f"Scrollable Elements: {len(tree_state.scrollable_nodes)}",
+                f"Page: {page.offset}-{page.offset + len(page.labels)} of {page.total} matching interactive elements",
+                f"State token: {version} (pass since={version} to get only later changes)"
+            ]
+            if not scope.is_empty() and cursor is None:
+                summary.insert(1, f"Scope: {scope}")
+            if tree_state.truncation is not None:
+                summary.insert(1, tree_state.truncation.to_string())
+            if page.next_offset is not None:
+                next_cursor = encode_cursor(version, page.next_offset, page.limit, element_filter)
+                summary.append(f"Next page: call get_desktop_state(cursor=\"{next_cursor}\")")
+            summary.append("\nTip: Use click_element(label=N) or type_into_element(label=N) to interact with elements.\n")
+            sections.append("\n".join(summary))
+
+            system_info = "\n".join(sections)
             result.append(TextContent(type="text", text=system_info))
 
             # Add annotated screenshot if requested
@@ -745,7 +1073,8 @@ Scan Time: {time.strftime('%Y-%m-%d %H:%M:%S')}
                 try:
                     logger.info("Generating annotated screenshot (FAST MODE)...")
                     # OPTIMIZED: Save to file instead of base64 (10x faster!)
-                    screenshot_bytes, file_path = tree.create_annotated_screenshot(
+                    screenshot_bytes, file_path = await asyncio.to_thread(
+                        tree.create_annotated_screenshot,
                         tree_state.interactive_nodes,
                         scale=0.4,  # Smaller = faster
                         save_to_file=True
@@ -792,19 +1121,24 @@ Scan Time: {time.strftime('%Y-%m-%d %H:%M:%S')}
 @retry_on_failure(max_retries=2, delay=0.3) if UTILS_AVAILABLE else (lambda f: f)
 async def tool_click_element(args: dict) -> list[TextContent]:
     """Click on a UI element by its label."""
-    global cached_tree_state, cached_tree_timestamp
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
+    state_token = args.get("state")
+    tree_state = labeled_state(state_token)
 
     logger.info(f"Clicking element with args: {args}")
 
     # Check if cache exists and is recent
-    if cached_tree_state is None:
+    if tree_state is None:
         return create_error_response(
-            "No cached desktop state. Please run get_desktop_state first.",
+            f"State {state_token} is no longer cached. Please run get_desktop_state again."
+            if state_token is not None else "No cached desktop state. Please run get_desktop_state first.",
             "click_element"
         )
 
     # Check if cache is stale (older than 30 seconds)
-    if UTILS_AVAILABLE and (time.time() - cached_tree_timestamp) > 30:
+    if UTILS_AVAILABLE and tree_service.cache.age() > 30:
         logger.warning("Cached tree state is stale (>30s old). Consider refreshing with get_desktop_state.")
 
     try:
@@ -815,13 +1149,13 @@ async def tool_click_element(args: dict) -> list[TextContent]:
         label = args["label"]
 
         if UTILS_AVAILABLE:
-            is_valid, error_msg = validate_label(label, len(cached_tree_state.interactive_nodes))
+            is_valid, error_msg = validate_label(label, len(tree_state.interactive_nodes))
             if not is_valid:
                 return create_error_response(error_msg, "click_element")
         else:
-            if not isinstance(label, int) or label < 0 or label >= len(cached_tree_state.interactive_nodes):
+            if not isinstance(label, int) or label < 0 or label >= len(tree_state.interactive_nodes):
                 return create_error_response(
-                    f"Invalid label {label}. Valid range: 0-{len(cached_tree_state.interactive_nodes)-1}",
+                    f"Invalid label {label}. Valid range: 0-{len(tree_state.interactive_nodes)-1}",
                     "click_element"
                 )
 
@@ -836,7 +1170,17 @@ async def tool_click_element(args: dict) -> list[TextContent]:
         if not isinstance(clicks, int) or clicks < 1 or clicks > 3:
             return create_error_response("clicks must be 1, 2, or 3", "click_element")
 
-        element = cached_tree_state.interactive_nodes[label]
+        # Map the label onto the latest snapshot in case the UI was rescanned since
+        element, current_label, refreshed = await run_resolve(revalidate_element, tree_state, label)
+        if element is None:
+            return create_error_response(
+                f"Element {label} is no longer present. Please run get_desktop_state again.",
+                "click_element"
+            )
+        if current_label != label:
+            logger.info(f"Element {label} is now label {current_label} in the latest state")
+        if refreshed:
+            logger.info(f"Re-resolved element {label} from the live tree at {element.center.to_string()}")
 
         # Get click coordinates
         x, y = element.center.x, element.center.y
@@ -851,6 +1195,7 @@ async def tool_click_element(args: dict) -> list[TextContent]:
         # Perform click
         logger.info(f"Clicking element {label} at ({x},{y}) with {button} button, {clicks} clicks")
         pyautogui.click(x=x, y=y, button=button, clicks=clicks, duration=0.2)
+        invalidate_tree_state("click_element")
 
         click_type = "Triple-clicked" if clicks == 3 else ("Double-clicked" if clicks == 2 else "Clicked")
         success_msg = (
@@ -871,19 +1216,24 @@ async def tool_click_element(args: dict) -> list[TextContent]:
 @retry_on_failure(max_retries=2, delay=0.3) if UTILS_AVAILABLE else (lambda f: f)
 async def tool_type_into_element(args: dict) -> list[TextContent]:
     """Type text into a UI element."""
-    global cached_tree_state, cached_tree_timestamp
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
+    state_token = args.get("state")
+    tree_state = labeled_state(state_token)
 
     logger.info(f"Typing into element with args: {args}")
 
     # Check if cache exists
-    if cached_tree_state is None:
+    if tree_state is None:
         return create_error_response(
-            "No cached desktop state. Please run get_desktop_state first.",
+            f"State {state_token} is no longer cached. Please run get_desktop_state again."
+            if state_token is not None else "No cached desktop state. Please run get_desktop_state first.",
             "type_into_element"
         )
 
     # Warn if cache is stale
-    if UTILS_AVAILABLE and (time.time() - cached_tree_timestamp) > 30:
+    if UTILS_AVAILABLE and tree_service.cache.age() > 30:
         logger.warning("Cached tree state is stale (>30s old). Consider refreshing with get_desktop_state.")
 
     try:
@@ -900,7 +1250,7 @@ async def tool_type_into_element(args: dict) -> list[TextContent]:
 
         # Validate label
         if UTILS_AVAILABLE:
-            is_valid, error_msg = validate_label(label, len(cached_tree_state.interactive_nodes))
+            is_valid, error_msg = validate_label(label, len(tree_state.interactive_nodes))
             if not is_valid:
                 return create_error_response(error_msg, "type_into_element")
 
@@ -909,9 +1259,9 @@ async def tool_type_into_element(args: dict) -> list[TextContent]:
             if not is_valid:
                 return create_error_response(error_msg, "type_into_element")
         else:
-            if not isinstance(label, int) or label < 0 or label >= len(cached_tree_state.interactive_nodes):
+            if not isinstance(label, int) or label < 0 or label >= len(tree_state.interactive_nodes):
                 return create_error_response(
-                    f"Invalid label {label}. Valid range: 0-{len(cached_tree_state.interactive_nodes)-1}",
+                    f"Invalid label {label}. Valid range: 0-{len(tree_state.interactive_nodes)-1}",
                     "type_into_element"
                 )
             if not isinstance(text, str):
@@ -923,7 +1273,17 @@ async def tool_type_into_element(args: dict) -> list[TextContent]:
         if not isinstance(press_enter, bool):
             return create_error_response("press_enter must be a boolean", "type_into_element")
 
-        element = cached_tree_state.interactive_nodes[label]
+        # Map the label onto the latest snapshot in case the UI was rescanned since
+        element, current_label, refreshed = await run_resolve(revalidate_element, tree_state, label)
+        if element is None:
+            return create_error_response(
+                f"Element {label} is no longer present. Please run get_desktop_state again.",
+                "type_into_element"
+            )
+        if current_label != label:
+            logger.info(f"Element {label} is now label {current_label} in the latest state")
+        if refreshed:
+            logger.info(f"Re-resolved element {label} from the live tree at {element.center.to_string()}")
 
         # Click the element first to focus it
         x, y = element.center.x, element.center.y
@@ -948,6 +1308,7 @@ async def tool_type_into_element(args: dict) -> list[TextContent]:
             time.sleep(0.1)
             pyautogui.press('enter')
             logger.info("Pressed Enter")
+        invalidate_tree_state("type_into_element")
 
         action = "✓ Typed (cleared first)" if clear_first else "✓ Typed"
         enter_msg = " and pressed Enter" if press_enter else ""
@@ -970,69 +1331,242 @@ async def tool_type_into_element(args: dict) -> list[TextContent]:
 # SCREEN CAPTURE TOOL IMPLEMENTATIONS
 # ============================================================================
 
+def write_tiles(
+    tiles: list['EncodedTile'], header: str, save_to_file: bool, save_path: Optional[str],
+    img_format: str, settings: str, prefix: str
+) -> list[TextContent | ImageContent]:
+    """Return encoded tiles as images, or save them and return their paths.
+
+    Tiles are saved next to save_path with their offsets appended, or into
+    the screenshot spool.
+    """
+    ext = "jpg" if img_format == "JPEG" else "png"
+    if not (save_to_file or save_path):
+        contents: list[TextContent | ImageContent] = [
+            ImageContent(type="image", data=base64.b64encode(t.data).decode(), mimeType=f"image/{img_format.lower()}")
+            for t in tiles
+        ]
+        contents.append(TextContent(
+            type="text",
+            text=header + "\n" +
+                 "\n".join(f"Tile {i}: {t.width}x{t.height} at ({t.left}, {t.top})" for i, t in enumerate(tiles))
+        ))
+        return contents
+    base = os.path.splitext(save_path)[0] if save_path else None
+    lines = []
+    for t in tiles:
+        if base is not None:
+            tile_path = f"{base}_{t.left}_{t.top}.{ext}"
+            with open(tile_path, 'wb') as f:
+                f.write(t.data)
+        else:
+            tile_path = screenshot_spool.write(t.data, f"{prefix}_{t.left}_{t.top}", ext)
+        lines.append(f"  {tile_path}: {t.width}x{t.height} at ({t.left}, {t.top})")
+    logger.info(f"Screenshot saved as {len(tiles)} tiles")
+    return [TextContent(
+        type="text",
+        text=f"✅ {header}\n"
+             f"🧩 Saved as {len(tiles)} files:\n" + "\n".join(lines) + "\n"
+             f"🎨 Format: {settings}"
+    )]
+
+
+async def screenshot_diff(
+    key, source: str, raw, width: int, height: int, mode: str, tile_size: Optional[int],
+    save_to_file: bool, save_path: Optional[str], img_format: str, profile: str, quality: int, settings: str,
+    geometry: Any = None
+) -> list[TextContent | ImageContent]:
+    """Return what changed in a capture since the previous diff screenshot with the same key.
+
+    Mode 'mask' returns the change mask and changed regions as text; mode
+    'tiles' also returns the changed regions as images. The first diff of
+    a key, a size or geometry change, or a change covering most of the
+    capture sends the whole frame. Region coordinates are relative to the capture.
+    """
+    diff = await asyncio.to_thread(frame_differ.diff, key, raw, width, height, tile_size, geometry)
+    header = f"Screenshot diff ({source}): {width}x{height}"
+    if diff.baseline:
+        header += ", no previous frame to compare, full frame is the new baseline"
+    elif not diff.changed:
+        return [TextContent(type="text", text=f"{header}\nNo changes since the previous diff screenshot")]
+    else:
+        header += (f", {len(diff.regions)} changed regions covering {diff.changed_fraction:.1%} "
+                   f"({diff.tile_size}px tiles)")
+
+    if mode == "mask":
+        return [TextContent(
+            type="text",
+            text=f"{header}\n" +
+                 "\n".join(f"Region {i}: {r.width}x{r.height} at ({r.left}, {r.top})" for i, r in enumerate(diff.regions)) +
+                 f"\nChange mask ('#' = changed {diff.tile_size}px tile):\n{diff.mask_to_string()}"
+        )]
+
+    boxes = [r.box for r in diff.regions]
+    if diff.changed_fraction > DIFF_FULL_FRAME_FRACTION:
+        boxes = [(0, 0, width, height)]
+        header += ", sending the full frame"
+    # Only the changed pixels are converted and encoded
+    images = [capture.crop_bgra(raw, width, height, box) for box in boxes]
+    encoded = await asyncio.to_thread(image_encoder.encode_many, images, img_format, profile, quality)
+    tiles = [
+        EncodedTile(left=box[0], top=box[1], width=box[2] - box[0], height=box[3] - box[1], data=data)
+        for box, data in zip(boxes, encoded)
+    ]
+    return write_tiles(tiles, header, save_to_file, save_path, img_format, settings, "windows_mcp_diff")
+
+
+def screenshot_region(args: dict) -> tuple[Optional[dict], str]:
+    """Resolve the region, handle or label arguments of the screenshot tool.
+
+    Returns:
+        (capture region clipped to the screen, description of the target),
+        or (None, "") to capture a whole monitor
+
+    Raises:
+        ValueError: If the target cannot be resolved or is off screen
+    """
+    if args.get("region") is not None:
+        region = args["region"]
+        if not isinstance(region, list) or len(region) != 4 or not all(isinstance(v, int) for v in region):
+            raise ValueError("region must be [left, top, right, bottom] integers")
+        left, top, right, bottom = region
+        return capture.clip_region(left, top, right - left, bottom - top), "Region"
+    if args.get("handle") is not None:
+        if not WINDOWS_AVAILABLE:
+            raise ValueError("Windows API not available")
+        hwnd = int(args["handle"])
+        if not win32gui.IsWindow(hwnd):
+            raise ValueError(f"Window {hwnd} not found")
+        left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        return capture.clip_region(left, top, right - left, bottom - top), f"Window '{win32gui.GetWindowText(hwnd)}'"
+    if args.get("label") is not None:
+        state_token = args.get("state")
+        tree_state = labeled_state(state_token)
+        if tree_state is None:
+            raise ValueError(
+                f"State {state_token} is no longer cached. Please run get_desktop_state again."
+                if state_token is not None else "No cached desktop state. Please run get_desktop_state first."
+            )
+        label = int(args["label"])
+        if not 0 <= label < len(tree_state.interactive_nodes):
+            raise ValueError(f"Label {label} out of range (0-{len(tree_state.interactive_nodes) - 1})")
+        element = tree_state.interactive_nodes[label]
+        box = element.bounding_box
+        return capture.clip_region(box.left, box.top, box.width, box.height), f"Element {label} '{element.name}'"
+    return None, ""
+
+
 async def tool_screenshot(args: dict) -> list[TextContent | ImageContent]:
     """Capture screenshot - OPTIMIZED for speed!"""
+    if not SCREEN_AVAILABLE:
+        return [TextContent(type="text", text="Error: Screen capture not available")]
+
     try:
         monitor = args.get("monitor", 1)
         save_path = args.get("save_path")
         save_to_file = args.get("save_to_file", True)
         img_format = args.get("format", "jpeg").upper()
-        quality = args.get("quality", 85)
+        quality = args.get("quality")
+        profile = image_encoder.profile(args.get("profile"))
+        tile = args.get("tile", False)
+        diff_mode = args.get("diff", "off")
+        diff_tile_size = args.get("diff_tile_size")
+        diff_tile_size = DIFF_TILE_SIZE if diff_tile_size is None else diff_tile_size
+        if not isinstance(diff_tile_size, int) or isinstance(diff_tile_size, bool) \
+                or not DIFF_MIN_TILE_SIZE <= diff_tile_size <= DIFF_MAX_TILE_SIZE:
+            return [TextContent(
+                type="text",
+                text=f"Error: diff_tile_size must be an integer from {DIFF_MIN_TILE_SIZE} to {DIFF_MAX_TILE_SIZE}"
+            )]
 
-        with mss.mss() as sct:
-            if monitor == 0:
-                screenshot = sct.grab(sct.monitors[0])
-            else:
-                if monitor > len(sct.monitors) - 1:
-                    return [TextContent(
-                        type="text",
-                        text=f"Error: Monitor {monitor} not found. Available: {len(sct.monitors) - 1}"
-                    )]
-                screenshot = sct.grab(sct.monitors[monitor])
-
-            img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
-
-            # OPTIMIZED: Save to file (10x faster!)
-            if save_to_file or save_path:
-                import tempfile
-                if not save_path:
-                    # Auto-generate temp file path
-                    temp_dir = tempfile.gettempdir()
-                    timestamp = int(time.time() * 1000)
-                    ext = "jpg" if img_format == "JPEG" else "png"
-                    save_path = os.path.join(temp_dir, f"windows_mcp_screen_{timestamp}.{ext}")
-
-                # Save with optimization
-                if img_format == "JPEG":
-                    img.save(save_path, format="JPEG", quality=quality, optimize=True)
-                else:
-                    img.save(save_path, format="PNG", optimize=True)
+        try:
+            region, source = screenshot_region(args)
+            captured = region or capture.monitor_region(monitor)
+            raw, width, height = capture.grab_raw(captured)
+        except (IndexError, ValueError) as e:
+            return [TextContent(type="text", text=f"Error: {e}")]
+        geometry = tuple(captured[k] for k in ('left', 'top', 'width', 'height'))
+        if region is None:
+            source = f"Monitor {monitor}"
+        else:
+            source += f" at ({region['left']}, {region['top']})"
+
+        quality = profile.jpeg_quality if quality is None else quality
+        ext = "jpg" if img_format == "JPEG" else "png"
+        settings = f"{img_format} ({profile.name}" + (f", Quality: {quality})" if img_format == "JPEG" else ")")
+
+        if diff_mode != "off":
+            # Diffs of a region compare against the previous capture of the same rectangle;
+            # a monitor whose position or resolution changed starts a new baseline
+            diff_key = monitor if region is None else geometry
+            return await screenshot_diff(
+                diff_key, source, raw, width, height, diff_mode, diff_tile_size,
+                save_to_file, save_path, img_format, profile.name, quality, settings, geometry
+            )
+
+        img = capture.image_from_bgra(raw, width, height) if tile else None
+        if img is not None and image_encoder.should_tile(img):
+            tiles = await asyncio.to_thread(image_encoder.encode_tiles, img, img_format, profile.name, quality)
+            return write_tiles(
+                tiles, f"Screenshot ({source}): {width}x{height} in {len(tiles)} tiles",
+                save_to_file, save_path, img_format, settings, "windows_mcp_screen"
+            )
+
+        # Identical pixels of the same rectangle with identical settings reuse the previous output;
+        # the geometry keeps equal bytes of differently shaped captures apart
+        key = (await asyncio.to_thread(frame_cache.digest, raw), geometry, img_format, profile.name, quality)
+        cached = frame_cache.get(key)
+        data = cached.data if cached is not None else None
 
-                logger.info(f"Screenshot saved to: {save_path}")
+        # OPTIMIZED: Save to file (10x faster!)
+        if save_to_file or save_path:
+            if not save_path and cached is not None and cached.path is not None:
+                logger.info(f"Screen unchanged, reusing: {cached.path}")
                 return [TextContent(
                     type="text",
-                    text=f"✅ Screenshot captured (Monitor {monitor})\n"
-                         f"📁 Saved to: {save_path}\n"
-                         f"📐 Size: {screenshot.width}x{screenshot.height}\n"
-                         f"🎨 Format: {img_format} " + (f"(Quality: {quality})" if img_format == "JPEG" else "")
+                    text=f"✅ Screenshot captured ({source}), screen unchanged\n"
+                         f"📁 Saved to: {cached.path}\n"
+                         f"📐 Size: {width}x{height}\n"
+                         f"🎨 Format: {settings}"
                 )]
-
-            # Fallback: base64 mode (slower)
-            buffer = io.BytesIO()
-            mime_type = f"image/{img_format.lower()}"
-            if img_format == "JPEG":
-                img.save(buffer, format="JPEG", quality=quality, optimize=True)
+            if data is None:
+                img = img or capture.image_from_bgra(raw, width, height)
+                data = await image_encoder.encode_async(img, img_format, profile.name, quality)
+            if save_path:
+                with open(save_path, 'wb') as f:
+                    f.write(data)
+                # Files at caller-given paths are never handed to the cache, which deletes on eviction
+                frame_cache.put(key, data)
             else:
-                img.save(buffer, format="PNG", optimize=True)
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
+                save_path = screenshot_spool.write(data, "windows_mcp_screen", ext)
+                frame_cache.put(key, data, path=save_path)
 
-            return [
-                ImageContent(type="image", data=img_base64, mimeType=mime_type),
-                TextContent(
-                    type="text",
-                    text=f"Screenshot (Monitor {monitor}): {screenshot.width}x{screenshot.height}"
-                )
-            ]
+            logger.info(f"Screenshot saved to: {save_path}")
+            logger.debug(f"Screenshot spool: {screenshot_spool.stats()}")
+            return [TextContent(
+                type="text",
+                text=f"✅ Screenshot captured ({source})\n"
+                     f"📁 Saved to: {save_path}\n"
+                     f"📐 Size: {width}x{height}\n"
+                     f"🎨 Format: {settings}"
+            )]
+
+        if data is None:
+            img = img or capture.image_from_bgra(raw, width, height)
+            data = await image_encoder.encode_async(img, img_format, profile.name, quality)
+            frame_cache.put(key, data)
+
+        # Fallback: base64 mode (slower)
+        mime_type = f"image/{img_format.lower()}"
+        img_base64 = base64.b64encode(data).decode()
+
+        return [
+            ImageContent(type="image", data=img_base64, mimeType=mime_type),
+            TextContent(
+                type="text",
+                text=f"Screenshot ({source}): {width}x{height}"
+            )
+        ]
     except Exception as e:
         logger.error(f"Screenshot error: {e}", exc_info=True)
         return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -1040,17 +1574,19 @@ async def tool_screenshot(args: dict) -> list[TextContent | ImageContent]:
 
 async def tool_get_screen_size(args: dict) -> list[TextContent]:
     """Get screen dimensions."""
+    if not (PYAUTOGUI_AVAILABLE and SCREEN_AVAILABLE):
+        return [TextContent(type="text", text="Error: PyAutoGUI or screen capture not available")]
+
     try:
         width, height = pyautogui.size()
 
         # Also get info about all monitors
-        with mss.mss() as sct:
-            monitors_info = []
-            for i, monitor in enumerate(sct.monitors[1:], 1):
-                monitors_info.append(
-                    f"Monitor {i}: {monitor['width']}x{monitor['height']} "
-                    f"at ({monitor['left']}, {monitor['top']})"
-                )
+        monitors_info = []
+        for i, monitor in enumerate(capture.monitors()[1:], 1):
+            monitors_info.append(
+                f"Monitor {i}: {monitor['width']}x{monitor['height']} "
+                f"at ({monitor['left']}, {monitor['top']})"
+            )
 
         return [TextContent(
             type="text",
@@ -1063,6 +1599,9 @@ async def tool_get_screen_size(args: dict) -> list[TextContent]:
 
 async def tool_locate_on_screen(args: dict) -> list[TextContent]:
     """Locate an image on screen."""
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
     try:
         image_path = args["image_path"]
         confidence = args.get("confidence", 0.9)
@@ -1092,6 +1631,9 @@ async def tool_locate_on_screen(args: dict) -> list[TextContent]:
 
 async def tool_mouse_move(args: dict) -> list[TextContent]:
     """Move mouse cursor."""
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
     try:
         x = args["x"]
         y = args["y"]
@@ -1105,6 +1647,9 @@ async def tool_mouse_move(args: dict) -> list[TextContent]:
 
 async def tool_mouse_click(args: dict) -> list[TextContent]:
     """Click mouse."""
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
     try:
         x = args.get("x")
         y = args.get("y")
@@ -1118,6 +1663,7 @@ async def tool_mouse_click(args: dict) -> list[TextContent]:
             pyautogui.click(clicks=clicks, button=button)
             pos = pyautogui.position()
             location = f"at current position ({pos.x}, {pos.y})"
+        invalidate_tree_state("mouse_click")
 
         click_type = "Double-clicked" if clicks == 2 else "Clicked"
         return [TextContent(type="text", text=f"{click_type} {button} button {location}")]
@@ -1127,9 +1673,13 @@ async def tool_mouse_click(args: dict) -> list[TextContent]:
 
 async def tool_mouse_scroll(args: dict) -> list[TextContent]:
     """Scroll mouse wheel."""
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
     try:
         clicks = args["clicks"]
         pyautogui.scroll(clicks)
+        invalidate_tree_state("mouse_scroll")
         direction = "up" if clicks > 0 else "down"
         return [TextContent(type="text", text=f"Scrolled {abs(clicks)} clicks {direction}")]
     except Exception as e:
@@ -1138,6 +1688,9 @@ async def tool_mouse_scroll(args: dict) -> list[TextContent]:
 
 async def tool_get_mouse_position(args: dict) -> list[TextContent]:
     """Get current mouse position."""
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
     try:
         x, y = pyautogui.position()
         return [TextContent(type="text", text=f"Mouse position: ({x}, {y})")]
@@ -1151,11 +1704,15 @@ async def tool_get_mouse_position(args: dict) -> list[TextContent]:
 
 async def tool_keyboard_type(args: dict) -> list[TextContent]:
     """Type text."""
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
     try:
         text = args["text"]
         interval = args.get("interval", 0.01)
 
         pyautogui.write(text, interval=interval)
+        invalidate_tree_state("keyboard_type")
         return [TextContent(type="text", text=f"Typed text: {text[:50]}{'...' if len(text) > 50 else ''}")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error typing: {str(e)}")]
@@ -1163,14 +1720,19 @@ async def tool_keyboard_type(args: dict) -> list[TextContent]:
 
 async def tool_keyboard_press(args: dict) -> list[TextContent]:
     """Press key(s)."""
+    if not PYAUTOGUI_AVAILABLE:
+        return [TextContent(type="text", text="Error: PyAutoGUI not available")]
+
     try:
         keys = args["keys"]
 
         if len(keys) == 1:
             pyautogui.press(keys[0])
+            invalidate_tree_state("keyboard_press")
             return [TextContent(type="text", text=f"Pressed key: {keys[0]}")]
         else:
             pyautogui.hotkey(*keys)
+            invalidate_tree_state("keyboard_press")
             return [TextContent(type="text", text=f"Pressed key combination: {'+'.join(keys)}")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error pressing keys: {str(e)}")]
@@ -1197,14 +1759,17 @@ async def tool_list_windows(args: dict) -> list[TextContent]:
             if title:
                 try:
                     _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                    process = psutil.Process(pid)
+                    info = process_cache.get(pid) if process_cache is not None else None
+                except:
+                    info = None
+                if info is not None:
                     windows.append({
                         "handle": hwnd,
                         "title": title,
-                        "pid": pid,
-                        "process": process.name()
+                        "pid": info.pid,
+                        "process": info.name
                     })
-                except:
+                else:
                     windows.append({
                         "handle": hwnd,
                         "title": title
@@ -1239,12 +1804,12 @@ async def tool_get_active_window(args: dict) -> list[TextContent]:
         rect = win32gui.GetWindowRect(hwnd)
 
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        process = psutil.Process(pid)
+        process_name = (process_cache.name(pid) if process_cache is not None else None) or "Unknown"
 
         result = f"Active Window:\n"
         result += f"Handle: {hwnd}\n"
         result += f"Title: {title}\n"
-        result += f"Process: {process.name()} (PID: {pid})\n"
+        result += f"Process: {process_name} (PID: {pid})\n"
         result += f"Position: ({rect[0]}, {rect[1]})\n"
         result += f"Size: {rect[2] - rect[0]}x{rect[3] - rect[1]}"
 
@@ -1282,6 +1847,8 @@ async def tool_activate_window(args: dict) -> list[TextContent]:
         win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
         win32gui.SetForegroundWindow(hwnd)
 
+        invalidate_tree_state("activate_window")
+
         window_title = win32gui.GetWindowText(hwnd)
         return [TextContent(type="text", text=f"Activated window: {window_title}")]
     except Exception as e:
@@ -1316,6 +1883,7 @@ async def tool_close_window(args: dict) -> list[TextContent]:
 
         window_title = win32gui.GetWindowText(hwnd)
         win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+        invalidate_tree_state("close_window")
 
         return [TextContent(type="text", text=f"Closed window: {window_title}")]
     except Exception as e:
@@ -1357,6 +1925,7 @@ async def tool_resize_window(args: dict) -> list[TextContent]:
         height = args.get("height", current_rect[3] - current_rect[1])
 
         win32gui.MoveWindow(hwnd, x, y, width, height, True)
+        invalidate_tree_state("resize_window")
 
         window_title = win32gui.GetWindowText(hwnd)
         return [TextContent(
@@ -1384,6 +1953,7 @@ async def tool_launch_application(args: dict) -> list[TextContent]:
             process = subprocess.Popen(cmd, cwd=working_dir)
         else:
             process = subprocess.Popen(cmd)
+        invalidate_tree_state("launch_application")
 
         return [TextContent(
             type="text",
@@ -1403,6 +1973,7 @@ async def tool_kill_process(args: dict) -> list[TextContent]:
             process = psutil.Process(pid)
             process_name = process.name()
             process.kill()
+            invalidate_tree_state("kill_process")
             return [TextContent(type="text", text=f"Killed process: {process_name} (PID: {pid})")]
         elif name:
             killed = []
@@ -1412,6 +1983,7 @@ async def tool_kill_process(args: dict) -> list[TextContent]:
                     killed.append(f"{proc.info['name']} (PID: {proc.info['pid']})")
 
             if killed:
+                invalidate_tree_state("kill_process")
                 return [TextContent(
                     type="text",
                     text=f"Killed {len(killed)} process(es):\n" + "\n".join(killed)
@@ -1593,6 +2165,17 @@ def main():
     if not WINDOWS_AVAILABLE:
         print("WARNING: pywin32 not available, some features will be limited", file=sys.stderr)
 
+    # Query static system facts in the background while the server starts
+    if desktop_service is not None:
+        desktop_service.facts.start()
+
+    # Clean up screenshots left by earlier runs before new ones are written
+    try:
+        if screenshot_spool is not None:
+            screenshot_spool.open()
+    except OSError as e:
+        logger.warning(f"Could not open screenshot spool: {e}")
+
     async def run():
         async with stdio_server() as (read_stream, write_stream):
             await app.run(
@@ -1601,7 +2184,21 @@ def main():
                 app.create_initialization_options()
             )
 
-    asyncio.run(run())
+    try:
+        asyncio.run(run())
+    finally:
+        if traversal_pool is not None:
+            traversal_pool.shutdown(wait=False)
+        if scan_pool is not None:
+            scan_pool.shutdown(wait=False)
+        if resolve_pool is not None:
+            resolve_pool.shutdown(wait=False)
+        if tree_service is not None:
+            tree_service.close()
+        if desktop_service is not None:
+            desktop_service.close()
+        if image_encoder is not None:
+            image_encoder.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+"""Backends that expose a UI control tree to the traversal code."""
+
+import logging
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Optional
+
+try:
+    import uiautomation as ua
+    from uiautomation import GetRootControl
+    UIAUTOMATION_AVAILABLE = True
+except ImportError:
+    UIAUTOMATION_AVAILABLE = False
+
+from windows_mcp.desktop.views import Size
+from windows_mcp.tree.config import PREFETCH_PROPERTY_IDS
+
+if TYPE_CHECKING:
+    from windows_mcp.desktop.service import Desktop
+
+logger = logging.getLogger('windows-mcp.tree')
+
+# Keeps per-thread COM initializers alive for the lifetime of the thread
+_thread_state = threading.local()
+
+
+def initialize_uiautomation_thread():
+    """Initialize COM for UI Automation in the calling thread."""
+    if UIAUTOMATION_AVAILABLE and not hasattr(_thread_state, 'initializer'):
+        _thread_state.initializer = ua.UIAutomationInitializerInThread()
+
+
+class Rect:
+    """Rectangle with the same accessors as ``uiautomation.Rect``."""
+
+    __slots__ = ('left', 'top', 'right', 'bottom')
+
+    def __init__(self, left: int, top: int, right: int, bottom: int):
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+
+    def width(self) -> int:
+        return self.right - self.left
+
+    def height(self) -> int:
+        return self.bottom - self.top
+
+    def xcenter(self) -> int:
+        return self.left + self.width() // 2
+
+    def ycenter(self) -> int:
+        return self.top + self.height() // 2
+
+    def isempty(self) -> bool:
+        return self.width() <= 0 or self.height() <= 0
+
+
+class ScrollPatternState:
+    """Scroll pattern values captured at one point in time."""
+
+    __slots__ = ('HorizontallyScrollable', 'HorizontalScrollPercent',
+                 'VerticallyScrollable', 'VerticalScrollPercent')
+
+    def __init__(self, horizontal: bool, vertical: bool,
+                 horizontal_percent: float = 0.0, vertical_percent: float = 0.0):
+        self.HorizontallyScrollable = horizontal
+        self.HorizontalScrollPercent = horizontal_percent if horizontal else -1
+        self.VerticallyScrollable = vertical
+        self.VerticalScrollPercent = vertical_percent if vertical else -1
+
+
+class LegacyPatternState:
+    """LegacyIAccessible pattern values captured at one point in time."""
+
+    __slots__ = ('Value',)
+
+    def __init__(self, value: str = ""):
+        self.Value = value
+
+
+class TreeBackend:
+    """Source of the UI control tree walked by the Tree service.
+
+    Controls handed out by a backend follow the subset of the
+    ``uiautomation.Control`` surface that traversal relies on:
+    ``GetChildren()``, ``Name``, ``ClassName``, ``ControlTypeName``,
+    ``LocalizedControlType``, ``BoundingRectangle``, ``IsOffscreen``,
+    ``IsControlElement``, ``IsEnabled``, ``IsKeyboardFocusable``,
+    ``HasKeyboardFocus``, ``AcceleratorKey``, ``ProcessId``,
+    ``NativeWindowHandle``, ``GetScrollPattern()`` and
+    ``GetLegacyIAccessiblePattern()``.
+
+    ``calls`` counts the cross-process requests made through the backend,
+    keyed by request name, so traversal cost can be measured.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+
+    def call_count(self) -> int:
+        """Return the total number of requests made so far."""
+        return sum(self.calls.values())
+
+    def reset_calls(self):
+        """Reset the request counter."""
+        self.calls.clear()
+
+    def is_available(self) -> bool:
+        """Return True if the backend can produce a tree."""
+        return True
+
+    def initialize_thread(self):
+        """Prepare the calling worker thread for tree access."""
+
+    def get_root_control(self) -> Any:
+        """Return the desktop root control."""
+        raise NotImplementedError
+
+    def get_children(self, node: Any) -> list:
+        """Return the children of a control."""
+        return node.GetChildren()
+
+    def control_from_handle(self, handle: int) -> Any:
+        """Return the live control of a top-level window, or None."""
+        return None
+
+    def fetch_subtree(self, node: Any) -> Any:
+        """Fetch the traversal properties of a whole subtree in one request.
+
+        Backends that can batch return an ``ElementSnapshot`` that serves all
+        later reads locally; the default returns the node unchanged.
+        """
+        return node
+
+    def fetch_children(self, node: Any) -> list:
+        """Fetch the children of a control (or its snapshot) and their properties in one request.
+
+        Used instead of fetch_subtree when a scan budget must bound the
+        cross-process work: each request covers one level below one
+        container, so the walk can stop between requests. Backends that can
+        batch return ``ElementSnapshot`` children whose own children are
+        fetched by another call; the default returns the live children.
+        """
+        return self.get_children(self.live_control(node))
+
+    def get_runtime_id(self, node: Any) -> tuple:
+        """Return the runtime id identifying a control (or its snapshot)."""
+        runtime_id = getattr(node, 'RuntimeId', None)
+        if runtime_id:
+            return runtime_id
+        return tuple(node.GetRuntimeId() or ())
+
+    def live_control(self, node: Any) -> Any:
+        """Return a live control for a control or its snapshot."""
+        source = getattr(node, 'source', None)
+        return node if source is None else source
+
+    def get_screen_size(self) -> Size:
+        """Return the size of the screen the tree is laid out on."""
+        raise NotImplementedError
+
+    def is_app_visible(self, app: Any) -> bool:
+        """Check if a top-level application window is visible."""
+        raise NotImplementedError
+
+    def is_app_browser(self, app: Any) -> bool:
+        """Check if a top-level application window belongs to a browser."""
+        return False
+
+
+class UIAutomationBackend(TreeBackend):
+    """Backend reading the live desktop through ``uiautomation``."""
+
+    name = "uiautomation"
+
+    def __init__(self, desktop: 'Desktop'):
+        """Initialize the backend.
+
+        Args:
+            desktop: Desktop service used for window and process queries
+        """
+        super().__init__()
+        self.desktop = desktop
+
+    def is_available(self) -> bool:
+        return UIAUTOMATION_AVAILABLE
+
+    def initialize_thread(self):
+        initialize_uiautomation_thread()
+
+    def get_root_control(self) -> Any:
+        self.calls['GetRootControl'] += 1
+        return GetRootControl()
+
+    def get_children(self, node: Any) -> list:
+        if not isinstance(node, ua.Control):
+            return node.GetChildren()
+        self.calls['GetChildren'] += 1
+        return node.GetChildren()
+
+    def control_from_handle(self, handle: int) -> Any:
+        if not handle:
+            return None
+        self.calls['ControlFromHandle'] += 1
+        return ua.ControlFromHandle(handle)
+
+    def _cache_request(self, scope: int) -> Any:
+        """Build a CacheRequest for the traversal properties at the given TreeScope."""
+        automation = ua._AutomationClient.instance().IUIAutomation
+        request = automation.CreateCacheRequest()
+        for property_id in PREFETCH_PROPERTY_IDS.values():
+            request.AddProperty(property_id)
+        request.TreeScope = scope
+        request.TreeFilter = automation.ControlViewCondition
+        return request
+
+    def fetch_subtree(self, node: Any) -> Any:
+        """Fetch a subtree with a UIA CacheRequest and snapshot it.
+
+        Falls back to the live control (per-property reads) if the cache
+        request cannot be built or the element refuses it.
+        """
+        from windows_mcp.tree.prefetch import snapshot_cached_element
+
+        try:
+            request = self._cache_request(ua.TreeScope.Subtree)
+            self.calls['BuildUpdatedCache'] += 1
+            element = node.Element.BuildUpdatedCache(request)
+            return snapshot_cached_element(element)
+        except Exception as e:
+            logger.debug(f"Subtree prefetch failed, using live reads: {e}")
+            return node
+
+    def fetch_children(self, node: Any) -> list:
+        """Fetch one level with a Children-scoped CacheRequest and snapshot it.
+
+        Falls back to the live children if the cache request fails.
+        """
+        from windows_mcp.tree.prefetch import snapshot_cached_children
+
+        element = node.Element if isinstance(node, ua.Control) else node.source
+        try:
+            request = self._cache_request(ua.TreeScope.Children)
+            self.calls['BuildUpdatedCache'] += 1
+            return snapshot_cached_children(element.BuildUpdatedCache(request))
+        except Exception as e:
+            logger.debug(f"Children prefetch failed, using live reads: {e}")
+            return self.get_children(self.live_control(node))
+
+    def get_runtime_id(self, node: Any) -> tuple:
+        if isinstance(node, ua.Control):
+            self.calls['GetRuntimeId'] += 1
+        return super().get_runtime_id(node)
+
+    def live_control(self, node: Any) -> Any:
+        source = getattr(node, 'source', None)
+        if source is None:
+            return node
+        return ua.Control.CreateControlFromElement(source)
+
+    def get_screen_size(self) -> Size:
+        return self.desktop.get_screen_size()
+
+    def is_app_visible(self, app: Any) -> bool:
+        return self.desktop.is_app_visible(app)
+
+    def is_app_browser(self, app: Any) -> bool:
+        return self.desktop.is_app_browser(app)
+
+
+def control_type_name(control_type_id: int) -> Optional[str]:
+    """Map a UIA control type id to its ``uiautomation`` class name."""
+    if not UIAUTOMATION_AVAILABLE:
+        return None
+    return ua.ControlTypeNames.get(control_type_id)
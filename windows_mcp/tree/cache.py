@@ -0,0 +1,110 @@
+"""Shared cache of the latest UI tree state."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from windows_mcp.tree.config import STATE_CACHE_TTL, STATE_HISTORY_SIZE
+from windows_mcp.tree.views import TreeState
+
+logger = logging.getLogger('windows-mcp.tree')
+
+
+class StateCache:
+    """Single source of truth for the most recent TreeState.
+
+    ``get()`` only returns a state that is younger than the TTL and has not
+    been invalidated, and counts hits and misses. ``peek()`` always returns
+    the latest state, because element labels handed to the agent keep
+    referring to it until the next scan, even after an input action has
+    made it stale.
+
+    States scanned with a scan scope are stored with it as ``key`` and only
+    served by get() for the same key. Every stored state gets a new ``version``; the last few versions are
+    kept so responses can be diffed against a state the agent already saw.
+    """
+
+    def __init__(self, ttl: float = STATE_CACHE_TTL, history_size: int = STATE_HISTORY_SIZE):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a state may be served by get() after it was stored
+            history_size: Number of recent versions kept for snapshot()
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.version = 0
+        self._state: Optional[TreeState] = None
+        self._timestamp = 0.0
+        self._valid = False
+        self.key: Any = None
+        self._history: OrderedDict[int, TreeState] = OrderedDict()
+        self._history_size = max(1, history_size)
+        self._lock = threading.Lock()
+
+    def get(self, key: Any = None) -> Optional[TreeState]:
+        """Return the cached state if it is fresh and was stored under key, counting a hit or miss."""
+        with self._lock:
+            if self._state is not None and self._valid and self.key == key and (time.time() - self._timestamp) < self.ttl:
+                self.hits += 1
+                return self._state
+            self.misses += 1
+            return None
+
+    def is_fresh(self) -> bool:
+        """Return True if get() would return the latest state."""
+        return self._state is not None and self._valid and (time.time() - self._timestamp) < self.ttl
+
+    def is_valid(self) -> bool:
+        """Return True if the latest state has not been invalidated since it was stored, whatever its age."""
+        return self._state is not None and self._valid
+
+    def peek(self) -> Optional[TreeState]:
+        """Return the latest state regardless of age or invalidation."""
+        return self._state
+
+    def put(self, state: TreeState, key: Any = None):
+        """Store a freshly scanned state, with the scan scope it was taken with."""
+        with self._lock:
+            self._state = state
+            self.key = key
+            self._timestamp = time.time()
+            self._valid = True
+            self.version += 1
+            state.version = self.version
+            self._history[self.version] = state
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+
+    def snapshot(self, version: int) -> Optional[TreeState]:
+        """Return the state stored as the given version, if still kept."""
+        with self._lock:
+            return self._history.get(version)
+
+    def invalidate(self, reason: str = ""):
+        """Mark the cached state stale, e.g. after a click or keystroke."""
+        with self._lock:
+            if self._valid:
+                self.invalidations += 1
+                logger.debug(f"Tree state cache invalidated{f' ({reason})' if reason else ''}")
+            self._valid = False
+
+    def age(self) -> Optional[float]:
+        """Seconds since the latest state was stored, or None if empty."""
+        if self._state is None:
+            return None
+        return time.time() - self._timestamp
+
+    def stats(self) -> dict:
+        """Return hit/miss counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "version": self.version,
+            "ttl": self.ttl
+        }
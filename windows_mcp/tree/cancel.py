@@ -0,0 +1,35 @@
+"""Cooperative cancellation of tree scans running on worker threads."""
+
+import threading
+
+
+class ScanCancelled(Exception):
+    """Raised by a scan that was stopped through its CancelToken."""
+
+
+class CancelToken:
+    """Flag a caller sets to stop a scan running on another thread.
+
+    Traversal checks the token before visiting each node, so a cancelled
+    scan stops after the backend calls already in flight return.
+    """
+
+    __slots__ = ('_event', 'reason')
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = ""
+
+    def cancel(self, reason: str = ""):
+        """Request the scan to stop."""
+        self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Raise ScanCancelled if cancel() was called."""
+        if self._event.is_set():
+            raise ScanCancelled(self.reason or "scan cancelled")
@@ -0,0 +1,334 @@
+"""Column-oriented storage for the elements of a TreeState.
+
+A scan can produce tens of thousands of elements. Storing each one as a
+dataclass with nested BoundingBox and Center objects costs several Python
+objects per element. The stores here keep coordinates in packed integer
+arrays, keep repeated strings such as app names and control types in a
+shared table, and hand out small view objects that behave like the
+original element nodes.
+"""
+
+from array import array
+from typing import Any, Iterable, Iterator, Sequence, Union, overload
+
+from windows_mcp.tree.views import (
+    BoundingBox,
+    Center,
+    ScrollElementNode,
+    TextElementNode,
+    TreeElementNode,
+    TreeState
+)
+
+# Bit flags packed into one byte per element
+_ENABLED = 1
+_KEYBOARD_FOCUSABLE = 2
+_HORIZONTAL_SCROLLABLE = 4
+_VERTICAL_SCROLLABLE = 8
+_FOCUSED = 16
+
+
+class StringTable:
+    """Interns repeated strings and refers to them by index."""
+
+    __slots__ = ('strings', '_index')
+
+    def __init__(self):
+        self.strings: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        """Return the index of value, adding it if needed."""
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.strings)
+            self._index[value] = index
+            self.strings.append(value)
+        return index
+
+
+class _Columns(Sequence):
+    """Base class for column stores; subclasses define the columns."""
+
+    _view_class: type = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list: ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._view_class(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("element index out of range")
+        return self._view_class(self, index)
+
+    def __iter__(self) -> Iterator:
+        view_class = self._view_class
+        for i in range(len(self)):
+            yield view_class(self, i)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} elements)"
+
+
+class _RectColumns(_Columns):
+    """Column store with a packed bounding rectangle per element."""
+
+    def _init_rects(self):
+        self.left = array('i')
+        self.top = array('i')
+        self.right = array('i')
+        self.bottom = array('i')
+
+    def _append_rect(self, box: BoundingBox):
+        self.left.append(box.left)
+        self.top.append(box.top)
+        self.right.append(box.right)
+        self.bottom.append(box.bottom)
+
+    def bounding_box(self, i: int) -> BoundingBox:
+        left, top, right, bottom = self.left[i], self.top[i], self.right[i], self.bottom[i]
+        return BoundingBox(left=left, top=top, right=right, bottom=bottom,
+                           width=right - left, height=bottom - top)
+
+    def center(self, i: int) -> Center:
+        left, top = self.left[i], self.top[i]
+        return Center(x=left + (self.right[i] - left) // 2, y=top + (self.bottom[i] - top) // 2)
+
+
+class InteractiveColumns(_RectColumns):
+    """Column store for interactive elements (TreeElementNode)."""
+
+    def __init__(self, nodes: Iterable[TreeElementNode] = ()):
+        self._init_rects()
+        self.strings = StringTable()
+        self.names: list[str] = []
+        self.values: list[str] = []
+        self.shortcuts: list[str] = []
+        self.control_types = array('I')
+        self.app_names = array('I')
+        self.flags = bytearray()
+        self.fingerprints = array('q')
+        # Walk paths packed end to end; path i is path_data[path_ends[i - 1]:path_ends[i]]
+        self.path_data = array('I')
+        self.path_ends = array('I')
+        # UIA runtime ids packed the same way
+        self.runtime_id_data = array('q')
+        self.runtime_id_ends = array('I')
+        for node in nodes:
+            self.append(node)
+
+    def append(self, node: TreeElementNode):
+        """Add an element, copying its fields into the columns."""
+        self._append_rect(node.bounding_box)
+        self.names.append(node.name)
+        self.values.append(node.value or "")
+        self.shortcuts.append(node.shortcut or "")
+        self.control_types.append(self.strings.add(node.control_type))
+        self.app_names.append(self.strings.add(node.app_name))
+        self.flags.append(
+            (_ENABLED if node.is_enabled else 0)
+            | (_KEYBOARD_FOCUSABLE if node.is_keyboard_focusable else 0)
+        )
+        self.fingerprints.append(node.fingerprint)
+        self.path_data.extend(node.path)
+        self.path_ends.append(len(self.path_data))
+        self.runtime_id_data.extend(node.runtime_id)
+        self.runtime_id_ends.append(len(self.runtime_id_data))
+
+    def path(self, i: int) -> tuple:
+        """Return the walk path of element i."""
+        start = self.path_ends[i - 1] if i else 0
+        return tuple(self.path_data[start:self.path_ends[i]])
+
+    def runtime_id(self, i: int) -> tuple:
+        """Return the UIA runtime id of element i, empty if it was not read."""
+        start = self.runtime_id_ends[i - 1] if i else 0
+        return tuple(self.runtime_id_data[start:self.runtime_id_ends[i]])
+
+    def row(self, i: int, label: int) -> list:
+        """Return element i in TreeElementNode.to_row format without building a view."""
+        strings = self.strings.strings
+        left, top = self.left[i], self.top[i]
+        return [
+            label,
+            strings[self.app_names[i]],
+            strings[self.control_types[i]],
+            self.names[i] or "''",
+            self.values[i] or "''",
+            self.shortcuts[i] or "None",
+            f'({left + (self.right[i] - left) // 2},{top + (self.bottom[i] - top) // 2})'
+        ]
+
+    def rows(self, labels: Iterable[int]) -> Iterator[list]:
+        """Yield table rows for the given labels."""
+        row = self.row
+        for label in labels:
+            yield row(label, label)
+
+
+class InformativeColumns(_Columns):
+    """Column store for informative text elements (TextElementNode)."""
+
+    def __init__(self, nodes: Iterable[TextElementNode] = ()):
+        self.strings = StringTable()
+        self.names: list[str] = []
+        self.control_types = array('I')
+        self.app_names = array('I')
+        for node in nodes:
+            self.append(node)
+
+    def append(self, node: TextElementNode):
+        """Add an element, copying its fields into the columns."""
+        self.names.append(node.name)
+        self.control_types.append(self.strings.add(node.control_type))
+        self.app_names.append(self.strings.add(node.app_name))
+
+
+class ScrollColumns(_RectColumns):
+    """Column store for scrollable elements (ScrollElementNode)."""
+
+    def __init__(self, nodes: Iterable[ScrollElementNode] = ()):
+        self._init_rects()
+        self.strings = StringTable()
+        self.names: list[str] = []
+        self.control_types = array('I')
+        self.app_names = array('I')
+        self.horizontal_percents = array('d')
+        self.vertical_percents = array('d')
+        self.flags = bytearray()
+        self.fingerprints = array('q')
+        for node in nodes:
+            self.append(node)
+
+    def append(self, node: ScrollElementNode):
+        """Add an element, copying its fields into the columns."""
+        self._append_rect(node.bounding_box)
+        self.names.append(node.name)
+        self.control_types.append(self.strings.add(node.control_type))
+        self.app_names.append(self.strings.add(node.app_name))
+        self.horizontal_percents.append(node.horizontal_scroll_percent)
+        self.vertical_percents.append(node.vertical_scroll_percent)
+        self.flags.append(
+            (_HORIZONTAL_SCROLLABLE if node.horizontal_scrollable else 0)
+            | (_VERTICAL_SCROLLABLE if node.vertical_scrollable else 0)
+            | (_FOCUSED if node.is_focused else 0)
+        )
+        self.fingerprints.append(node.fingerprint)
+
+
+class _ElementView:
+    """Read-only view of one row in a column store."""
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns: _Columns, index: int):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._columns.names[self._index]
+
+    @property
+    def control_type(self) -> str:
+        columns = self._columns
+        return columns.strings.strings[columns.control_types[self._index]]
+
+    @property
+    def app_name(self) -> str:
+        columns = self._columns
+        return columns.strings.strings[columns.app_names[self._index]]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, _ElementView):
+            return self._columns is other._columns and self._index == other._index
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._columns), self._index))
+
+
+class TreeElementView(_ElementView):
+    """View with the attributes and methods of TreeElementNode."""
+
+    __slots__ = ()
+
+    value = property(lambda self: self._columns.values[self._index])
+    shortcut = property(lambda self: self._columns.shortcuts[self._index])
+    bounding_box = property(lambda self: self._columns.bounding_box(self._index))
+    center = property(lambda self: self._columns.center(self._index))
+    is_enabled = property(lambda self: bool(self._columns.flags[self._index] & _ENABLED))
+    is_keyboard_focusable = property(lambda self: bool(self._columns.flags[self._index] & _KEYBOARD_FOCUSABLE))
+    fingerprint = property(lambda self: self._columns.fingerprints[self._index])
+    path = property(lambda self: self._columns.path(self._index))
+    runtime_id = property(lambda self: self._columns.runtime_id(self._index))
+
+    to_dict = TreeElementNode.to_dict
+
+    def to_row(self, index: int) -> list:
+        """Convert to table row format."""
+        return self._columns.row(self._index, index)
+
+
+class TextElementView(_ElementView):
+    """View with the attributes and methods of TextElementNode."""
+
+    __slots__ = ()
+
+    to_row = TextElementNode.to_row
+
+
+class ScrollElementView(_ElementView):
+    """View with the attributes and methods of ScrollElementNode."""
+
+    __slots__ = ()
+
+    bounding_box = property(lambda self: self._columns.bounding_box(self._index))
+    center = property(lambda self: self._columns.center(self._index))
+    horizontal_scrollable = property(lambda self: bool(self._columns.flags[self._index] & _HORIZONTAL_SCROLLABLE))
+    horizontal_scroll_percent = property(lambda self: self._columns.horizontal_percents[self._index])
+    vertical_scrollable = property(lambda self: bool(self._columns.flags[self._index] & _VERTICAL_SCROLLABLE))
+    vertical_scroll_percent = property(lambda self: self._columns.vertical_percents[self._index])
+    is_focused = property(lambda self: bool(self._columns.flags[self._index] & _FOCUSED))
+    fingerprint = property(lambda self: self._columns.fingerprints[self._index])
+
+    to_row = ScrollElementNode.to_row
+    to_dict = ScrollElementNode.to_dict
+
+
+InteractiveColumns._view_class = TreeElementView
+InformativeColumns._view_class = TextElementView
+ScrollColumns._view_class = ScrollElementView
+
+
+def compact_state(state: TreeState) -> TreeState:
+    """Return a TreeState whose node sequences are column stores.
+
+    Args:
+        state: State holding lists of element nodes
+
+    Returns:
+        Equivalent state backed by InteractiveColumns, InformativeColumns
+        and ScrollColumns
+    """
+    if isinstance(state.interactive_nodes, InteractiveColumns):
+        return state
+    return TreeState(
+        interactive_nodes=InteractiveColumns(state.interactive_nodes),
+        informative_nodes=InformativeColumns(state.informative_nodes),
+        scrollable_nodes=ScrollColumns(state.scrollable_nodes),
+        app_windows=state.app_windows,
+        truncation=state.truncation
+    )
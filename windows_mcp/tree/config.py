@@ -30,3 +30,102 @@ MIN_ELEMENT_AREA = 10
 # Font settings for annotations
 ANNOTATION_FONT_SIZE = 12
 ANNOTATION_PADDING = 20
+
+# Batch property reads into cache requests: one per app subtree before traversal,
+# or one per container level during traversal when a node or time budget is set,
+# since a subtree request cannot be stopped once sent
+PREFETCH_SUBTREES = True
+
+# With a node or time budget set, apps whose previous scan visited at most this
+# many nodes are still fetched in one subtree request; larger and new apps are
+# fetched one level per request
+PREFETCH_BUDGETED_MAX_NODES = 2000
+
+# UIA property ids cached by the subtree prefetch (UIA_*PropertyId values)
+PREFETCH_PROPERTY_IDS: dict[str, int] = {
+    'RuntimeId': 30000,
+    'BoundingRectangle': 30001,
+    'ProcessId': 30002,
+    'ControlType': 30003,
+    'LocalizedControlType': 30004,
+    'Name': 30005,
+    'AcceleratorKey': 30006,
+    'HasKeyboardFocus': 30008,
+    'IsKeyboardFocusable': 30009,
+    'IsEnabled': 30010,
+    'ClassName': 30012,
+    'IsControlElement': 30016,
+    'NativeWindowHandle': 30020,
+    'IsOffscreen': 30022,
+    'IsScrollPatternAvailable': 30034,
+    'HorizontalScrollPercent': 30053,
+    'VerticalScrollPercent': 30055,
+    'HorizontallyScrollable': 30057,
+    'VerticallyScrollable': 30058,
+    'LegacyIAccessibleValue': 30093,
+}
+
+# Maximum depth below an app window that traversal descends to
+MAX_TREE_DEPTH = 20
+
+# Worker threads used to walk live (non-prefetched) trees
+TRAVERSAL_WORKERS = 4
+
+# Nodes shallower than this always hand their children to the shared work queue
+TRAVERSAL_SPLIT_DEPTH = 2
+
+# Threads in the long-lived traversal pool owned by the server
+TRAVERSAL_POOL_SIZE = 8
+
+# Keep the scanned tree indexed and patch it from UI Automation change events,
+# so refreshes rescan only the subtrees that changed
+INCREMENTAL_REFRESH = False
+
+# Dirty subtrees per refresh above which incremental mode rescans everything
+INCREMENTAL_MAX_DIRTY_SUBTREES = 32
+
+# Seconds an incremental refresh after an input action waits for the UI's
+# change events to arrive before serving the index unchanged
+INCREMENTAL_SETTLE_TIME = 0.1
+
+# Seconds between message pumps on the UI Automation event thread
+EVENT_PUMP_INTERVAL = 0.05
+
+# Seconds a scanned tree state is reused before rescanning
+STATE_CACHE_TTL = 2.0
+
+# Interactive elements returned per get_desktop_state page by default, and the cap
+STATE_PAGE_SIZE = 200
+STATE_MAX_PAGE_SIZE = 2000
+
+# Store scanned elements in packed columns instead of one object per element
+COMPACT_TREE_STATE = True
+
+# Number of recent tree states kept for delta responses
+STATE_HISTORY_SIZE = 4
+
+# Siblings tried, nearest first, when re-resolving an element whose index shifted
+RESOLVE_SIBLING_SCAN = 8
+
+# Total shift of ancestor indices tried when re-resolving an element by runtime id
+RESOLVE_MAX_SHIFT = 2
+
+# Children requests one re-resolve may make while trying shifted ancestors
+RESOLVE_MAX_REQUESTS = 32
+
+# Skip the children of containers whose bounds lie outside the screen (or scan region)
+CULL_OFFSCREEN_SUBTREES = True
+
+# Containers whose children are always traversed, since their content can
+# report bounds outside the container (e.g. virtualized text and documents)
+CULL_EXEMPT_CONTROL_TYPE_NAMES = {'EditControl', 'DocumentControl'}
+
+# Nodes visited per scan before it stops and reports truncation (None for no limit);
+# a node limit makes the walk breadth-first
+SCAN_MAX_NODES = 50000
+
+# Seconds a scan may spend walking the tree before it stops (None for no limit)
+SCAN_TIME_LIMIT = 5.0
+
+# Per-app overrides of MAX_TREE_DEPTH, keyed by app name
+APP_MAX_DEPTHS: dict[str, int] = {}
@@ -0,0 +1,235 @@
+"""Differences between two tree states, keyed by element identity."""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterable, Sequence
+
+from windows_mcp.tree.views import TreeState, format_table
+
+
+def element_key(node: Any) -> Hashable:
+    """Identity of an element that survives relabeling.
+
+    Interactive and scrollable elements are keyed by their fingerprint.
+    Informative elements have none and are keyed by app, type and name.
+    """
+    fingerprint = getattr(node, 'fingerprint', None)
+    if fingerprint is None:
+        return _identity(node)
+    return fingerprint
+
+
+def _identity(node: Any) -> tuple:
+    """App, type and name of an element, shared by same-named siblings."""
+    return (node.app_name, node.control_type, node.name)
+
+
+def _keyed(nodes: Sequence[Any], indexes: Iterable[int], key: Callable[[Any], Hashable]) -> dict[tuple, int]:
+    """Map the key of each selected element to its index.
+
+    Elements sharing a key are told apart by their occurrence number in
+    document order.
+    """
+    keyed = {}
+    seen: dict[Hashable, int] = {}
+    for index in indexes:
+        node_key = key(nodes[index])
+        occurrence = seen.get(node_key, 0)
+        seen[node_key] = occurrence + 1
+        keyed[(node_key, occurrence)] = index
+    return keyed
+
+
+def _bounds(node: Any) -> tuple:
+    box = getattr(node, 'bounding_box', None)
+    return None if box is None else (box.left, box.top, box.right, box.bottom)
+
+
+@dataclass
+class SectionDelta:
+    """Changes to one element list.
+
+    Indexes in ``added``, ``moved`` and ``changed`` refer to the new list,
+    indexes in ``removed`` to the old one, and ``survivors`` maps the old
+    index of every element present in both lists to its new index.
+    """
+    added: list[int] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+    moved: list[int] = field(default_factory=list)
+    changed: list[int] = field(default_factory=list)
+    survivors: dict[int, int] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.moved or self.changed)
+
+
+def diff_nodes(old: Sequence[Any], new: Sequence[Any], row: Callable[[Any], list]) -> SectionDelta:
+    """Diff two element lists by element identity.
+
+    Elements are paired by element_key first. Elements left unpaired on
+    both sides, typically because a sibling inserted or removed before them
+    shifted their path and so their fingerprint, are then paired by app,
+    type and name in document order. An element is moved when its bounding box changed, and changed when
+    any other reported field (such as its value) did.
+
+    Args:
+        old: Elements of the previous state
+        new: Elements of the current state
+        row: Returns the reported fields of an element, without its label
+
+    Returns:
+        SectionDelta describing how to turn old into new
+    """
+    delta = SectionDelta()
+    old_keys = _keyed(old, range(len(old)), element_key)
+    unmatched = []
+    for key, new_index in _keyed(new, range(len(new)), element_key).items():
+        old_index = old_keys.pop(key, None)
+        if old_index is None:
+            unmatched.append(new_index)
+        else:
+            delta.survivors[old_index] = new_index
+    if unmatched and old_keys:
+        old_keys = _keyed(old, sorted(old_keys.values()), _identity)
+        shifted = _keyed(new, sorted(unmatched), _identity)
+        unmatched = []
+        for key, new_index in shifted.items():
+            old_index = old_keys.pop(key, None)
+            if old_index is None:
+                unmatched.append(new_index)
+            else:
+                delta.survivors[old_index] = new_index
+    delta.added = sorted(unmatched)
+    for old_index, new_index in delta.survivors.items():
+        old_node, new_node = old[old_index], new[new_index]
+        if _bounds(old_node) != _bounds(new_node):
+            delta.moved.append(new_index)
+        elif row(old_node) != row(new_node):
+            delta.changed.append(new_index)
+    delta.moved.sort()
+    delta.changed.sort()
+    delta.removed = sorted(old_keys.values())
+    return delta
+
+
+@dataclass
+class StateDelta:
+    """Changes between two versions of the tree state."""
+    from_version: int
+    to_version: int
+    interactive: SectionDelta
+    informative: SectionDelta
+    scrollable: SectionDelta
+    label_remap: dict[int, int]
+
+    def is_empty(self) -> bool:
+        return (
+            self.interactive.is_empty() and self.informative.is_empty()
+            and self.scrollable.is_empty() and not self.label_remap
+        )
+
+
+def diff_states(old: TreeState, new: TreeState, from_version: int = 0, to_version: int = 0) -> StateDelta:
+    """Diff every element list of two tree states.
+
+    Args:
+        old: State the agent saw last
+        new: Current state
+        from_version: Cache version of old
+        to_version: Cache version of new
+
+    Returns:
+        StateDelta whose ``label_remap`` maps old labels of surviving
+        interactive and scrollable elements to their new labels, where
+        they differ
+    """
+    if old is new:
+        return StateDelta(from_version, to_version, SectionDelta(), SectionDelta(), SectionDelta(), {})
+    interactive = diff_nodes(old.interactive_nodes, new.interactive_nodes, lambda node: node.to_row(0))
+    informative = diff_nodes(old.informative_nodes, new.informative_nodes, lambda node: node.to_row())
+    scrollable = diff_nodes(old.scrollable_nodes, new.scrollable_nodes, lambda node: node.to_row(0, 0))
+
+    # Scrollable labels follow the interactive ones
+    old_base, new_base = len(old.interactive_nodes), len(new.interactive_nodes)
+    label_remap = {o: n for o, n in interactive.survivors.items() if o != n}
+    label_remap.update(
+        (old_base + o, new_base + n) for o, n in scrollable.survivors.items()
+        if old_base + o != new_base + n
+    )
+    return StateDelta(
+        from_version=from_version,
+        to_version=to_version,
+        interactive=interactive,
+        informative=informative,
+        scrollable=scrollable,
+        label_remap=label_remap
+    )
+
+
+def _remap_ranges(remap: dict[int, int]) -> list[str]:
+    """Compress a label remap into runs shifted by the same amount."""
+    runs = []
+    for old_label in sorted(remap):
+        new_label = remap[old_label]
+        if runs and old_label == runs[-1][1] + 1 and new_label - old_label == runs[-1][2]:
+            runs[-1][1] = old_label
+        else:
+            runs.append([old_label, old_label, new_label - old_label])
+    return [
+        f"{start}->{start + shift}" if start == end else f"{start}-{end}->{start + shift}-{end + shift}"
+        for start, end, shift in runs
+    ]
+
+
+def delta_to_string(delta: StateDelta, old: TreeState, new: TreeState) -> str:
+    """Render a StateDelta as tables of the affected elements only.
+
+    Args:
+        delta: Result of diff_states(old, new)
+        old: Previous state, used for removed elements
+        new: Current state
+
+    Returns:
+        Text listing added, moved, changed and removed elements and the
+        label remapping, using labels of the respective state
+    """
+    if delta.is_empty():
+        return "No changes since the previous desktop state.\n"
+
+    interactive_headers = ["Label", "App", "Type", "Name", "Value", "Shortcut", "Coordinates"]
+    scrollable_headers = [
+        "Label", "App", "Type", "Name", "Coordinates",
+        "H-Scroll", "H-Pos%", "V-Scroll", "V-Pos%", "Focused"
+    ]
+    informative_headers = ["App", "Type", "Name"]
+    old_base, new_base = len(old.interactive_nodes), len(new.interactive_nodes)
+    sections = []
+
+    def table(title: str, headers: list[str], rows: list[list]):
+        if rows:
+            sections.append(f"=== {title} ({len(rows)}) ===\n" + format_table(headers, rows))
+
+    nodes = new.interactive_nodes
+    table("ADDED INTERACTIVE", interactive_headers, [nodes[i].to_row(i) for i in delta.interactive.added])
+    table("MOVED INTERACTIVE", interactive_headers, [nodes[i].to_row(i) for i in delta.interactive.moved])
+    table("CHANGED INTERACTIVE", interactive_headers, [nodes[i].to_row(i) for i in delta.interactive.changed])
+    table("REMOVED INTERACTIVE (previous labels)", interactive_headers,
+          [old.interactive_nodes[i].to_row(i) for i in delta.interactive.removed])
+
+    nodes = new.scrollable_nodes
+    table("ADDED SCROLLABLE", scrollable_headers, [nodes[i].to_row(i, new_base) for i in delta.scrollable.added])
+    table("MOVED SCROLLABLE", scrollable_headers, [nodes[i].to_row(i, new_base) for i in delta.scrollable.moved])
+    table("CHANGED SCROLLABLE", scrollable_headers, [nodes[i].to_row(i, new_base) for i in delta.scrollable.changed])
+    table("REMOVED SCROLLABLE (previous labels)", scrollable_headers,
+          [old.scrollable_nodes[i].to_row(i, old_base) for i in delta.scrollable.removed])
+
+    table("ADDED INFORMATIVE", informative_headers, [new.informative_nodes[i].to_row() for i in delta.informative.added])
+    table("CHANGED INFORMATIVE", informative_headers, [new.informative_nodes[i].to_row() for i in delta.informative.changed])
+    table("REMOVED INFORMATIVE", informative_headers, [old.informative_nodes[i].to_row() for i in delta.informative.removed])
+
+    if delta.label_remap:
+        sections.append(
+            f"=== LABEL REMAP (old->new, {len(delta.label_remap)} labels) ===\n"
+            + ", ".join(_remap_ranges(delta.label_remap)) + "\n"
+        )
+
+    return "\n".join(sections)
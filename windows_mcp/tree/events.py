@@ -0,0 +1,223 @@
+"""UI change events that drive incremental tree refreshes."""
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+try:
+    import uiautomation as ua
+    UIAUTOMATION_AVAILABLE = True
+except ImportError:
+    UIAUTOMATION_AVAILABLE = False
+
+try:
+    import pythoncom
+    PYTHONCOM_AVAILABLE = True
+except ImportError:
+    PYTHONCOM_AVAILABLE = False
+
+from windows_mcp.tree.config import EVENT_PUMP_INTERVAL, PREFETCH_PROPERTY_IDS
+
+logger = logging.getLogger('windows-mcp.tree')
+
+# Event kinds
+STRUCTURE_CHANGED = 'structure_changed'
+PROPERTY_CHANGED = 'property_changed'
+FOCUS_CHANGED = 'focus_changed'
+
+# Properties whose changes are forwarded by the UI Automation event source
+WATCHED_PROPERTIES = (
+    'Name', 'BoundingRectangle', 'IsEnabled', 'IsOffscreen',
+    'LegacyIAccessibleValue', 'VerticalScrollPercent', 'HorizontalScrollPercent'
+)
+
+# UIA TreeScope_Subtree
+_TREE_SCOPE_SUBTREE = 7
+
+# PeekMessage flag removing the message from the queue
+_PM_REMOVE = 1
+
+
+@dataclass(frozen=True)
+class TreeEvent:
+    """A change reported for one element, identified by its runtime id.
+
+    For structure changes the runtime id is the element whose children
+    changed, so that element's subtree is the one to rescan.
+    """
+    kind: str
+    runtime_id: tuple
+    property_name: Optional[str] = None
+
+
+class EventSource:
+    """Pluggable source of TreeEvents, drained by the Tree service."""
+
+    def start(self, root: Any):
+        """Begin listening for changes under root."""
+
+    def stop(self):
+        """Stop listening."""
+
+    def drain(self, timeout: float = 0.0) -> list[TreeEvent]:
+        """Return and forget all events received since the last drain.
+
+        Args:
+            timeout: Seconds to wait for a first event if none is queued
+        """
+        return []
+
+
+class QueueEventSource(EventSource):
+    """Event source backed by a thread-safe queue."""
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    def push(self, event: TreeEvent):
+        """Record an event; safe to call from any thread."""
+        self._queue.put(event)
+
+    def drain(self, timeout: float = 0.0) -> list[TreeEvent]:
+        events = []
+        if timeout > 0:
+            try:
+                events.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                return events
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+
+class ScriptedEventSource(QueueEventSource):
+    """Event source replaying a fixed script, for tests and benchmarks.
+
+    Call advance() after mutating the tree to deliver the next scripted
+    batch, so mutations and scans can be interleaved deterministically.
+    """
+
+    def __init__(self, batches: Iterable[list[TreeEvent]] = ()):
+        super().__init__()
+        self._batches = list(batches)
+
+    def advance(self) -> list[TreeEvent]:
+        """Deliver the next scripted batch and return it."""
+        batch = self._batches.pop(0) if self._batches else []
+        for event in batch:
+            self.push(event)
+        return batch
+
+
+def _pump_messages():
+    """Dispatch the window messages waiting on the calling thread.
+
+    COM delivers event callbacks to a single-threaded apartment through its
+    message queue, so the thread that registered the handlers must pump it.
+    """
+    if PYTHONCOM_AVAILABLE:
+        pythoncom.PumpWaitingMessages()
+        return
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    msg = wintypes.MSG()
+    while user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, _PM_REMOVE):
+        user32.TranslateMessage(ctypes.byref(msg))
+        user32.DispatchMessageW(ctypes.byref(msg))
+
+
+class UIAutomationEventSource(QueueEventSource):
+    """Event source fed by UI Automation structure, property and focus events.
+
+    Handlers are registered from a dedicated COM thread, which pumps its
+    message queue every EVENT_PUMP_INTERVAL seconds so callbacks are
+    delivered. Handlers only push runtime ids onto the queue; all tree work
+    happens when Tree drains it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self, root: Any):
+        if not UIAUTOMATION_AVAILABLE or self._thread is not None:
+            return
+        try:
+            # COM objects belong to the caller's apartment; the listener reopens root by handle
+            handle = root.NativeWindowHandle
+        except Exception as e:
+            logger.warning(f"Could not read the root window handle, UI change events disabled: {e}")
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._listen, args=(handle,), name='uia-events', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _listen(self, handle: int):
+        """Register handlers, pump messages until stopped, then unregister."""
+        from comtypes import COMObject
+
+        source = self
+        with ua.UIAutomationInitializerInThread():
+            client = ua._AutomationClient.instance()
+            automation = client.IUIAutomation
+            core = client.UIAutomationCore
+
+            def runtime_id(element: Any) -> tuple:
+                return tuple(element.GetRuntimeId() or ())
+
+            class StructureHandler(COMObject):
+                _com_interfaces_ = [core.IUIAutomationStructureChangedEventHandler]
+
+                def HandleStructureChangedEvent(self, sender, change_type, runtime_ids):
+                    source.push(TreeEvent(STRUCTURE_CHANGED, runtime_id(sender)))
+
+            class PropertyHandler(COMObject):
+                _com_interfaces_ = [core.IUIAutomationPropertyChangedEventHandler]
+
+                def HandlePropertyChangedEvent(self, sender, property_id, new_value):
+                    source.push(TreeEvent(PROPERTY_CHANGED, runtime_id(sender), property_names.get(property_id)))
+
+            class FocusHandler(COMObject):
+                _com_interfaces_ = [core.IUIAutomationFocusChangedEventHandler]
+
+                def HandleFocusChangedEvent(self, sender):
+                    source.push(TreeEvent(FOCUS_CHANGED, runtime_id(sender)))
+
+            property_names = {PREFETCH_PROPERTY_IDS[name]: name for name in WATCHED_PROPERTIES}
+            handlers = (StructureHandler(), PropertyHandler(), FocusHandler())
+            try:
+                element = automation.ElementFromHandle(handle) if handle else automation.GetRootElement()
+                automation.AddStructureChangedEventHandler(element, _TREE_SCOPE_SUBTREE, None, handlers[0])
+                automation.AddPropertyChangedEventHandler(
+                    element, _TREE_SCOPE_SUBTREE, None, handlers[1], list(property_names)
+                )
+                automation.AddFocusChangedEventHandler(None, handlers[2])
+            except Exception as e:
+                logger.warning(f"Could not register UI Automation event handlers: {e}")
+                return
+
+            while not self._stopped.wait(EVENT_PUMP_INTERVAL):
+                try:
+                    _pump_messages()
+                except Exception as e:
+                    logger.warning(f"UI Automation event pump failed, stopping events: {e}")
+                    break
+            try:
+                automation.RemoveAllEventHandlers()
+            except Exception as e:
+                logger.debug(f"Could not remove UI Automation event handlers: {e}")
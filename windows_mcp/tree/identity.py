@@ -0,0 +1,91 @@
+"""Stable element fingerprints and lookup of elements across scans.
+
+Labels are list positions and change whenever a scan finds a different
+set of elements. A fingerprint identifies the same control across scans:
+it hashes the owning app (and which window of that app), the control
+type, the name and the element's child-index path below the app window.
+Fingerprints are a BLAKE2b digest of those fields rather than Python's
+salted ``hash()``, so they are equal across processes and restarts.
+"""
+
+import hashlib
+from typing import Any, Optional, Sequence
+
+
+def element_fingerprint(
+    app_name: str, app_occurrence: int, control_type_name: str, name: str, relative_path: tuple
+) -> int:
+    """Compute the fingerprint of an element.
+
+    Args:
+        app_name: Friendly name of the owning application
+        app_occurrence: Index of the window among windows of the same app name
+        control_type_name: UIA control type name of the element
+        name: Element name as read from the control
+        relative_path: Child indices from the app window down to the element
+
+    Returns:
+        Signed 64-bit fingerprint
+    """
+    fields = repr((app_name, app_occurrence, control_type_name, name, tuple(relative_path)))
+    digest = hashlib.blake2b(fields.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def app_occurrences(app_names: Sequence[str]) -> list[int]:
+    """Number each app window among the windows sharing its app name."""
+    seen: dict[str, int] = {}
+    occurrences = []
+    for app_name in app_names:
+        occurrence = seen.get(app_name, 0)
+        seen[app_name] = occurrence + 1
+        occurrences.append(occurrence)
+    return occurrences
+
+
+class ElementIndex:
+    """Hash index from fingerprint (and from app, type and name) to label."""
+
+    def __init__(self, nodes: Sequence[Any]):
+        """Build the fingerprint index of a node sequence.
+
+        Args:
+            nodes: Interactive elements of one TreeState
+        """
+        self.nodes = nodes
+        fingerprints = getattr(nodes, 'fingerprints', None)
+        if fingerprints is None:
+            fingerprints = [node.fingerprint for node in nodes]
+        # Keep the first label if a fingerprint repeats
+        self.by_fingerprint: dict[int, int] = dict(zip(reversed(fingerprints), range(len(fingerprints) - 1, -1, -1)))
+        self._by_identity: Optional[dict[tuple, list[int]]] = None
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Return the label of the element with this fingerprint, if any."""
+        return self.by_fingerprint.get(fingerprint)
+
+    def resolve(self, element: Any) -> Optional[int]:
+        """Find the label of an element taken from another snapshot.
+
+        The fingerprint is tried first. If the element's path shifted
+        (e.g. a sibling was inserted before it), an element with the same
+        app, type and name at exactly the same bounds is accepted instead.
+
+        Args:
+            element: Interactive element from an earlier TreeState
+
+        Returns:
+            Label in this index's state, or None if the element is gone
+        """
+        label = self.by_fingerprint.get(element.fingerprint)
+        if label is not None:
+            return label
+        if self._by_identity is None:
+            self._by_identity = {}
+            for index, node in enumerate(self.nodes):
+                self._by_identity.setdefault((node.app_name, node.control_type, node.name), []).append(index)
+        bounds = element.bounding_box
+        for candidate in self._by_identity.get((element.app_name, element.control_type, element.name), ()):
+            if self.nodes[candidate].bounding_box == bounds:
+                return candidate
+        return None
@@ -0,0 +1,278 @@
+"""Persistent node index patched by UI change events."""
+
+import dataclasses
+import logging
+from typing import TYPE_CHECKING, Any, Optional
+
+from windows_mcp.tree.cancel import CancelToken, ScanCancelled
+from windows_mcp.tree.config import INCREMENTAL_MAX_DIRTY_SUBTREES
+from windows_mcp.tree.events import FOCUS_CHANGED, PROPERTY_CHANGED, STRUCTURE_CHANGED, TreeEvent
+from windows_mcp.tree.identity import app_occurrences
+from windows_mcp.tree.views import ElementRecord, ScanTruncation, TreeState
+
+if TYPE_CHECKING:
+    from windows_mcp.tree.service import Tree
+
+logger = logging.getLogger('windows-mcp.tree')
+
+
+class IndexEntry:
+    """One traversed control and the element it produced, if any.
+
+    ``expanded`` is False for containers culled by the viewport, whose
+    children were not walked.
+    """
+
+    __slots__ = ('key', 'control', 'app_name', 'path', 'parent', 'children', 'kind', 'element', 'expanded')
+
+    def __init__(self, key: tuple, control: Any, app_name: str, path: tuple, expanded: bool = True):
+        self.key = key
+        self.control = control
+        self.app_name = app_name
+        self.path = path
+        self.parent: Optional['IndexEntry'] = None
+        self.children: list['IndexEntry'] = []
+        self.kind: Optional[str] = None
+        self.element: Any = None
+        self.expanded = expanded
+
+
+class IncrementalIndex:
+    """Keeps every traversed node indexed by runtime id between scans.
+
+    A full build walks the selected apps once through Tree._get_nodes, so
+    culling, the scan budget and cancellation apply exactly as in a normal
+    scan. Afterwards, structure changes rescan only the subtree of the
+    element whose children changed, the same way, and property or focus
+    changes re-read only the element itself. A property change on a culled
+    container rescans it, since it may have moved into view. Events for
+    unknown elements, or too many dirty subtrees at once, fall back to a
+    full rebuild.
+    """
+
+    def __init__(self, tree: 'Tree'):
+        """Initialize the index.
+
+        Args:
+            tree: Tree service providing the backend and classification
+        """
+        self.tree = tree
+        self.roots: list[IndexEntry] = []
+        self.by_key: dict[tuple, IndexEntry] = {}
+        self.focused: Optional[IndexEntry] = None
+        self.app_occurrences: list[int] = []
+        self.app_windows: list[int] = []
+        self.viewport: Optional[tuple[int, int, int, int]] = None
+        self.truncation: Optional[ScanTruncation] = None
+        self.ready = False
+        self.full_rebuilds = 0
+        self.subtree_rescans = 0
+        self.node_refreshes = 0
+
+    def build(
+        self,
+        roots: list[tuple[Any, str]],
+        app_windows: Optional[list[int]] = None,
+        viewport: Optional[tuple[int, int, int, int]] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> TreeState:
+        """Index the given app roots from scratch.
+
+        Args:
+            roots: (root, app_name) pairs from Tree._prepare_apps
+            app_windows: Native window handle of each root
+            viewport: Rectangle traversal is culled to, kept for later rescans
+            deadline: time.monotonic() value at which the walk stops
+            cancel: Token that stops the walk
+
+        Returns:
+            TreeState assembled from the new index
+
+        Raises:
+            ScanCancelled: If cancel was triggered; the index is then not ready
+        """
+        self.ready = False
+        self.focused = None
+        self.app_occurrences = app_occurrences([app_name for _, app_name in roots])
+        self.app_windows = list(app_windows or [])
+        self.viewport = viewport
+        by_path = self._walk(roots, None, deadline, cancel)
+
+        self.by_key = {}
+        self.roots = []
+        for path in sorted(by_path):
+            entry = by_path[path]
+            self._register(entry)
+            if len(path) == 1:
+                self.roots.append(entry)
+            else:
+                entry.parent = by_path[path[:-1]]
+                entry.parent.children.append(entry)
+
+        self.full_rebuilds += 1
+        self.ready = True
+        return self.to_state()
+
+    def apply(self, events: list[TreeEvent], cancel: Optional[CancelToken] = None) -> bool:
+        """Patch the index with a batch of events.
+
+        Args:
+            events: Events drained from the event source
+            cancel: Token that stops subtree rescans
+
+        Returns:
+            False if the events could not be applied and a full rebuild is needed
+
+        Raises:
+            ScanCancelled: If cancel was triggered during a rescan; the
+                index is then not ready
+        """
+        dirty: dict[tuple, IndexEntry] = {}
+        refresh: dict[tuple, IndexEntry] = {}
+
+        for event in events:
+            entry = self.by_key.get(event.runtime_id)
+            if event.kind == FOCUS_CHANGED:
+                # The previous focus holder may render differently now
+                if self.focused is not None:
+                    refresh[self.focused.key] = self.focused
+                self.focused = entry
+            if entry is None:
+                if event.kind == STRUCTURE_CHANGED:
+                    logger.debug(f"Structure change under unindexed element {event.runtime_id}")
+                    return False
+                continue
+            if event.kind == STRUCTURE_CHANGED or (event.kind == PROPERTY_CHANGED and not entry.expanded):
+                dirty[entry.key] = entry
+            else:
+                refresh[entry.key] = entry
+
+        # Drop subtrees contained in another dirty subtree
+        dirty_paths = {entry.path for entry in dirty.values()}
+        subtrees = [
+            entry for entry in dirty.values()
+            if not any(entry.path[:length] in dirty_paths for length in range(1, len(entry.path)))
+        ]
+        if len(subtrees) > INCREMENTAL_MAX_DIRTY_SUBTREES:
+            return False
+
+        deadline = self.tree._deadline()
+        try:
+            for entry in subtrees:
+                self._rescan(entry, deadline, cancel)
+        except ScanCancelled:
+            self.ready = False
+            raise
+        for entry in refresh.values():
+            if self.by_key.get(entry.key) is entry:
+                self._refresh(entry)
+        return True
+
+    def to_state(self) -> TreeState:
+        """Assemble a TreeState from the index in document order."""
+        lists = {'interactive': [], 'informative': [], 'scrollable': []}
+        stack = list(reversed(self.roots))
+        while stack:
+            entry = stack.pop()
+            if entry.element is not None:
+                lists[entry.kind].append(entry.element)
+            stack.extend(reversed(entry.children))
+        return TreeState(
+            interactive_nodes=lists['interactive'],
+            informative_nodes=lists['informative'],
+            scrollable_nodes=lists['scrollable'],
+            app_windows=self.app_windows,
+            truncation=self.truncation
+        )
+
+    def _walk(
+        self,
+        roots: list[tuple[Any, str]],
+        bases: Optional[list[tuple[tuple, int]]],
+        deadline: Optional[float],
+        cancel: Optional[CancelToken],
+        budget: Any = None
+    ) -> dict[tuple, IndexEntry]:
+        """Walk roots with Tree._get_nodes and return an unlinked entry per visited path."""
+        backend = self.tree.backend
+        by_path: dict[tuple, IndexEntry] = {}
+
+        def observe(node: Any, app_name: str, path: tuple, record: Optional[ElementRecord], element: Any, expanded: bool):
+            entry = IndexEntry(backend.get_runtime_id(node), node, app_name, path, expanded)
+            self._set_element(entry, record, element)
+            by_path[path] = entry
+
+        *_, truncation = self.tree._get_nodes(
+            roots, viewport=self.viewport, deadline=deadline, cancel=cancel,
+            observe=observe, bases=bases, budget=budget
+        )
+        if truncation is not None or bases is None:
+            self.truncation = truncation
+        return by_path
+
+    def _set_element(self, entry: IndexEntry, record: Optional[ElementRecord], element: Any):
+        entry.kind = record.kind if element is not None else None
+        entry.element = element
+        if record is not None and record.has_keyboard_focus:
+            self.focused = entry
+
+    def _classify(self, entry: IndexEntry):
+        """Read the entry's control and build its element."""
+        record = self.tree._read_element(entry.control)
+        element = self.tree._make_element(
+            record, entry.app_name, entry.path, self.app_occurrences[entry.path[0]]
+        ) if record is not None else None
+        self._set_element(entry, record, element)
+
+    def _register(self, entry: IndexEntry):
+        self.by_key[entry.key] = entry
+
+    def _unregister_subtree(self, entry: IndexEntry):
+        """Forget every descendant of entry (but not entry itself)."""
+        stack = list(entry.children)
+        while stack:
+            child = stack.pop()
+            if self.by_key.get(child.key) is child:
+                del self.by_key[child.key]
+            if self.focused is child:
+                self.focused = None
+            stack.extend(child.children)
+        entry.children = []
+
+    def _refresh(self, entry: IndexEntry):
+        """Re-read a single element from the live tree."""
+        entry.control = self.tree.backend.live_control(entry.control)
+        self._classify(entry)
+        self.node_refreshes += 1
+
+    def _rescan(self, entry: IndexEntry, deadline: Optional[float] = None, cancel: Optional[CancelToken] = None):
+        """Replace the subtree under entry with a fresh walk."""
+        tree = self.tree
+        self._unregister_subtree(entry)
+
+        control = tree._prefetch_root(tree.backend.live_control(entry.control))
+        # Depth limits count from the app window, not from this entry
+        depth = tree.budget.depth_for(entry.app_name, tree.walker.max_depth) - (len(entry.path) - 1)
+        budget = dataclasses.replace(tree.budget, max_depth=max(0, depth), app_max_depths={})
+        by_path = self._walk(
+            [(control, entry.app_name)], [(entry.path, self.app_occurrences[entry.path[0]])],
+            deadline, cancel, budget
+        )
+
+        fresh = by_path.pop(entry.path, None)
+        if fresh is not None:
+            entry.control, entry.kind, entry.element, entry.expanded = \
+                fresh.control, fresh.kind, fresh.element, fresh.expanded
+            if self.focused is fresh:
+                self.focused = entry
+        by_path[entry.path] = entry
+        for path in sorted(by_path):
+            if path == entry.path:
+                continue
+            child = by_path[path]
+            child.parent = by_path[path[:-1]]
+            child.parent.children.append(child)
+            self._register(child)
+
+        self.subtree_rescans += 1
@@ -0,0 +1,91 @@
+"""Pagination of interactive elements over a cached tree state."""
+
+import base64
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from windows_mcp.tree.config import STATE_MAX_PAGE_SIZE
+from windows_mcp.tree.views import ElementFilter, TreeState
+
+
+@dataclass
+class Page:
+    """One page of interactive element labels."""
+    labels: list[int]
+    offset: int
+    limit: int
+    total: int
+
+    @property
+    def next_offset(self) -> Optional[int]:
+        """Offset of the following page, or None on the last page."""
+        end = self.offset + self.limit
+        return end if end < self.total else None
+
+
+def paginate(
+    state: TreeState,
+    offset: int,
+    limit: int,
+    element_filter: Optional[ElementFilter] = None
+) -> Page:
+    """Select one page of interactive labels matching a filter.
+
+    Args:
+        state: Tree state the labels refer to
+        offset: Number of matching elements to skip
+        limit: Maximum number of elements on the page
+        element_filter: Criteria the elements must match
+
+    Returns:
+        Page whose labels index the full interactive list
+    """
+    limit = max(1, min(limit, STATE_MAX_PAGE_SIZE))
+    offset = max(0, offset)
+    matching = state.filter_interactive(element_filter)
+    return Page(labels=matching[offset:offset + limit], offset=offset, limit=limit, total=len(matching))
+
+
+def encode_cursor(version: int, offset: int, limit: int, element_filter: ElementFilter) -> str:
+    """Encode the position of the next page as an opaque cursor.
+
+    Args:
+        version: StateCache version of the snapshot being paged
+        offset: Offset of the next page
+        limit: Page size
+        element_filter: Filter applied to every page
+    """
+    payload = {
+        "v": version,
+        "o": offset,
+        "l": limit,
+        "a": element_filter.app_name,
+        "t": element_filter.control_type,
+        "r": list(element_filter.region) if element_filter.region is not None else None
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[int, int, int, ElementFilter]:
+    """Decode a cursor produced by encode_cursor.
+
+    Returns:
+        (version, offset, limit, element_filter)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        region = payload.get("r")
+        element_filter = ElementFilter(
+            app_name=payload.get("a"),
+            control_type=payload.get("t"),
+            region=tuple(int(v) for v in region) if region is not None else None
+        )
+        return int(payload["v"]), int(payload["o"]), int(payload["l"]), element_filter
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
@@ -0,0 +1,72 @@
+"""Long-lived worker pool for tree traversal."""
+
+import contextlib
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+from windows_mcp.tree.config import TRAVERSAL_POOL_SIZE
+
+logger = logging.getLogger('windows-mcp.tree')
+
+
+class TraversalPool:
+    """Thread pool reused across scans, with a per-thread initializer hook.
+
+    Threads are started lazily and then kept for the lifetime of the pool,
+    so thread start-up and per-thread setup such as COM initialization are
+    paid once per thread instead of once per scan.
+    """
+
+    def __init__(
+        self,
+        size: int = TRAVERSAL_POOL_SIZE,
+        initializer: Optional[Callable[[], None]] = None,
+        name: str = 'tree-pool'
+    ):
+        """Initialize the pool.
+
+        Args:
+            size: Maximum number of worker threads
+            initializer: Called once in every worker thread before it runs work
+            name: Thread name prefix
+        """
+        self.size = max(1, size)
+        self.initializer = initializer
+        self.initialized_threads = 0
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.size,
+            thread_name_prefix=name,
+            initializer=self._initialize_thread
+        )
+
+    def _initialize_thread(self):
+        """Run the per-thread hook and count initialized threads."""
+        with self._lock:
+            self.initialized_threads += 1
+        if self.initializer is not None:
+            try:
+                self.initializer()
+            except Exception as e:
+                logger.warning(f"Traversal thread initializer failed: {e}")
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads."""
+        self.executor.shutdown(wait=wait)
+
+
+@contextlib.contextmanager
+def pool_executor(pool: Optional[TraversalPool], max_workers: Optional[int] = None) -> Iterator[Executor]:
+    """Yield the pool's executor, or a throwaway one if no pool is given.
+
+    Args:
+        pool: Shared traversal pool, if any
+        max_workers: Worker count for the throwaway executor
+    """
+    if pool is not None:
+        yield pool.executor
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            yield executor
@@ -0,0 +1,151 @@
+"""Local snapshots of batched UI element properties.
+
+A backend fetches a whole subtree (or, for budgeted scans, one level) in
+one request and hands back ``ElementSnapshot`` objects; traversal then
+reads every property from memory instead of making a cross-process call
+per property per node.
+"""
+
+from typing import Any, Optional
+
+from windows_mcp.tree.backend import LegacyPatternState, Rect, ScrollPatternState, control_type_name
+from windows_mcp.tree.config import PREFETCH_PROPERTY_IDS
+
+
+class ElementSnapshot:
+    """Read-only copy of the traversal properties of one control.
+
+    Exposes the same attribute and method names as ``uiautomation.Control``
+    so it can be traversed exactly like a live control. ``subtree`` is True
+    when the snapshot's children were fetched along with it.
+    """
+
+    __slots__ = (
+        'Name', 'ClassName', 'ControlTypeName', 'LocalizedControlType',
+        'BoundingRectangle', 'IsOffscreen', 'IsControlElement', 'IsEnabled',
+        'IsKeyboardFocusable', 'HasKeyboardFocus', 'AcceleratorKey',
+        'ProcessId', 'NativeWindowHandle', 'RuntimeId', 'source', 'subtree',
+        '_scroll', '_legacy', '_children'
+    )
+
+    def __init__(
+        self,
+        name: str,
+        class_name: str,
+        control_type_name: str,
+        localized_control_type: str,
+        bounding_rectangle: Rect,
+        is_offscreen: bool,
+        is_control_element: bool,
+        is_enabled: bool,
+        is_keyboard_focusable: bool,
+        has_keyboard_focus: bool,
+        accelerator_key: str,
+        process_id: int,
+        native_window_handle: int,
+        scroll: Optional[ScrollPatternState],
+        legacy: LegacyPatternState,
+        runtime_id: tuple = (),
+        source: Any = None
+    ):
+        self.Name = name
+        self.ClassName = class_name
+        self.ControlTypeName = control_type_name
+        self.LocalizedControlType = localized_control_type
+        self.BoundingRectangle = bounding_rectangle
+        self.IsOffscreen = is_offscreen
+        self.IsControlElement = is_control_element
+        self.IsEnabled = is_enabled
+        self.IsKeyboardFocusable = is_keyboard_focusable
+        self.HasKeyboardFocus = has_keyboard_focus
+        self.AcceleratorKey = accelerator_key
+        self.ProcessId = process_id
+        self.NativeWindowHandle = native_window_handle
+        self.RuntimeId = runtime_id
+        self.source = source
+        self.subtree = False
+        self._scroll = scroll
+        self._legacy = legacy
+        self._children: list['ElementSnapshot'] = []
+
+    def GetChildren(self) -> list['ElementSnapshot']:
+        return self._children
+
+    def GetScrollPattern(self) -> Optional[ScrollPatternState]:
+        return self._scroll
+
+    def GetLegacyIAccessiblePattern(self) -> LegacyPatternState:
+        return self._legacy
+
+
+def _snapshot_cached_one(element: Any) -> ElementSnapshot:
+    """Build a snapshot from the cached properties of a UIA element."""
+    def cached(name: str) -> Any:
+        return element.GetCachedPropertyValue(PREFETCH_PROPERTY_IDS[name])
+
+    rect = element.CachedBoundingRectangle
+    scroll = None
+    if cached('IsScrollPatternAvailable'):
+        scroll = ScrollPatternState(
+            horizontal=bool(cached('HorizontallyScrollable')),
+            vertical=bool(cached('VerticallyScrollable')),
+            horizontal_percent=cached('HorizontalScrollPercent'),
+            vertical_percent=cached('VerticalScrollPercent')
+        )
+
+    return ElementSnapshot(
+        name=cached('Name') or "",
+        class_name=cached('ClassName') or "",
+        control_type_name=control_type_name(cached('ControlType')) or "Control",
+        localized_control_type=cached('LocalizedControlType') or "",
+        bounding_rectangle=Rect(rect.left, rect.top, rect.right, rect.bottom),
+        is_offscreen=bool(cached('IsOffscreen')),
+        is_control_element=bool(cached('IsControlElement')),
+        is_enabled=bool(cached('IsEnabled')),
+        is_keyboard_focusable=bool(cached('IsKeyboardFocusable')),
+        has_keyboard_focus=bool(cached('HasKeyboardFocus')),
+        accelerator_key=cached('AcceleratorKey') or "",
+        process_id=cached('ProcessId') or 0,
+        native_window_handle=cached('NativeWindowHandle') or 0,
+        scroll=scroll,
+        legacy=LegacyPatternState(cached('LegacyIAccessibleValue') or ""),
+        runtime_id=tuple(cached('RuntimeId') or ()),
+        source=element
+    )
+
+
+def snapshot_cached_element(element: Any) -> ElementSnapshot:
+    """Snapshot a UIA element returned by ``BuildUpdatedCache``.
+
+    Args:
+        element: IUIAutomationElement built with a Subtree-scoped cache request
+
+    Returns:
+        Snapshot of the element with its whole cached subtree
+    """
+    root = _snapshot_cached_one(element)
+    stack = [(element, root)]
+    while stack:
+        current, snapshot = stack.pop()
+        snapshot.subtree = True
+        children = current.GetCachedChildren()
+        if not children:
+            continue
+        for index in range(children.Length):
+            child_element = children.GetElement(index)
+            child = _snapshot_cached_one(child_element)
+            snapshot._children.append(child)
+            stack.append((child_element, child))
+    return root
+
+
+def snapshot_cached_children(element: Any) -> list[ElementSnapshot]:
+    """Snapshot the children of a UIA element built with a Children-scoped cache request.
+
+    The snapshots have no children of their own; their ``source`` element
+    is used to fetch the next level.
+    """
+    children = element.GetCachedChildren()
+    if not children:
+        return []
+    return [_snapshot_cached_one(children.GetElement(index)) for index in range(children.Length)]
@@ -3,17 +3,17 @@
 import random
 import logging
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import TYPE_CHECKING, Optional
+from concurrent.futures import as_completed
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
 
 try:
     import uiautomation as ua
-    from uiautomation import Control, GetRootControl, ScrollPattern
+    from uiautomation import Control
     UIAUTOMATION_AVAILABLE = True
 except ImportError:
     UIAUTOMATION_AVAILABLE = False
+    Control = object
     print("Warning: uiautomation not available. State tool will have limited functionality.")
 
 from windows_mcp.tree.config import (
@@ -22,16 +22,45 @@ from windows_mcp.tree.config import (
     DEFAULT_ACTIONS,
     MIN_ELEMENT_AREA,
     THREAD_MAX_RETRIES,
+    PREFETCH_SUBTREES,
+    PREFETCH_BUDGETED_MAX_NODES,
+    CULL_OFFSCREEN_SUBTREES,
+    CULL_EXEMPT_CONTROL_TYPE_NAMES,
+    RESOLVE_SIBLING_SCAN,
+    RESOLVE_MAX_SHIFT,
+    RESOLVE_MAX_REQUESTS,
+    SCAN_MAX_NODES,
+    SCAN_TIME_LIMIT,
+    APP_MAX_DEPTHS,
+    COMPACT_TREE_STATE,
+    INCREMENTAL_SETTLE_TIME,
     ANNOTATION_FONT_SIZE,
     ANNOTATION_PADDING
 )
+from windows_mcp.screen.encoding import ImageEncoder
+from windows_mcp.screen.frames import FrameCache
+from windows_mcp.screen.spool import ScreenshotSpool
+from windows_mcp.tree.backend import TreeBackend, UIAutomationBackend
+from windows_mcp.tree.cache import StateCache
+from windows_mcp.tree.cancel import CancelToken, ScanCancelled
+from windows_mcp.tree.columnar import compact_state
+from windows_mcp.tree.events import EventSource
+from windows_mcp.tree.identity import app_occurrences, element_fingerprint
+from windows_mcp.tree.incremental import IncrementalIndex
+from windows_mcp.tree.pool import TraversalPool, pool_executor
+from windows_mcp.tree.walker import TreeWalker
 from windows_mcp.tree.views import (
     TreeState,
     TreeElementNode,
     TextElementNode,
     ScrollElementNode,
     BoundingBox,
-    Center
+    Center,
+    ElementRecord,
+    ScanBudget,
+    ScanScope,
+    ScanTruncation,
+    rect_intersects
 )
 
 if TYPE_CHECKING:
@@ -44,43 +73,118 @@ logger = logging.getLogger('windows-mcp.tree')
 class Tree:
     """Handles UI tree traversal and element detection."""
 
-    def __init__(self, desktop: 'Desktop'):
+    def __init__(
+        self,
+        desktop: Optional['Desktop'] = None,
+        backend: Optional[TreeBackend] = None,
+        prefetch: bool = PREFETCH_SUBTREES,
+        pool: Optional[TraversalPool] = None,
+        event_source: Optional[EventSource] = None,
+        cache: Optional[StateCache] = None,
+        cull: bool = CULL_OFFSCREEN_SUBTREES,
+        budget: Optional[ScanBudget] = None,
+        encoder: Optional[ImageEncoder] = None,
+        frames: Optional[FrameCache] = None,
+        spool: Optional[ScreenshotSpool] = None
+    ):
         """Initialize the tree service.
 
         Args:
             desktop: Desktop service instance
+            backend: Source of the control tree (defaults to the live desktop)
+            prefetch: Batch property reads: one request per app subtree, or
+                per container level for large apps in budgeted scans
+            pool: Long-lived traversal pool shared across scans
+            event_source: Change events to refresh incrementally from; without
+                one every refresh is a full rescan
+            cache: Cache holding the latest state (a private one by default)
+            cull: Skip the children of containers outside the screen
+            budget: Node, depth and time limits per scan (SCAN_MAX_NODES,
+                SCAN_TIME_LIMIT and APP_MAX_DEPTHS by default)
+            encoder: Encoder for annotated screenshots (a private one by default)
+            frames: Cache reusing annotated screenshots of unchanged screens;
+                None disables it
+            spool: Directory annotated screenshots are saved to (a private
+                one in the default spool directory by default)
         """
         self.desktop = desktop
-        self.screen_size = self.desktop.get_screen_size()
-        self._element_cache = {}  # Cache for faster lookups
-        self._last_scan_time = 0
-
-    def get_state(self, force_refresh: bool = False) -> TreeState:
+        self.backend = backend or UIAutomationBackend(desktop)
+        self.prefetch = prefetch
+        self.cull = cull
+        self.budget = budget or ScanBudget(
+            max_nodes=SCAN_MAX_NODES, app_max_depths=APP_MAX_DEPTHS, time_limit=SCAN_TIME_LIMIT
+        )
+        self.pool = pool
+        self.walker = TreeWalker(self.backend, pool=pool)
+        self.event_source = event_source
+        self._index = IncrementalIndex(self) if event_source is not None else None
+        # Nodes visited per app window (by handle) in the last complete walk of it
+        self._app_sizes: dict[int, int] = {}
+        self.screen_size = self.backend.get_screen_size()
+        self.cache = cache or StateCache()
+        self.encoder = encoder or ImageEncoder()
+        self.frames = frames
+        self.spool = spool or ScreenshotSpool()
+
+    def get_state(
+        self,
+        force_refresh: bool = False,
+        scope: Optional[ScanScope] = None,
+        cancel: Optional[CancelToken] = None
+    ) -> TreeState:
         """Get the current UI tree state with caching.
 
         Args:
             force_refresh: Force a full rescan even if cache is valid
+            scope: Restrict the scan to one window, process, app or region
+            cancel: Token another thread can use to stop the scan
 
         Returns:
             TreeState object containing interactive, informative, and scrollable elements
+
+        Raises:
+            ScanCancelled: If cancel was triggered before the scan finished;
+                nothing is cached in that case
         """
-        if not UIAUTOMATION_AVAILABLE:
-            logger.warning("UIAutomation not available, returning empty state")
+        if not self.backend.is_available():
+            logger.warning(f"Tree backend '{self.backend.name}' not available, returning empty state")
             return TreeState()
 
-        try:
-            import time
-            current_time = time.time()
+        if scope is not None and scope.is_empty():
+            scope = None
 
-            # Use cache if less than 2 seconds old and not forced
-            if not force_refresh and (current_time - self._last_scan_time) < 2.0:
-                logger.debug("Using cached tree state")
-                return self._cached_state if hasattr(self, '_cached_state') else self._scan_tree()
-
-            logger.info("Scanning UI tree...")
-            state = self._scan_tree()
-            self._cached_state = state
-            self._last_scan_time = current_time
+        try:
+            # Incremental mode: the index is kept current by change events, so it is
+            # served regardless of TTL. After an input action invalidated the cache,
+            # the UI gets a moment to report its changes before they are applied.
+            if self._index is not None and self._index.ready and scope is None and not force_refresh:
+                valid = self.cache.is_valid() and self.cache.key is None
+                events = self.event_source.drain(0.0 if valid else INCREMENTAL_SETTLE_TIME)
+                if not events and valid:
+                    logger.debug("Using cached tree state, no UI changes reported")
+                    return self.cache.peek()
+                if self._index.apply(events, cancel):
+                    if events:
+                        logger.debug(f"Applied {len(events)} UI change events")
+                    state = self._index.to_state()
+                    state = compact_state(state) if COMPACT_TREE_STATE else state
+                    self.cache.put(state)
+                    return state
+                force_refresh = True
+
+            if not force_refresh:
+                cached = self.cache.get(scope)
+                if cached is not None:
+                    logger.debug("Using cached tree state")
+                    return cached
+
+            if scope is not None:
+                logger.info(f"Scanning UI tree within {scope}...")
+                state = self._scan_scope(scope, cancel)
+            else:
+                logger.info("Scanning UI tree...")
+                state = self._scan_tree(cancel)
+            self.cache.put(state, scope)
 
             logger.info(
                 f"Tree scan complete: {len(state.interactive_nodes)} interactive, "
@@ -90,31 +194,287 @@ class Tree:
 
             return state
 
+        except ScanCancelled:
+            logger.info("Tree scan cancelled")
+            raise
         except Exception as e:
             logger.error(f"Error getting tree state: {e}", exc_info=True)
             return TreeState()
 
-    def _scan_tree(self) -> TreeState:
+    def close(self):
+        """Stop listening for change events."""
+        if self.event_source is not None:
+            self.event_source.stop()
+
+    def refresh_element(self, state: TreeState, label: int) -> Optional[TreeElementNode]:
+        """Re-read one interactive element from the live tree by its walk path.
+
+        Starts at the element's app window and follows the recorded child
+        indices, so the cost is one children request per level plus the
+        element's own property reads. The element is matched by the UIA
+        runtime id recorded at scan time. Inserts and removals shift
+        indices, so the nearest siblings are tried at the last level, and if
+        the element is not there, paths with ancestor indices shifted by up
+        to RESOLVE_MAX_SHIFT in total are tried, within RESOLVE_MAX_REQUESTS
+        children requests. Elements scanned without a runtime id only follow
+        the recorded ancestors and are matched by name and type, taking the
+        same occurrence among same-named siblings as in the snapshot.
+
+        Args:
+            state: Snapshot the label refers to
+            label: Interactive element label
+
+        Returns:
+            Element with current bounds and the original fingerprint, or
+            None if it could not be found or is no longer interactive
+        """
+        element = state.interactive_nodes[label]
+        path = element.path
+        if len(path) < 2 or path[0] >= len(state.app_windows):
+            return None
+
+        try:
+            node = self.backend.control_from_handle(state.app_windows[path[0]])
+            if node is None:
+                return None
+            runtime_id = element.runtime_id
+            if runtime_id:
+                match = self._search_by_runtime_id(node, path[1:], runtime_id)
+            else:
+                match = None
+                for index in path[1:-1]:
+                    children = self.backend.get_children(node)
+                    if index >= len(children):
+                        return None
+                    node = children[index]
+                children = self.backend.get_children(node)
+                found = self._find_by_occurrence(children, element, self._sibling_occurrence(state, label))
+                if found is not None:
+                    match = path[1:-1] + (found[0],), found[1]
+            if match is None:
+                return None
+            relative_path, record = match
+            fresh = self._make_element(record, element.app_name, path[:1] + relative_path)
+            if (fresh.name, fresh.control_type) != (element.name, element.control_type):
+                return None
+            fresh.fingerprint = element.fingerprint
+            return fresh
+        except Exception as e:
+            logger.debug(f"Could not re-resolve element {label}: {e}")
+        return None
+
+    def _search_by_runtime_id(
+        self, window: Control, relative_path: tuple, runtime_id: tuple
+    ) -> Optional[tuple[tuple, ElementRecord]]:
+        """Find a control by runtime id near its recorded path below an app window.
+
+        Args:
+            window: Live app window the path starts at
+            relative_path: Recorded child indices from the window to the control
+            runtime_id: Runtime id the control had when it was scanned
+
+        Returns:
+            (current child indices, record) of the control, or None
+        """
+        ancestors, index = relative_path[:-1], relative_path[-1]
+        # Children lists by child-index path below the window, each fetched once
+        children = {(): self.backend.get_children(window)}
+        for offsets in _shifts(len(ancestors), RESOLVE_MAX_SHIFT):
+            key = ()
+            for recorded, offset in zip(ancestors, offsets):
+                siblings = children[key]
+                if not 0 <= recorded + offset < len(siblings):
+                    break
+                key += (recorded + offset,)
+                if key not in children:
+                    if len(children) >= RESOLVE_MAX_REQUESTS:
+                        return None
+                    try:
+                        children[key] = self.backend.get_children(siblings[key[-1]])
+                    except Exception:
+                        children[key] = []
+            else:
+                match = self._find_by_runtime_id(children[key], index, runtime_id)
+                if match is not None:
+                    return key + (match[0],), match[1]
+        return None
+
+    @staticmethod
+    def _nearest(index: int, count: int) -> list[int]:
+        """Child indices nearest to index first, at most RESOLVE_SIBLING_SCAN of them."""
+        return sorted(range(count), key=lambda i: abs(i - index))[:RESOLVE_SIBLING_SCAN]
+
+    def _find_by_runtime_id(self, children: list, index: int, runtime_id: tuple) -> Optional[tuple[int, ElementRecord]]:
+        """Find the child with this runtime id among the siblings nearest index."""
+        for candidate in self._nearest(index, len(children)):
+            try:
+                if tuple(self.backend.get_runtime_id(children[candidate])) != tuple(runtime_id):
+                    continue
+            except Exception:
+                continue
+            record = self._read_element(children[candidate])
+            if record is None or record.kind != 'interactive':
+                return None
+            return candidate, record
+        return None
+
+    def _find_by_occurrence(self, children: list, element: Any, occurrence: int) -> Optional[tuple[int, ElementRecord]]:
+        """Find the occurrence-th interactive child sharing the element's name and type."""
+        seen = 0
+        for candidate, child in enumerate(children):
+            record = self._read_element(child)
+            if record is None or record.kind != 'interactive':
+                continue
+            fresh = self._make_element(record, element.app_name)
+            if (fresh.name, fresh.control_type) != (element.name, element.control_type):
+                continue
+            if seen == occurrence:
+                return candidate, record
+            seen += 1
+        return None
+
+    @staticmethod
+    def _sibling_occurrence(state: TreeState, label: int) -> int:
+        """Count the interactive siblings before an element that share its name and type."""
+        element = state.interactive_nodes[label]
+        parent, index = element.path[:-1], element.path[-1]
+        occurrence = 0
+        for other in state.interactive_nodes:
+            other_path = other.path
+            if other_path[:-1] == parent and other_path[-1] < index \
+                    and (other.name, other.control_type) == (element.name, element.control_type):
+                occurrence += 1
+        return occurrence
+
+    def _scan_tree(self, cancel: Optional[CancelToken] = None) -> TreeState:
         """Perform a full tree scan."""
-        root = GetRootControl()
-        interactive_nodes, informative_nodes, scrollable_nodes = self._get_appwise_nodes(root)
+        deadline = self._deadline()
+        root = self.backend.get_root_control()
+        if self._index is not None:
+            # Start listening before the walk so no change is missed
+            self.event_source.start(root)
+            self.event_source.drain()
+
+        roots = self._prepare_apps(self._select_apps(root))
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        viewport = self._viewport(root)
+        if self._index is not None:
+            state = self._index.build(roots, self._app_windows(roots), viewport, deadline, cancel)
+        else:
+            interactive_nodes, informative_nodes, scrollable_nodes, truncation = self._get_nodes(
+                roots, viewport=viewport, deadline=deadline, cancel=cancel
+            )
+            state = TreeState(
+                interactive_nodes=interactive_nodes,
+                informative_nodes=informative_nodes,
+                scrollable_nodes=scrollable_nodes,
+                app_windows=self._app_windows(roots),
+                truncation=truncation
+            )
+        # Compaction copies the elements, so the incremental index keeps its own objects
+        return compact_state(state) if COMPACT_TREE_STATE else state
+
+    def _scan_scope(self, scope: ScanScope, cancel: Optional[CancelToken] = None) -> TreeState:
+        """Scan only the windows and region selected by a scope."""
+        deadline = self._deadline()
+        roots = self._prepare_apps(self._select_scoped_apps(scope))
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        viewport = self._viewport(self.backend.get_root_control() if self.cull else None, scope)
+        interactive_nodes, informative_nodes, scrollable_nodes, truncation = self._get_nodes(
+            roots, scope, viewport, deadline, cancel
+        )
 
-        return TreeState(
+        state = TreeState(
             interactive_nodes=interactive_nodes,
             informative_nodes=informative_nodes,
-            scrollable_nodes=scrollable_nodes
+            scrollable_nodes=scrollable_nodes,
+            app_windows=self._app_windows(roots),
+            truncation=truncation
         )
+        return compact_state(state) if COMPACT_TREE_STATE else state
+
+    def _select_scoped_apps(self, scope: ScanScope) -> list[Control]:
+        """Pick the top-level windows matching a scope.
 
-    def _get_appwise_nodes(
-        self, node: Control
-    ) -> tuple[list[TreeElementNode], list[TextElementNode], list[ScrollElementNode]]:
-        """Get nodes organized by application.
+        A window handle is opened directly, without enumerating the
+        desktop; otherwise every visible top-level window is checked, and
+        shell windows such as the taskbar are only included if they match.
 
         Args:
-            node: Root control to start from
+            scope: Non-empty scan scope
 
         Returns:
-            Tuple of (interactive_nodes, informative_nodes, scrollable_nodes)
+            Application window controls in z-order
+        """
+        if scope.window_handle:
+            window = self.backend.control_from_handle(scope.window_handle)
+            candidates = [window] if window is not None else []
+        else:
+            candidates = self.backend.get_children(self.backend.get_root_control())
+
+        apps: list[Control] = []
+        for app in candidates:
+            try:
+                if scope.process_id is not None and app.ProcessId != scope.process_id:
+                    continue
+                if scope.app_name and scope.app_name.lower() not in app.Name.lower():
+                    continue
+                if not scope.intersects(app.BoundingRectangle):
+                    continue
+                if not scope.window_handle and not self.backend.is_app_visible(app):
+                    continue
+            except:
+                continue
+            apps.append(app)
+        return apps
+
+    def _viewport(self, root: Optional[Control], scope: Optional[ScanScope] = None) -> Optional[tuple[int, int, int, int]]:
+        """Return the rectangle traversal is culled to, or None to traverse everything.
+
+        This is the desktop root's bounds (all monitors) when culling is
+        enabled, intersected with the scope's region if it has one.
+        """
+        viewport = None
+        if self.cull and root is not None:
+            try:
+                rect = root.BoundingRectangle
+                viewport = (rect.left, rect.top, rect.right, rect.bottom)
+            except:
+                viewport = (0, 0, self.screen_size.width, self.screen_size.height)
+        if scope is not None and scope.region is not None:
+            if viewport is None:
+                return scope.region
+            left, top, right, bottom = scope.region
+            viewport = (max(left, viewport[0]), max(top, viewport[1]),
+                        min(right, viewport[2]), min(bottom, viewport[3]))
+        return viewport
+
+    def _deadline(self) -> Optional[float]:
+        """Return the time.monotonic() value a scan starting now must stop at."""
+        if self.budget.time_limit is None:
+            return None
+        return time.monotonic() + self.budget.time_limit
+
+    def _app_windows(self, roots: list[tuple[Control, str]]) -> list[int]:
+        """Read the native window handle of each app root, 0 if unavailable."""
+        handles = []
+        for root, _ in roots:
+            try:
+                handles.append(root.NativeWindowHandle or 0)
+            except:
+                handles.append(0)
+        return handles
+
+    def _select_apps(self, node: Control) -> list[Control]:
+        """Pick the app windows to scan: shell windows plus the foreground app.
+
+        Args:
+            node: Desktop root control
+
+        Returns:
+            Application window controls in z-order
         """
         from windows_mcp.desktop.config import EXCLUDED_APPS, AVOIDED_APPS
 
@@ -122,21 +482,31 @@ class Tree:
         found_foreground_app = False
 
         # Get all application windows
-        for app in node.GetChildren():
+        for app in self.backend.get_children(node):
             if app.ClassName in EXCLUDED_APPS:
                 apps.append(app)
-            elif app.ClassName not in AVOIDED_APPS and self.desktop.is_app_visible(app):
+            elif app.ClassName not in AVOIDED_APPS and self.backend.is_app_visible(app):
                 if not found_foreground_app:
                     apps.append(app)
                     found_foreground_app = True
 
-        interactive_nodes, informative_nodes, scrollable_nodes = [], [], []
+        return apps
+
+    def _prepare_apps(self, apps: list[Control]) -> list[tuple[Control, str]]:
+        """Prepare app windows for traversal in parallel, with retries.
 
-        # Process apps in parallel with retries
-        with ThreadPoolExecutor() as executor:
+        Args:
+            apps: Top-level application windows to scan
+
+        Returns:
+            (root, app_name) pairs in the order of apps
+        """
+        prepared = {}
+
+        with pool_executor(self.pool) as executor:
             retry_counts = {app: 0 for app in apps}
             future_to_app = {
-                executor.submit(self._get_nodes, app, self.desktop.is_app_browser(app)): app
+                executor.submit(self._prepare_app, app, self.backend.is_app_browser(app)): app
                 for app in apps
             }
 
@@ -144,37 +514,32 @@ class Tree:
                 for future in as_completed(list(future_to_app)):
                     app = future_to_app.pop(future)
                     try:
-                        result = future.result()
-                        if result:
-                            i_nodes, t_nodes, s_nodes = result
-                            interactive_nodes.extend(i_nodes)
-                            informative_nodes.extend(t_nodes)
-                            scrollable_nodes.extend(s_nodes)
+                        prepared[app] = future.result()
                     except Exception as e:
                         retry_counts[app] += 1
                         if retry_counts[app] < THREAD_MAX_RETRIES:
                             new_future = executor.submit(
-                                self._get_nodes, app, self.desktop.is_app_browser(app)
+                                self._prepare_app, app, self.backend.is_app_browser(app)
                             )
                             future_to_app[new_future] = app
 
-        return interactive_nodes, informative_nodes, scrollable_nodes
+        return [prepared[app] for app in apps if app in prepared]
 
-    def _get_nodes(
-        self, node: Control, is_browser: bool = False
-    ) -> tuple[list[TreeElementNode], list[TextElementNode], list[ScrollElementNode]]:
-        """Extract nodes from a UI element tree.
+    def _prepare_app(self, node: Control, is_browser: bool = False) -> tuple[Control, str]:
+        """Prefetch an app window's subtree and resolve its display name.
+
+        A subtree request cannot be stopped by the scan budget, so budgeted
+        scans only use it for apps known to be small, and _get_nodes
+        prefetches the others one level per request.
 
         Args:
-            node: Control to extract nodes from
+            node: Application window control
             is_browser: Whether this is a browser application
 
         Returns:
-            Tuple of (interactive_nodes, informative_nodes, scrollable_nodes)
+            (root, app_name) where root is a snapshot if prefetch succeeded
         """
-        interactive_nodes = []
-        informative_nodes = []
-        scrollable_nodes = []
+        node = self._prefetch_root(node)
 
         app_name = node.Name.strip() or "Unknown"
 
@@ -185,135 +550,293 @@ class Tree:
             "Shell_SecondaryTrayWnd": "Taskbar",
             "Microsoft.UI.Content.PopupWindowSiteBridge": "Context Menu"
         }
-        app_name = class_name_map.get(node.ClassName, app_name)
-
-        def tree_traversal(current_node: Control, depth: int = 0):
-            """Recursively traverse the UI tree."""
-            if depth > 20:  # Prevent infinite recursion
-                return
-
-            # Check if element is scrollable
-            if self._is_element_scrollable(current_node):
-                scroll_pattern = current_node.GetScrollPattern()
-                box = current_node.BoundingRectangle
-                if not box.isempty():
-                    x, y = box.xcenter(), box.ycenter()
-                    scrollable_nodes.append(ScrollElementNode(
-                        name=current_node.Name.strip() or current_node.LocalizedControlType or "Scrollable",
-                        app_name=app_name,
-                        control_type=current_node.LocalizedControlType or "Unknown",
-                        bounding_box=BoundingBox(
-                            left=box.left, top=box.top,
-                            right=box.right, bottom=box.bottom,
-                            width=box.width(), height=box.height()
-                        ),
-                        center=Center(x=x, y=y),
-                        horizontal_scrollable=scroll_pattern.HorizontallyScrollable,
-                        horizontal_scroll_percent=scroll_pattern.HorizontalScrollPercent
-                            if scroll_pattern.HorizontallyScrollable else 0,
-                        vertical_scrollable=scroll_pattern.VerticallyScrollable,
-                        vertical_scroll_percent=scroll_pattern.VerticalScrollPercent
-                            if scroll_pattern.VerticallyScrollable else 0,
-                        is_focused=current_node.HasKeyboardFocus
-                    ))
-
-            # Check if element is interactive
-            elif self._is_element_interactive(current_node):
-                legacy_pattern = current_node.GetLegacyIAccessiblePattern()
-                value = ""
+        return node, class_name_map.get(node.ClassName, app_name)
+
+    def _prefetch_root(self, node: Control) -> Control:
+        """Snapshot a subtree in one request if prefetching and the budget allows it.
+
+        Under a node or time budget, only apps whose last complete walk
+        visited at most PREFETCH_BUDGETED_MAX_NODES nodes (and fewer than
+        the node budget) are fetched whole, since the request cannot be
+        stopped once sent.
+        """
+        if not self.prefetch:
+            return node
+        if self.budget.is_bounded():
+            try:
+                size = self._app_sizes.get(node.NativeWindowHandle)
+            except Exception:
+                size = None
+            limit = PREFETCH_BUDGETED_MAX_NODES
+            if self.budget.max_nodes is not None:
+                limit = min(limit, self.budget.max_nodes)
+            if size is None or size > limit:
+                return node
+        return self.backend.fetch_subtree(node)
+
+    def _fetch_children(self, node: Control) -> list:
+        """List children from memory inside a fetched subtree, else with one request per level."""
+        if getattr(node, 'subtree', False):
+            return node.GetChildren()
+        return self.backend.fetch_children(node)
+
+    def _get_nodes(
+        self,
+        roots: list[tuple[Control, str]],
+        scope: Optional[ScanScope] = None,
+        viewport: Optional[tuple[int, int, int, int]] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+        observe: Optional[Callable[[Control, str, tuple, Optional[ElementRecord], Any, bool], None]] = None,
+        bases: Optional[list[tuple[tuple, int]]] = None,
+        budget: Optional[ScanBudget] = None
+    ) -> tuple[list[TreeElementNode], list[TextElementNode], list[ScrollElementNode], Optional[ScanTruncation]]:
+        """Extract nodes from app subtrees.
+
+        Args:
+            roots: (root, app_name) pairs from _prepare_apps
+            scope: If it has a region, only elements inside it are reported
+            viewport: Nodes whose bounds lie outside this rectangle are
+                skipped along with their subtrees, except for
+                CULL_EXEMPT_CONTROL_TYPE_NAMES
+            deadline: time.monotonic() value at which the walk stops
+            cancel: Token that stops the walk; ScanCancelled is raised then
+            observe: Called as observe(node, app_name, path, record, element,
+                expanded) for every visited node, including culled ones
+                (expanded False) and ones that produce no element
+            bases: For roots that are not app windows, the (path, app
+                occurrence) of each root, so paths and fingerprints match a
+                walk from the app window
+            budget: Limits overriding the service's budget
+
+        Returns:
+            Tuple of (interactive_nodes, informative_nodes, scrollable_nodes,
+            truncation); the node lists are in document order and truncation
+            is None unless the scan budget cut the walk short
+        """
+        collected = []
+        occurrences = app_occurrences([app_name for _, app_name in roots])
+        # Nodes visited per root, and roots with culled subtrees
+        visits = [0] * len(roots)
+        culled = set()
+
+        region_scoped = scope is not None and scope.region is not None
+
+        def visit(node: Control, app_name: str, path: tuple):
+            root_index = path[0]
+            visits[root_index] += 1
+            if bases is not None:
+                base_path, app_occurrence = bases[path[0]]
+                path = base_path + path[1:]
+            else:
+                app_occurrence = occurrences[path[0]]
+            rect = None
+            if viewport is not None:
                 try:
-                    value = legacy_pattern.Value.strip() if legacy_pattern.Value else ""
+                    rect = node.BoundingRectangle
+                    # Empty containers can still hold visible children
+                    if not rect.isempty() and not rect_intersects(rect, viewport) \
+                            and node.ControlTypeName not in CULL_EXEMPT_CONTROL_TYPE_NAMES:
+                        # The size of the culled subtree is unknown
+                        culled.add(root_index)
+                        if observe is not None:
+                            observe(node, app_name, path, None, None, False)
+                        return False
                 except:
-                    pass
+                    rect = None
+            record = self._read_element(node, rect=rect)
+            element = None
+            if record is not None and (not region_scoped or scope.intersects(record.rect)):
+                element = self._make_element(record, app_name, path, app_occurrence)
+                if element is not None:
+                    collected.append((path, record.kind, element))
+            if observe is not None:
+                observe(node, app_name, path, record, element, True)
+
+        # Prefetched snapshots are already in memory; threads would only add overhead
+        in_memory = all(getattr(root, 'subtree', False) for root, _ in roots)
+        # Budgeted scans prefetch large apps level by level, so the budget bounds the requests
+        per_level = self.prefetch and not in_memory and (budget or self.budget).is_bounded()
+        truncation = self.walker.walk(
+            roots, visit, workers=1 if in_memory else None, budget=budget or self.budget, deadline=deadline, cancel=cancel,
+            children=self._fetch_children if per_level else None
+        )
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        if bases is None and scope is None:
+            self._record_app_sizes(roots, visits, culled, truncation)
+        collected.sort(key=lambda item: item[0])
 
-                box = current_node.BoundingRectangle
-                if not box.isempty():
-                    x, y = box.xcenter(), box.ycenter()
-                    interactive_nodes.append(TreeElementNode(
-                        name=current_node.Name.strip() or current_node.LocalizedControlType or "",
-                        control_type=current_node.LocalizedControlType or "Unknown",
-                        value=value,
-                        shortcut=current_node.AcceleratorKey or "",
-                        bounding_box=BoundingBox(
-                            left=box.left, top=box.top,
-                            right=box.right, bottom=box.bottom,
-                            width=box.width(), height=box.height()
-                        ),
-                        center=Center(x=x, y=y),
-                        app_name=app_name,
-                        is_enabled=current_node.IsEnabled,
-                        is_keyboard_focusable=current_node.IsKeyboardFocusable
-                    ))
-
-            # Check if element is informative
-            elif self._is_element_text(current_node):
-                informative_nodes.append(TextElementNode(
-                    name=current_node.Name.strip() or "",
-                    app_name=app_name,
-                    control_type=current_node.LocalizedControlType or "Text"
-                ))
-
-            # Recursively process children
+        interactive_nodes, informative_nodes, scrollable_nodes = [], [], []
+        lists = {
+            'interactive': interactive_nodes,
+            'informative': informative_nodes,
+            'scrollable': scrollable_nodes
+        }
+        for _, kind, element in collected:
+            lists[kind].append(element)
+        return interactive_nodes, informative_nodes, scrollable_nodes, truncation
+
+    def _record_app_sizes(
+        self, roots: list[tuple[Control, str]], visits: list[int], culled: set[int],
+        truncation: Optional[ScanTruncation]
+    ):
+        """Remember how many nodes each app window's walk visited, for _prefetch_root.
+
+        Apps with subtrees left unwalked by culling or the budget are left
+        out, since their full size is unknown.
+        """
+        cut = set(truncation.pending) | set(truncation.depth_limited) if truncation is not None else set()
+        sizes = {}
+        for index, ((root, app_name), count) in enumerate(zip(roots, visits)):
+            if index in culled or app_name in cut:
+                continue
             try:
-                for child in current_node.GetChildren():
-                    tree_traversal(child, depth + 1)
-            except:
-                pass
+                handle = root.NativeWindowHandle
+            except Exception:
+                continue
+            if handle:
+                sizes[handle] = count
+        self._app_sizes = sizes
+
+    def _read_element(
+        self, node: Control, threshold: int = MIN_ELEMENT_AREA, rect: Optional[Any] = None
+    ) -> Optional[ElementRecord]:
+        """Read and classify a control in a single pass.
+
+        Each property is read at most once, and only as far as needed to
+        rule the element in or out: scrollable elements win over
+        interactive ones, which win over informative ones.
 
-        tree_traversal(node)
-        return interactive_nodes, informative_nodes, scrollable_nodes
+        Args:
+            node: Control to classify
+            threshold: Minimum visible area in pixels
+            rect: The node's BoundingRectangle, if the caller already read it
 
-    def _is_element_visible(self, node: Control, threshold: int = MIN_ELEMENT_AREA) -> bool:
-        """Check if element is visible."""
+        Returns:
+            ElementRecord, or None if the element is not reported
+        """
         try:
-            box = node.BoundingRectangle
+            try:
+                scroll = node.GetScrollPattern()
+                scrollable = bool(scroll) and bool(
+                    scroll.VerticallyScrollable or scroll.HorizontallyScrollable
+                )
+            except:
+                scroll, scrollable = None, False
+
+            control_type_name = node.ControlTypeName
+            if scrollable:
+                kind = 'scrollable'
+            elif control_type_name in INTERACTIVE_CONTROL_TYPE_NAMES:
+                kind = 'interactive'
+            elif control_type_name in INFORMATIVE_CONTROL_TYPE_NAMES:
+                kind = 'informative'
+            else:
+                return None
+
+            record = ElementRecord(kind=kind, control_type_name=control_type_name, scroll=scroll)
+            record.rect = box = rect if rect is not None else node.BoundingRectangle
             if box.isempty():
-                return False
-            area = box.width() * box.height()
-            is_offscreen = not node.IsOffscreen or node.ControlTypeName in ['EditControl']
-            return area > threshold and is_offscreen and node.IsControlElement
+                return None
+
+            if kind == 'scrollable':
+                record.name = node.Name.strip()
+                record.localized_control_type = node.LocalizedControlType
+                record.has_keyboard_focus = node.HasKeyboardFocus
+                return record
+
+            # Visibility and enabled state
+            if box.width() * box.height() <= threshold:
+                return None
+            if control_type_name != 'EditControl' and node.IsOffscreen:
+                return None
+            if not node.IsControlElement or not node.IsEnabled:
+                return None
+
+            record.name = node.Name.strip()
+            if kind == 'informative' and not record.name:
+                return None
+            record.localized_control_type = node.LocalizedControlType
+
+            if kind == 'interactive':
+                record.accelerator_key = node.AcceleratorKey or ""
+                record.is_keyboard_focusable = node.IsKeyboardFocusable
+                try:
+                    record.runtime_id = tuple(self.backend.get_runtime_id(node))
+                except:
+                    pass
+                try:
+                    legacy_value = node.GetLegacyIAccessiblePattern().Value
+                    record.value = legacy_value.strip() if legacy_value else ""
+                except:
+                    pass
+            return record
         except:
-            return False
+            return None
 
-    def _is_element_enabled(self, node: Control) -> bool:
-        """Check if element is enabled."""
-        try:
-            return node.IsEnabled
-        except:
-            return False
+    def _make_element(
+        self, record: ElementRecord, app_name: str, path: tuple = (), app_occurrence: int = 0
+    ) -> TreeElementNode | TextElementNode | ScrollElementNode:
+        """Build the tree view element for a classified record.
 
-    def _is_element_interactive(self, node: Control) -> bool:
-        """Check if element is interactive."""
-        try:
-            if node.ControlTypeName in INTERACTIVE_CONTROL_TYPE_NAMES:
-                return (
-                    self._is_element_visible(node) and
-                    self._is_element_enabled(node)
-                )
-            return False
-        except:
-            return False
+        Args:
+            record: Record returned by _read_element
+            app_name: Friendly name of the owning application
+            path: Walk path of the control, starting with its app root index
+            app_occurrence: Index of the app window among windows with the same app name
 
-    def _is_element_text(self, node: Control) -> bool:
-        """Check if element is informative text."""
-        try:
-            if node.ControlTypeName in INFORMATIVE_CONTROL_TYPE_NAMES:
-                return (
-                    self._is_element_visible(node) and
-                    self._is_element_enabled(node) and
-                    bool(node.Name.strip())
-                )
-            return False
-        except:
-            return False
+        Returns:
+            ScrollElementNode, TreeElementNode or TextElementNode
+        """
+        if record.kind == 'informative':
+            return TextElementNode(
+                name=record.name,
+                app_name=app_name,
+                control_type=record.localized_control_type or "Text"
+            )
 
-    def _is_element_scrollable(self, node: Control) -> bool:
-        """Check if element is scrollable."""
-        try:
-            scroll_pattern: ScrollPattern = node.GetScrollPattern()
-            return scroll_pattern.VerticallyScrollable or scroll_pattern.HorizontallyScrollable
-        except:
-            return False
+        box = record.rect
+        bounding_box = BoundingBox(
+            left=box.left, top=box.top,
+            right=box.right, bottom=box.bottom,
+            width=box.width(), height=box.height()
+        )
+        center = Center(x=box.xcenter(), y=box.ycenter())
+        fingerprint = element_fingerprint(app_name, app_occurrence, record.control_type_name, record.name, path[1:])
+
+        if record.kind == 'scrollable':
+            scroll_pattern = record.scroll
+            return ScrollElementNode(
+                name=record.name or record.localized_control_type or "Scrollable",
+                app_name=app_name,
+                control_type=record.localized_control_type or "Unknown",
+                bounding_box=bounding_box,
+                center=center,
+                horizontal_scrollable=scroll_pattern.HorizontallyScrollable,
+                horizontal_scroll_percent=scroll_pattern.HorizontalScrollPercent
+                    if scroll_pattern.HorizontallyScrollable else 0,
+                vertical_scrollable=scroll_pattern.VerticallyScrollable,
+                vertical_scroll_percent=scroll_pattern.VerticalScrollPercent
+                    if scroll_pattern.VerticallyScrollable else 0,
+                is_focused=record.has_keyboard_focus,
+                fingerprint=fingerprint
+            )
+
+        return TreeElementNode(
+            name=record.name or record.localized_control_type or "",
+            control_type=record.localized_control_type or "Unknown",
+            value=record.value,
+            shortcut=record.accelerator_key,
+            bounding_box=bounding_box,
+            center=center,
+            app_name=app_name,
+            is_enabled=record.is_enabled,
+            is_keyboard_focusable=record.is_keyboard_focusable,
+            fingerprint=fingerprint,
+            path=path,
+            runtime_id=record.runtime_id
+        )
 
     def create_annotated_screenshot(
         self, nodes: list[TreeElementNode], scale: float = 0.4, save_to_file: bool = True
@@ -328,7 +851,19 @@ class Tree:
         Returns:
             (image_bytes, file_path) - bytes empty if saved to file
         """
-        screenshot = self.desktop.get_screenshot(scale=scale)
+        frame = self.desktop.grab_screen_raw()
+        key = None
+        if frame is not None and self.frames is not None:
+            # Same pixels, scale and boxes give the same picture (up to the random label colors)
+            boxes = tuple((n.bounding_box.left, n.bounding_box.top, n.bounding_box.right, n.bounding_box.bottom) for n in nodes)
+            key = ('annotated', self.frames.digest(frame[0]), scale, hash(boxes))
+            cached = self.frames.get(key)
+            if cached is not None and save_to_file and cached.path is not None:
+                return b'', cached.path
+            if cached is not None and not save_to_file and cached.data is not None:
+                return cached.data, None
+
+        screenshot = self.desktop.get_screenshot(scale=scale, frame=frame)
 
         # Add padding
         width = screenshot.width + (2 * ANNOTATION_PADDING)
@@ -384,19 +919,34 @@ class Tree:
             except:
                 pass
 
+        # JPEG with the fast profile: no optimize pass, 5-10x smaller than PNG
+        data = self.encoder.encode(padded_screenshot, 'JPEG', profile='fast', quality=85)
+
         # OPTIMIZED: Save to temp file (much faster!)
         if save_to_file:
-            import tempfile
-            import os
-            temp_dir = tempfile.gettempdir()
-            timestamp = int(time.time() * 1000)
-            file_path = os.path.join(temp_dir, f"windows_mcp_screenshot_{timestamp}.jpg")
-            # Use JPEG with quality 85 (5-10x smaller than PNG!)
-            padded_screenshot.save(file_path, format='JPEG', quality=85, optimize=True)
+            file_path = self.spool.write(data, "windows_mcp_screenshot", "jpg")
             logger.info(f"Screenshot saved to: {file_path}")
+            if key is not None:
+                self.frames.put(key, data, path=file_path)
             return b'', file_path
         else:
             # Fallback: return bytes (slower)
-            buffer = BytesIO()
-            padded_screenshot.save(buffer, format='JPEG', quality=85, optimize=True)
-            return buffer.getvalue(), None
+            if key is not None:
+                self.frames.put(key, data)
+            return data, None
+
+
+def _shifts(levels: int, limit: int):
+    """Yield offset tuples for levels, smallest total shift first, up to limit."""
+    for total in range(limit + 1):
+        yield from _shifts_totalling(levels, total)
+
+
+def _shifts_totalling(levels: int, total: int):
+    if levels == 0:
+        if total == 0:
+            yield ()
+        return
+    for first in sorted(range(-total, total + 1), key=abs):
+        for rest in _shifts_totalling(levels - 1, total - abs(first)):
+            yield (first,) + rest
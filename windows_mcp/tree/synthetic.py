@@ -0,0 +1,458 @@
+"""Synthetic in-memory control trees for profiling and benchmarking traversal.
+
+The controls built here mimic the ``uiautomation.Control`` surface used by
+the Tree service, so the whole scan pipeline can run on a headless machine.
+"""
+
+import itertools
+import random
+import time
+from collections import Counter
+from typing import Optional
+
+from windows_mcp.desktop.views import Size
+from windows_mcp.tree.backend import LegacyPatternState, Rect, ScrollPatternState, TreeBackend
+from windows_mcp.tree.prefetch import ElementSnapshot
+from windows_mcp.tree.views import (
+    BoundingBox,
+    Center,
+    ScrollElementNode,
+    TextElementNode,
+    TreeElementNode,
+    TreeState
+)
+
+# Relative weights of control types used when none are given
+DEFAULT_CONTROL_TYPE_MIX: dict[str, int] = {
+    'PaneControl': 4, 'GroupControl': 3, 'CustomControl': 2,
+    'TextControl': 5, 'ButtonControl': 3, 'ListItemControl': 2,
+    'HyperlinkControl': 2, 'EditControl': 1, 'ImageControl': 1,
+    'CheckBoxControl': 1, 'MenuItemControl': 1, 'ListControl': 1
+}
+
+# Control types that get a scroll pattern when selected as scrollable
+SCROLLABLE_CONTROL_TYPE_NAMES: set[str] = {
+    'PaneControl', 'ListControl', 'GroupControl', 'CustomControl', 'DocumentControl'
+}
+
+# Minimum height of a laid-out row, in pixels
+MIN_ROW_HEIGHT = 20
+
+# Source of unique runtime ids for synthetic controls
+_runtime_ids = itertools.count(1)
+
+
+class SyntheticControl:
+    """In-memory stand-in for ``uiautomation.Control``.
+
+    Every property read and pattern/children request is counted in a
+    counter shared by the whole tree, standing in for one cross-process
+    call on a live desktop.
+    """
+
+    __slots__ = (
+        '_name', '_class_name', '_control_type', '_rect', '_is_offscreen',
+        '_is_enabled', '_is_keyboard_focusable', '_has_keyboard_focus',
+        '_accelerator_key', '_process_id', '_handle', '_value', '_scroll',
+        '_children', '_parent', '_calls', '_runtime_id'
+    )
+
+    def __init__(
+        self,
+        control_type: str,
+        rect: Rect,
+        name: str = "",
+        class_name: str = "",
+        is_offscreen: bool = False,
+        is_enabled: bool = True,
+        value: str = "",
+        scroll: Optional[ScrollPatternState] = None,
+        process_id: int = 0,
+        handle: int = 0
+    ):
+        self._name = name
+        self._class_name = class_name
+        self._control_type = control_type
+        self._rect = rect
+        self._is_offscreen = is_offscreen
+        self._is_enabled = is_enabled
+        self._is_keyboard_focusable = control_type in ('EditControl', 'ButtonControl')
+        self._has_keyboard_focus = False
+        self._accelerator_key = ""
+        self._process_id = process_id
+        self._handle = handle
+        self._value = value
+        self._scroll = scroll
+        self._children: list['SyntheticControl'] = []
+        self._parent: Optional['SyntheticControl'] = None
+        self._calls: Counter = Counter()
+        self._runtime_id = (42, next(_runtime_ids))
+
+    def add_child(self, child: 'SyntheticControl', index: Optional[int] = None) -> 'SyntheticControl':
+        """Add a child control (appended unless index is given) and return it."""
+        child._parent = self
+        if child._calls is not self._calls:
+            stack = [child]
+            while stack:
+                node = stack.pop()
+                node._calls = self._calls
+                stack.extend(node._children)
+        if index is None:
+            self._children.append(child)
+        else:
+            self._children.insert(index, child)
+        return child
+
+    def remove_child(self, child: 'SyntheticControl'):
+        """Detach a child control."""
+        self._children.remove(child)
+        child._parent = None
+
+    def set_name(self, name: str):
+        """Change the control's name, as an app relabelling a control would."""
+        self._name = name
+
+    @property
+    def Name(self) -> str:
+        self._calls['Name'] += 1
+        return self._name
+
+    @property
+    def ClassName(self) -> str:
+        self._calls['ClassName'] += 1
+        return self._class_name
+
+    @property
+    def ControlTypeName(self) -> str:
+        self._calls['ControlTypeName'] += 1
+        return self._control_type
+
+    @property
+    def LocalizedControlType(self) -> str:
+        self._calls['LocalizedControlType'] += 1
+        return self._control_type[:-len('Control')].lower()
+
+    @property
+    def BoundingRectangle(self) -> Rect:
+        self._calls['BoundingRectangle'] += 1
+        return self._rect
+
+    @property
+    def IsOffscreen(self) -> bool:
+        self._calls['IsOffscreen'] += 1
+        return self._is_offscreen
+
+    @property
+    def IsControlElement(self) -> bool:
+        self._calls['IsControlElement'] += 1
+        return True
+
+    @property
+    def IsEnabled(self) -> bool:
+        self._calls['IsEnabled'] += 1
+        return self._is_enabled
+
+    @property
+    def IsKeyboardFocusable(self) -> bool:
+        self._calls['IsKeyboardFocusable'] += 1
+        return self._is_keyboard_focusable
+
+    @property
+    def HasKeyboardFocus(self) -> bool:
+        self._calls['HasKeyboardFocus'] += 1
+        return self._has_keyboard_focus
+
+    @property
+    def AcceleratorKey(self) -> str:
+        self._calls['AcceleratorKey'] += 1
+        return self._accelerator_key
+
+    @property
+    def ProcessId(self) -> int:
+        self._calls['ProcessId'] += 1
+        return self._process_id
+
+    @property
+    def NativeWindowHandle(self) -> int:
+        self._calls['NativeWindowHandle'] += 1
+        return self._handle
+
+    def GetRuntimeId(self) -> tuple:
+        self._calls['GetRuntimeId'] += 1
+        return self._runtime_id
+
+    def GetChildren(self) -> list['SyntheticControl']:
+        self._calls['GetChildren'] += 1
+        return list(self._children)
+
+    def GetParentControl(self) -> Optional['SyntheticControl']:
+        self._calls['GetParentControl'] += 1
+        return self._parent
+
+    def GetScrollPattern(self) -> Optional[ScrollPatternState]:
+        self._calls['GetScrollPattern'] += 1
+        return self._scroll
+
+    def GetLegacyIAccessiblePattern(self) -> LegacyPatternState:
+        self._calls['GetLegacyIAccessiblePattern'] += 1
+        return LegacyPatternState(self._value)
+
+
+class SyntheticBackend(TreeBackend):
+    """Backend serving a pre-built synthetic control tree."""
+
+    name = "synthetic"
+
+    def __init__(
+        self,
+        root: SyntheticControl,
+        screen_size: Size = Size(width=1920, height=1080),
+        latency: float = 0.0
+    ):
+        """Initialize the backend.
+
+        Args:
+            root: Root control, usually from generate_synthetic_tree()
+            screen_size: Screen size the tree was laid out on
+            latency: Seconds slept per children request, to mimic a
+                cross-process round trip (releases the GIL like COM does)
+        """
+        super().__init__()
+        self.root = root
+        self.screen_size = screen_size
+        self.latency = latency
+        self.calls = root._calls
+
+    def get_children(self, node) -> list:
+        if self.latency and isinstance(node, SyntheticControl):
+            time.sleep(self.latency)
+        return node.GetChildren()
+
+    def get_root_control(self) -> SyntheticControl:
+        return self.root
+
+    def control_from_handle(self, handle: int) -> Optional[SyntheticControl]:
+        """Find a top-level window by handle, counted as a single request."""
+        self.calls['control_from_handle'] += 1
+        for window in self.root._children:
+            if handle and window._handle == handle:
+                return window
+        return None
+
+    def fetch_subtree(self, node: SyntheticControl) -> ElementSnapshot:
+        """Snapshot a whole subtree, counted as a single request."""
+        self.calls['fetch_subtree'] += 1
+        root = _snapshot(node)
+        stack = [(node, root)]
+        while stack:
+            current, snapshot = stack.pop()
+            snapshot.subtree = True
+            for child in current._children:
+                child_snapshot = _snapshot(child)
+                snapshot._children.append(child_snapshot)
+                stack.append((child, child_snapshot))
+        return root
+
+    def fetch_children(self, node) -> list[ElementSnapshot]:
+        """Snapshot the children of a control or snapshot, counted as a single request."""
+        self.calls['fetch_children'] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [_snapshot(child) for child in self.live_control(node)._children]
+
+    def get_screen_size(self) -> Size:
+        return self.screen_size
+
+    def is_app_visible(self, app: SyntheticControl) -> bool:
+        box = app.BoundingRectangle
+        return not box.isempty() and box.width() * box.height() > 10
+
+    def is_app_browser(self, app: SyntheticControl) -> bool:
+        return False
+
+
+def _snapshot(node: SyntheticControl) -> ElementSnapshot:
+    """Copy a control's fields into a snapshot without counting reads."""
+    return ElementSnapshot(
+        name=node._name,
+        class_name=node._class_name,
+        control_type_name=node._control_type,
+        localized_control_type=node._control_type[:-len('Control')].lower(),
+        bounding_rectangle=node._rect,
+        is_offscreen=node._is_offscreen,
+        is_control_element=True,
+        is_enabled=node._is_enabled,
+        is_keyboard_focusable=node._is_keyboard_focusable,
+        has_keyboard_focus=node._has_keyboard_focus,
+        accelerator_key=node._accelerator_key,
+        process_id=node._process_id,
+        native_window_handle=node._handle,
+        scroll=node._scroll,
+        legacy=LegacyPatternState(node._value),
+        runtime_id=node._runtime_id,
+        source=node
+    )
+
+
+def generate_synthetic_tree(
+    depth: int = 6,
+    fan_out: int = 6,
+    control_type_mix: Optional[dict[str, int]] = None,
+    apps: int = 1,
+    include_taskbar: bool = False,
+    scrollable_ratio: float = 0.05,
+    screen_size: Size = Size(width=1920, height=1080),
+    seed: int = 0
+) -> SyntheticControl:
+    """Build a synthetic desktop tree.
+
+    Every application window gets a full tree of the given depth and
+    fan-out. Children are laid out as rows of their parent, so long lists
+    naturally run past the bottom of the screen and become offscreen.
+
+    Args:
+        depth: Levels below each application window
+        fan_out: Children per container
+        control_type_mix: Weights per control type name
+        apps: Number of top-level application windows
+        include_taskbar: Also add a ``Shell_TrayWnd`` taskbar window
+        scrollable_ratio: Share of containers exposing a scroll pattern
+        screen_size: Screen the tree is laid out on
+        seed: Random seed, so trees are reproducible
+
+    Returns:
+        Root control of the synthetic desktop
+    """
+    rng = random.Random(seed)
+    mix = control_type_mix or DEFAULT_CONTROL_TYPE_MIX
+    type_names = list(mix)
+    weights = [mix[name] for name in type_names]
+    screen = Rect(0, 0, screen_size.width, screen_size.height)
+
+    root = SyntheticControl('PaneControl', screen, name="Desktop", class_name="#32769")
+
+    windows = []
+    for app_index in range(apps):
+        windows.append(root.add_child(SyntheticControl(
+            'WindowControl', Rect(0, 0, screen.right, screen.bottom - 40),
+            name=f"Synthetic App {app_index}", class_name=f"SyntheticApp{app_index}",
+            process_id=1000 + app_index, handle=0x10000 + app_index
+        )))
+    if include_taskbar:
+        windows.append(root.add_child(SyntheticControl(
+            'PaneControl', Rect(0, screen.bottom - 40, screen.right, screen.bottom),
+            name="Taskbar", class_name="Shell_TrayWnd", process_id=4, handle=0x20000
+        )))
+
+    counter = 0
+    stack = [(window, 0) for window in windows]
+    while stack:
+        parent, level = stack.pop()
+        if level >= depth:
+            continue
+
+        box = parent._rect
+        row_height = max(MIN_ROW_HEIGHT, box.height() // fan_out)
+        inset = min(4, box.width() // 10)
+        for index in range(fan_out):
+            control_type = rng.choices(type_names, weights)[0]
+            top = box.top + index * row_height
+            rect = Rect(box.left + inset, top, box.right - inset, top + row_height)
+            scroll = None
+            if control_type in SCROLLABLE_CONTROL_TYPE_NAMES and rng.random() < scrollable_ratio:
+                scroll = ScrollPatternState(horizontal=False, vertical=True)
+
+            counter += 1
+            child = parent.add_child(SyntheticControl(
+                control_type, rect,
+                name="" if rng.random() < 0.2 else f"{control_type[:-7]} {counter}",
+                is_offscreen=rect.top >= screen.bottom or rect.bottom <= screen.top,
+                is_enabled=rng.random() > 0.05,
+                value=f"value {counter}" if control_type == 'EditControl' else "",
+                scroll=scroll,
+                process_id=parent._process_id
+            ))
+            stack.append((child, level + 1))
+
+    return root
+
+
+def count_nodes(root: SyntheticControl) -> int:
+    """Count all controls under (and including) root."""
+    total = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        total += 1
+        stack.extend(node._children)
+    return total
+
+
+def generate_synthetic_state(
+    elements: int,
+    apps: int = 8,
+    informative_ratio: float = 0.3,
+    scrollable_ratio: float = 0.02,
+    screen_size: Size = Size(1920, 1080),
+    seed: Optional[int] = 0
+) -> TreeState:
+    """Generate a TreeState directly, without a control tree.
+
+    Args:
+        elements: Number of interactive elements
+        apps: Number of distinct app names
+        informative_ratio: Informative elements per interactive element
+        scrollable_ratio: Scrollable elements per interactive element
+        screen_size: Screen the element rectangles are placed on
+        seed: Random seed for reproducible states
+
+    Returns:
+        TreeState holding plain lists of element nodes
+    """
+    rng = random.Random(seed)
+    app_names = [f"Synthetic App {i}" for i in range(apps)]
+    control_types = [name[:-7] for name in DEFAULT_CONTROL_TYPE_MIX]
+
+    def box() -> tuple[BoundingBox, Center]:
+        left = rng.randrange(0, screen_size.width - 40)
+        top = rng.randrange(0, screen_size.height - MIN_ROW_HEIGHT)
+        width = rng.randrange(20, min(400, screen_size.width - left))
+        bounding_box = BoundingBox(left=left, top=top, right=left + width, bottom=top + MIN_ROW_HEIGHT,
+                                   width=width, height=MIN_ROW_HEIGHT)
+        return bounding_box, Center(x=left + width // 2, y=top + MIN_ROW_HEIGHT // 2)
+
+    interactive = []
+    for i in range(elements):
+        bounding_box, center = box()
+        control_type = rng.choice(control_types)
+        interactive.append(TreeElementNode(
+            name=f"{control_type} {i}",
+            control_type=control_type,
+            value=f"value {i}" if control_type == 'Edit' else "",
+            shortcut="",
+            bounding_box=bounding_box,
+            center=center,
+            app_name=rng.choice(app_names),
+            is_enabled=rng.random() > 0.05,
+            is_keyboard_focusable=rng.random() > 0.5
+        ))
+    informative = [
+        TextElementNode(name=f"Text {i}", app_name=rng.choice(app_names))
+        for i in range(int(elements * informative_ratio))
+    ]
+    scrollable = []
+    for i in range(int(elements * scrollable_ratio)):
+        bounding_box, center = box()
+        scrollable.append(ScrollElementNode(
+            name=f"Pane {i}",
+            control_type="Pane",
+            app_name=rng.choice(app_names),
+            bounding_box=bounding_box,
+            center=center,
+            horizontal_scrollable=False,
+            horizontal_scroll_percent=0,
+            vertical_scrollable=True,
+            vertical_scroll_percent=rng.random() * 100,
+            is_focused=False
+        ))
+    return TreeState(interactive_nodes=interactive, informative_nodes=informative, scrollable_nodes=scrollable)
@@ -1,10 +1,12 @@
 """Data models for UI tree elements and state."""
 
 from dataclasses import dataclass, field
-from typing import Optional
 
+from windows_mcp.tree.identity import ElementIndex
+from typing import Any, Iterable, Mapping, Optional, Sequence
 
-@dataclass
+
+@dataclass(slots=True)
 class BoundingBox:
     """Represents a bounding box for a UI element."""
     left: int
@@ -27,7 +29,7 @@ class BoundingBox:
         return (self.left + self.width // 2, self.top + self.height // 2)
 
 
-@dataclass
+@dataclass(slots=True)
 class Center:
     """Represents the center point of a UI element."""
     x: int
@@ -42,7 +44,7 @@ class Center:
         return [self.x, self.y]
 
 
-@dataclass
+@dataclass(slots=True)
 class TreeElementNode:
     """Represents an interactive UI element in the tree."""
     name: str
@@ -54,6 +56,9 @@ class TreeElementNode:
     app_name: str
     is_enabled: bool = True
     is_keyboard_focusable: bool = False
+    fingerprint: int = 0
+    path: tuple = ()
+    runtime_id: tuple = ()
 
     def to_row(self, index: int) -> list:
         """Convert to table row format."""
@@ -88,7 +93,7 @@ class TreeElementNode:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TextElementNode:
     """Represents an informative text element in the tree."""
     name: str
@@ -100,7 +105,7 @@ class TextElementNode:
         return [self.app_name, self.control_type, self.name or "''"]
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrollElementNode:
     """Represents a scrollable UI element in the tree."""
     name: str
@@ -113,6 +118,7 @@ class ScrollElementNode:
     vertical_scrollable: bool
     vertical_scroll_percent: float
     is_focused: bool
+    fingerprint: int = 0
 
     def to_row(self, index: int, base_index: int) -> list:
         """Convert to table row format."""
@@ -145,63 +151,244 @@ class ScrollElementNode:
         }
 
 
+@dataclass(slots=True)
+class ElementRecord:
+    """Properties of one control, each read at most once, and its kind.
+
+    ``kind`` is one of ``'scrollable'``, ``'interactive'`` or
+    ``'informative'``. Fields that the classification did not need are
+    left at their defaults.
+    """
+    kind: str
+    control_type_name: str
+    rect: Any = None
+    name: str = ""
+    localized_control_type: str = ""
+    is_enabled: bool = True
+    is_keyboard_focusable: bool = False
+    has_keyboard_focus: bool = False
+    accelerator_key: str = ""
+    value: str = ""
+    scroll: Any = None
+    runtime_id: tuple = ()
+
+
+@dataclass(frozen=True)
+class ScanScope:
+    """Part of the desktop a scan is restricted to.
+
+    Every criterion that is set must match. ``window_handle`` scans one
+    window directly, ``process_id`` and ``app_name`` (case-insensitive
+    substring) select top-level windows, and ``region`` is a
+    (left, top, right, bottom) rectangle; subtrees whose bounds fall
+    entirely outside it are not traversed.
+    """
+    window_handle: Optional[int] = None
+    process_id: Optional[int] = None
+    app_name: Optional[str] = None
+    region: Optional[tuple[int, int, int, int]] = None
+
+    def is_empty(self) -> bool:
+        """Return True if the scope covers the whole desktop."""
+        return not self.window_handle and self.process_id is None and not self.app_name and self.region is None
+
+    def intersects(self, rect: Any) -> bool:
+        """Check whether a rectangle overlaps the scope's region."""
+        return self.region is None or rect_intersects(rect, self.region)
+
+
+def rect_intersects(rect: Any, region: tuple[int, int, int, int]) -> bool:
+    """Check whether a rectangle overlaps a (left, top, right, bottom) region."""
+    left, top, right, bottom = region
+    return rect.left < right and rect.right > left and rect.top < bottom and rect.bottom > top
+
+
+@dataclass(frozen=True)
+class ScanBudget:
+    """Limits that bound the cost of one scan; None disables a limit.
+
+    When a node limit is set, traversal runs breadth-first so the shallow,
+    most prominent elements of every app are found before the budget runs
+    out. A time limit alone keeps the faster depth-first walk, so what a
+    timed-out scan reports depends on where the walk got to. Scans with
+    either limit prefetch one level per request instead of whole subtrees,
+    except for apps whose previous walk showed them to be small.
+    ``app_max_depths`` overrides ``max_depth`` for apps by name.
+    """
+    max_nodes: Optional[int] = None
+    max_depth: Optional[int] = None
+    app_max_depths: Mapping[str, int] = field(default_factory=dict)
+    time_limit: Optional[float] = None
+
+    def is_bounded(self) -> bool:
+        """Return True if the scan can stop before the whole tree is walked."""
+        return self.max_nodes is not None or self.time_limit is not None
+
+    def depth_for(self, app_name: Any, default: int) -> int:
+        """Return the maximum depth below the root of the given app."""
+        depth = self.app_max_depths.get(app_name)
+        if depth is not None:
+            return depth
+        return self.max_depth if self.max_depth is not None else default
+
+
 @dataclass
-class TreeState:
-    """Represents the complete UI tree state."""
-    interactive_nodes: list[TreeElementNode] = field(default_factory=list)
-    informative_nodes: list[TextElementNode] = field(default_factory=list)
-    scrollable_nodes: list[ScrollElementNode] = field(default_factory=list)
+class ScanTruncation:
+    """Why and where a scan stopped short of the whole tree.
+
+    ``reason`` is 'max_nodes', 'deadline' or 'cancelled' when the walk
+    stopped early, or 'max_depth' when only the depth limit cut subtrees
+    off.
+    ``pending`` counts the queued subtrees that were never visited and
+    ``depth_limited`` the nodes whose children lie below the depth limit,
+    both per app.
+    """
+    reason: str
+    visited: int
+    elapsed: float
+    pending: dict[str, int] = field(default_factory=dict)
+    depth_limited: dict[str, int] = field(default_factory=dict)
+
+    def to_string(self) -> str:
+        """Describe the truncation in one line per affected app."""
+        reasons = {
+            'max_nodes': "node budget exhausted",
+            'deadline': "time limit reached",
+            'cancelled': "cancelled",
+            'max_depth': "depth limit reached",
+        }
+        lines = [f"Scan truncated: {reasons.get(self.reason, self.reason)} "
+                 f"after {self.visited} nodes in {self.elapsed:.2f}s"]
+        for app_name in sorted(set(self.pending) | set(self.depth_limited)):
+            parts = []
+            if self.pending.get(app_name):
+                parts.append(f"{self.pending[app_name]} subtrees not scanned")
+            if self.depth_limited.get(app_name):
+                parts.append(f"{self.depth_limited[app_name]} nodes at the depth limit not expanded")
+            lines.append(f"  {app_name}: {', '.join(parts)}")
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class ElementFilter:
+    """Criteria for narrowing the elements reported from a TreeState.
+
+    ``app_name`` matches case-insensitively as a substring, ``control_type``
+    matches case-insensitively and exactly, and ``region`` is a
+    (left, top, right, bottom) rectangle that must contain the element's
+    center. Elements without coordinates never match a region.
+    """
+    app_name: Optional[str] = None
+    control_type: Optional[str] = None
+    region: Optional[tuple[int, int, int, int]] = None
+
+    def is_empty(self) -> bool:
+        """Return True if the filter matches every element."""
+        return not self.app_name and not self.control_type and self.region is None
+
+    def matches(self, node: Any) -> bool:
+        """Check whether an element node satisfies every criterion."""
+        if self.app_name and self.app_name.lower() not in (node.app_name or "").lower():
+            return False
+        if self.control_type and (node.control_type or "").lower() != self.control_type.lower():
+            return False
+        if self.region is not None:
+            center = getattr(node, 'center', None)
+            if center is None:
+                return False
+            left, top, right, bottom = self.region
+            if not (left <= center.x <= right and top <= center.y <= bottom):
+                return False
+        return True
+
+
+def format_table(headers: list[str], rows: Iterable[list]) -> str:
+    """Render rows as a pipe-separated table with a header rule."""
+    header = " | ".join(headers)
+    lines = [header, "-" * len(header)]
+    lines.extend(" | ".join(str(cell) for cell in row) for row in rows)
+    lines.append("")
+    return "\n".join(lines)
+
 
-    def interactive_elements_to_string(self) -> str:
-        """Convert interactive elements to formatted table string."""
+@dataclass
+class TreeState:
+    """Represents the complete UI tree state.
+
+    The node sequences are plain lists while a state is being assembled;
+    ``windows_mcp.tree.columnar.compact_state`` swaps them for column
+    stores whose items are views with the same attributes.
+
+    ``app_windows`` holds the native window handle of each scanned app
+    window; the first entry of an element's ``path`` indexes into it.
+    ``truncation`` is set when a scan budget cut the scan short.
+    ``version`` is the version StateCache stored the state as, 0 if it
+    was never stored.
+    """
+    interactive_nodes: Sequence[TreeElementNode] = field(default_factory=list)
+    informative_nodes: Sequence[TextElementNode] = field(default_factory=list)
+    scrollable_nodes: Sequence[ScrollElementNode] = field(default_factory=list)
+    app_windows: list[int] = field(default_factory=list)
+    truncation: Optional[ScanTruncation] = None
+    version: int = field(default=0, init=False, compare=False)
+    _element_index: Optional[ElementIndex] = field(default=None, init=False, repr=False, compare=False)
+
+    def element_index(self) -> ElementIndex:
+        """Return the fingerprint index of the interactive elements, built on first use."""
+        if self._element_index is None:
+            self._element_index = ElementIndex(self.interactive_nodes)
+        return self._element_index
+
+    def filter_interactive(self, element_filter: Optional[ElementFilter] = None) -> list[int]:
+        """Return the labels of interactive elements matching a filter."""
+        if element_filter is None or element_filter.is_empty():
+            return list(range(len(self.interactive_nodes)))
+        return [idx for idx, node in enumerate(self.interactive_nodes) if element_filter.matches(node)]
+
+    def interactive_elements_to_string(self, labels: Optional[Iterable[int]] = None) -> str:
+        """Convert interactive elements to formatted table string.
+
+        Args:
+            labels: Labels of the rows to include (all elements by default).
+                Labels always index the full interactive list.
+        """
         if not self.interactive_nodes:
             return "No interactive elements found."
 
-        # Build table manually for better control
         headers = ["Label", "App", "Type", "Name", "Value", "Shortcut", "Coordinates"]
-        rows = [node.to_row(idx) for idx, node in enumerate(self.interactive_nodes)]
-
-        # Simple table formatting
-        result = " | ".join(headers) + "\n"
-        result += "-" * (len(result) - 1) + "\n"
-        for row in rows:
-            result += " | ".join(str(cell) for cell in row) + "\n"
-
-        return result
-
-    def informative_elements_to_string(self) -> str:
+        if labels is None:
+            labels = range(len(self.interactive_nodes))
+        nodes = self.interactive_nodes
+        # Column stores render rows straight from their arrays
+        rows = getattr(nodes, 'rows', None)
+        return format_table(headers, rows(labels) if rows else (nodes[idx].to_row(idx) for idx in labels))
+
+    def informative_elements_to_string(self, element_filter: Optional[ElementFilter] = None) -> str:
         """Convert informative elements to formatted table string."""
-        if not self.informative_nodes:
+        nodes = self.informative_nodes
+        if element_filter is not None and not element_filter.is_empty():
+            nodes = [node for node in nodes if element_filter.matches(node)]
+        if not nodes:
             return "No informative elements found."
 
         headers = ["App", "Type", "Name"]
-        rows = [node.to_row() for node in self.informative_nodes]
-
-        result = " | ".join(headers) + "\n"
-        result += "-" * (len(result) - 1) + "\n"
-        for row in rows[:100]:  # Limit to first 100 to avoid spam
-            result += " | ".join(str(cell) for cell in row) + "\n"
-
-        if len(rows) > 100:
-            result += f"\n... and {len(rows) - 100} more informative elements"
-
+        result = format_table(headers, (node.to_row() for node in nodes[:100]))  # Limit to first 100 to avoid spam
+        if len(nodes) > 100:
+            result += f"\n... and {len(nodes) - 100} more informative elements"
         return result
 
-    def scrollable_elements_to_string(self) -> str:
+    def scrollable_elements_to_string(self, element_filter: Optional[ElementFilter] = None) -> str:
         """Convert scrollable elements to formatted table string."""
-        if not self.scrollable_nodes:
+        base_index = len(self.interactive_nodes)
+        rows = [
+            node.to_row(idx, base_index) for idx, node in enumerate(self.scrollable_nodes)
+            if element_filter is None or element_filter.matches(node)
+        ]
+        if not rows:
             return "No scrollable elements found."
 
         headers = [
             "Label", "App", "Type", "Name", "Coordinates",
             "H-Scroll", "H-Pos%", "V-Scroll", "V-Pos%", "Focused"
         ]
-        base_index = len(self.interactive_nodes)
-        rows = [node.to_row(idx, base_index) for idx, node in enumerate(self.scrollable_nodes)]
-
-        result = " | ".join(headers) + "\n"
-        result += "-" * (len(result) - 1) + "\n"
-        for row in rows:
-            result += " | ".join(str(cell) for cell in row) + "\n"
-
-        return result
+        return format_table(headers, rows)
@@ -0,0 +1,244 @@
+"""Iterative, work-sharing traversal of UI control trees."""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Optional
+
+from windows_mcp.tree.backend import TreeBackend
+from windows_mcp.tree.cancel import CancelToken
+from windows_mcp.tree.pool import TraversalPool, pool_executor
+from windows_mcp.tree.config import MAX_TREE_DEPTH, TRAVERSAL_SPLIT_DEPTH, TRAVERSAL_WORKERS
+from windows_mcp.tree.views import ScanBudget, ScanTruncation
+
+logger = logging.getLogger('windows-mcp.tree')
+
+# visit(node, context, path) is called once per traversed node
+Visitor = Callable[[Any, Any, tuple], None]
+
+
+class _WalkState:
+    """Shared queue and bookkeeping for one walk."""
+
+    def __init__(
+        self,
+        items: list[tuple],
+        budget: ScanBudget,
+        deadline: Optional[float],
+        cancel: Optional[CancelToken],
+        children: Callable[[Any], list]
+    ):
+        self.shared: deque = deque(items)
+        self.children = children
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.active = 0
+        self.idle = 0
+        self.worker_counts: list[int] = []
+        self.budget = budget
+        self.deadline = deadline
+        self.bounded = budget.is_bounded() or deadline is not None
+        self.cancel = cancel
+        self.visited = 0
+        self.stopped: Optional[str] = None
+        self.pending: Counter = Counter()
+        self.depth_limited: Counter = Counter()
+
+    def admit(self) -> bool:
+        """Count one more visit, or return False once the budget is spent or the walk is cancelled."""
+        with self.lock:
+            if self.stopped is None:
+                if self.cancel is not None and self.cancel.cancelled:
+                    self.stopped = 'cancelled'
+                elif self.budget.max_nodes is not None and self.visited >= self.budget.max_nodes:
+                    self.stopped = 'max_nodes'
+                elif self.deadline is not None and time.monotonic() >= self.deadline:
+                    self.stopped = 'deadline'
+            if self.stopped is not None:
+                return False
+            self.visited += 1
+            return True
+
+    def drop(self, items):
+        """Record work items that will not be visited. Caller holds the lock."""
+        self.pending.update(context for _, context, _, _ in items)
+
+
+class TreeWalker:
+    """Walks control trees without recursion, spreading subtrees over threads.
+
+    Every root starts as a work item on a shared deque. Workers take the
+    oldest (shallowest) item and walk it depth-first on a private stack.
+    Children of nodes above ``split_depth`` always go back to the shared
+    deque, and a worker hands the oldest item of its stack over whenever
+    another worker is idle, so one huge app does not pin a single thread.
+
+    A walk with a node limit shares every child instead, so the shared
+    deque is consumed in breadth-first order and the nodes it stops at are
+    the deepest ones. A time limit alone keeps the depth-first,
+    work-sharing walk, which is faster on large trees, and simply stops
+    wherever the workers are at the deadline.
+    """
+
+    def __init__(
+        self,
+        backend: TreeBackend,
+        workers: int = TRAVERSAL_WORKERS,
+        split_depth: int = TRAVERSAL_SPLIT_DEPTH,
+        max_depth: int = MAX_TREE_DEPTH,
+        pool: Optional[TraversalPool] = None
+    ):
+        """Initialize the walker.
+
+        Args:
+            backend: Backend used to list children
+            workers: Number of worker threads
+            split_depth: Depth above which children are always shared
+            max_depth: Deepest level visited below each root
+            pool: Long-lived pool to run workers on; without one, each walk
+                starts and stops its own threads
+        """
+        self.backend = backend
+        self.pool = pool
+        self.workers = max(1, min(workers, pool.size) if pool else workers)
+        self.split_depth = split_depth
+        self.max_depth = max_depth
+        self.last_worker_counts: list[int] = []
+
+    def walk(
+        self,
+        roots: list[tuple[Any, Any]],
+        visit: Visitor,
+        workers: Optional[int] = None,
+        budget: Optional[ScanBudget] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+        children: Optional[Callable[[Any], list]] = None
+    ) -> Optional[ScanTruncation]:
+        """Visit every node under the given roots.
+
+        Args:
+            roots: (root node, context) pairs; context is passed to visit
+            visit: Called as visit(node, context, path) for each node, where
+                path is the tuple of child indices from the roots; returning
+                False skips the node's children
+            workers: Override the configured worker count for this walk
+            budget: Node, depth and time limits; per-app depths are looked
+                up by context
+            deadline: time.monotonic() value to stop at; defaults to the
+                budget's time limit counted from the start of this walk
+            cancel: Token checked before each node; once cancelled, the walk
+                stops and reports truncation with reason 'cancelled'
+            children: Lists the children of a node; defaults to the
+                backend's get_children
+
+        Returns:
+            ScanTruncation describing the unvisited parts of the tree, or
+            None if every node within the depth limit was visited
+        """
+        start = time.monotonic()
+        budget = budget or ScanBudget()
+        if deadline is None and budget.time_limit is not None:
+            deadline = start + budget.time_limit
+        state = _WalkState(
+            [(node, context, 0, (index,)) for index, (node, context) in enumerate(roots)],
+            budget, deadline, cancel, children or self.backend.get_children
+        )
+        worker_count = max(1, workers or self.workers)
+
+        if worker_count == 1:
+            self._work(state, visit)
+        else:
+            with pool_executor(self.pool, worker_count) as executor:
+                futures = [executor.submit(self._work, state, visit) for _ in range(worker_count)]
+                for future in futures:
+                    future.result()
+
+        self.last_worker_counts = state.worker_counts
+
+        if not state.stopped and not state.depth_limited:
+            return None
+        truncation = ScanTruncation(
+            reason=state.stopped or 'max_depth',
+            visited=sum(state.worker_counts),
+            elapsed=time.monotonic() - start,
+            pending=dict(state.pending),
+            depth_limited=dict(state.depth_limited)
+        )
+        logger.info(truncation.to_string())
+        return truncation
+
+    def _work(self, state: _WalkState, visit: Visitor):
+        """Worker loop: take shared items and walk them until none remain."""
+        local: deque = deque()
+        visited = 0
+        budget, bounded = state.budget, state.bounded
+        checked = bounded or state.cancel is not None
+        # Node-limited walks are breadth-first: every child goes through the shared FIFO deque
+        split_depth = float('inf') if budget.max_nodes is not None else self.split_depth
+        while True:
+            with state.cond:
+                while not state.shared and state.active and not state.stopped:
+                    state.idle += 1
+                    state.cond.wait()
+                    state.idle -= 1
+                if state.stopped:
+                    state.drop(state.shared)
+                    state.shared.clear()
+                    state.cond.notify_all()
+                if not state.shared:
+                    state.cond.notify_all()
+                    state.worker_counts.append(visited)
+                    return
+                local.append(state.shared.popleft())
+                state.active += 1
+
+            try:
+                while local:
+                    if checked and not state.admit():
+                        with state.cond:
+                            state.drop(local)
+                        local.clear()
+                        break
+                    node, context, depth, path = local.pop()
+                    descend = visit(node, context, path)
+                    visited += 1
+                    if descend is False:
+                        continue
+                    if depth >= budget.depth_for(context, self.max_depth):
+                        with state.lock:
+                            state.depth_limited[context] += 1
+                        continue
+
+                    try:
+                        children = state.children(node)
+                    except Exception:
+                        children = []
+                    items = [
+                        (child, context, depth + 1, path + (index,))
+                        for index, child in enumerate(children)
+                    ]
+
+                    if depth < split_depth:
+                        self._share(state, items)
+                        continue
+
+                    local.extend(reversed(items))
+                    if state.idle and len(local) > 1:
+                        # Hand the oldest half of our stack to idle workers
+                        self._share(state, [local.popleft() for _ in range(len(local) // 2)])
+            finally:
+                with state.cond:
+                    state.active -= 1
+                    if not state.active and not state.shared:
+                        state.cond.notify_all()
+
+    @staticmethod
+    def _share(state: _WalkState, items: list[tuple]):
+        """Put work items on the shared deque and wake idle workers."""
+        if not items:
+            return
+        with state.cond:
+            state.shared.extend(items)
+            state.cond.notify(len(items))